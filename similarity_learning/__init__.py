@@ -1,9 +1,38 @@
-from .search import Search
 import logging
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .search import Search
+
+# the library does not configure logging on import, see configure_logging
 logger = logging.getLogger('similarity_learning')
-logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler()
-handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
-handler.setFormatter(formatter)
-logger.addHandler(handler)
\ No newline at end of file
+logger.addHandler(logging.NullHandler())
+
+
+def configure_logging(level: int = logging.DEBUG):
+    """
+    Print the log messages of the library (e.g. the steps of the feature extraction) to stderr.
+    :param level:
+    :return:
+    """
+    logger.setLevel(level)
+    if not any(getattr(handler, "_similarity_learning_handler", False) for handler in logger.handlers):
+        handler = logging.StreamHandler()
+        handler._similarity_learning_handler = True
+        formatter = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    for handler in logger.handlers:
+        if getattr(handler, "_similarity_learning_handler", False):
+            handler.setLevel(level)
+
+
+def __getattr__(name: str):
+    # Search (and with it pandas) is only imported when it is used, so that importing the package, or lightweight
+    # modules of it, is fast
+    if name == "Search":
+        from .search import Search
+        return Search
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Search", "configure_logging"]
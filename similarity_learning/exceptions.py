@@ -10,5 +10,11 @@ class DoubleUsageError(Exception):
 class NotSetAttributeError(Exception):
     pass
 
+class UnsavableModelError(Exception):
+    pass
+
 class NotFittedError(Exception):
+    pass
+
+class UnsupportedArtifactError(Exception):
     pass
\ No newline at end of file
@@ -1,3 +1,4 @@
 from .feature_hierarchy_encoder import FeatureHierarchyEncoder
 from .language.language_feature_hierarchy_encoder import LanguageFeatureHierarchyEncoder
-from .baseline_feature_extractor import BaselineFeatureExtractor
\ No newline at end of file
+from .baseline_feature_extractor import BaselineFeatureExtractor
+from .feature_store import FeatureStore
\ No newline at end of file
@@ -1,27 +1,56 @@
 import pandas as pd
 import numpy as np
-from similarity_learning.loading_pipeline import PairsDataFrame
+from itertools import chain
+from similarity_learning.loading_pipeline import PairsDataFrame, NormalizedPairsDataFrame
+from similarity_learning.loading_pipeline.data_model import JobsDataFrame, TalentsDataFrame
 from ..feature_hierarchy_encoder import FeatureHierarchyEncoder
 from ..language import LanguageFeatureHierarchyEncoder
-from typing import Tuple, List, Union
+from ..multi_label_vocabulary_encoder import MultiLabelVocabularyEncoder
+from typing import Tuple, List, Union, Callable, Type, Optional, TYPE_CHECKING
 import logging
 from .language_features_order import LanguageFeaturesOrder
-from sklearn.preprocessing import MultiLabelBinarizer
-from similarity_learning.exceptions import NotSetAttributeError, NotFittedError
+from .encoded_entities import EncodedEntities, EncodedJobs, EncodedTalents
+from .encoding_cache import EncodingCache
+from .feature_schema import FeatureSchema
+from .single_pair_feature_extractor import SinglePairFeatureExtractor
+from .parallel_transform import create_process_pool, parallel_transform
+from similarity_learning.loading_pipeline.data_model.item_dataframe_base import ItemDataFrameBase
+from similarity_learning.loading_pipeline.preprocessing.node_id_generation import compute_content_hashes
+from similarity_learning.exceptions import NotSetAttributeError, NotFittedError, UnsupportedArtifactError
+from similarity_learning.instrumentation import stage
+if TYPE_CHECKING:
+    from sklearn.preprocessing import MultiLabelBinarizer
+    from scipy.sparse import csr_matrix
 logger = logging.getLogger("similarity_learning")
 
+# maximal number of encoded jobs (and, separately, talents) kept in the encoding caches
+ENCODING_CACHE_SIZE = 10000
+# number of pairs per chunk, when transforming in parallel
+PARALLEL_CHUNK_SIZE = 50000
+
 
 class BaselineFeatureExtractor:
     """
     Order of subtraction is chosen to increase intuitiveness (more means better, negatives means insufficient).
     Language mapping order is introduced to account for some bias towards certain languages.
+
+    With sparse_output, transform returns a scipy.sparse CSR matrix: the role and language groups of the pairs are
+    computed as sparse matrices directly from the (per item) encodings, so that the memory of the pair features scales
+    with their non zero entries and not with the number of pairs times the vocabulary sizes.
+
+    partial_fit extends the fitted vocabularies (job roles and languages) by new entries, whose features are appended
+    behind the existing ones, which keep their columns (see extend_features for the features computed before).
     """
     def __init__(self,
                  seniority_hierarchy_mapping: List[str],
                  degree_hierarchy_mapping: List[str],
                  language_rating_hierarchy_mapping: List[str],
                  language_must_have_hierarchy_mapping: List[str],
-                 language_mapping_order: LanguageFeaturesOrder = LanguageFeaturesOrder.TALENTS):
+                 language_mapping_order: LanguageFeaturesOrder = LanguageFeaturesOrder.TALENTS,
+                 encoding_cache_size: int = ENCODING_CACHE_SIZE,
+                 n_workers: int = 1,
+                 chunk_size: int = PARALLEL_CHUNK_SIZE,
+                 sparse_output: bool = False):
 
         self.language_mapping_order = language_mapping_order
 
@@ -29,161 +58,647 @@ class BaselineFeatureExtractor:
         self.degree_hierarchy_encoder = FeatureHierarchyEncoder(feature_hierarchy_mapping=degree_hierarchy_mapping)
         self.language_rating_hierarchy_encoder = LanguageFeatureHierarchyEncoder(feature_hierarchy_mapping=language_rating_hierarchy_mapping)
         self.language_must_have_hierarchy_encoder = LanguageFeatureHierarchyEncoder(feature_hierarchy_mapping=language_must_have_hierarchy_mapping)
-        self.role_encoder = MultiLabelBinarizer()
+        # fit by fit_encoders (a MultiLabelBinarizer, sklearn is only imported then) or restored from an artifact
+        self.role_encoder: Optional[Union["MultiLabelBinarizer", MultiLabelVocabularyEncoder]] = None
 
-        self._seniority_features = None
-        self._salary_features = None
-        self._degree_features = None
-        self._language_features = None
-        self._role_features = None
+        # frozen by fit_encoders, every transform writes the feature groups into these columns
+        self.feature_schema = None
         self.feature_names = []
+        # set by partial_fit: the columns of the feature schema in the order of feature_names, None for the schema order
+        self.feature_order: Optional[np.ndarray] = None
+
+        self.encoding_cache_size = encoding_cache_size
+        self._job_encoding_cache = EncodingCache(encoding_cache_size)
+        self._talent_encoding_cache = EncodingCache(encoding_cache_size)
+        self._single_pair_feature_extractor = None
+
+        # transform runs in a pool of n_workers processes for batches larger than chunk_size
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self._process_pool = None
+        self.sparse_output = sparse_output
 
         self.__fitted = False
 
-    def fit_transform(self,
-                data: PairsDataFrame,
-                )->np.ndarray:
-        data = data.copy()
-        if not data.add_language_feature_suffix_flag: #only this format is ok
-            raise NotSetAttributeError("The language_features should be preprocessed by appyling the"
-                                       " add_language_feature_suffix preprocessing step on the PairsDataFrame!")
+    def __getstate__(self):
+        # the encoding caches, the single pair extractor and the process pool are runtime state and are not persisted
+        # with the extractor
+        state = self.__dict__.copy()
+        del state["_job_encoding_cache"], state["_talent_encoding_cache"], state["_single_pair_feature_extractor"]
+        del state["_process_pool"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # extractors persisted before the encoding caches were introduced have no encoding_cache_size
+        self.encoding_cache_size = state.get("encoding_cache_size", ENCODING_CACHE_SIZE)
+        self._job_encoding_cache = EncodingCache(self.encoding_cache_size)
+        self._talent_encoding_cache = EncodingCache(self.encoding_cache_size)
+        self._single_pair_feature_extractor = None
+        self.n_workers = state.get("n_workers", 1)
+        self.chunk_size = state.get("chunk_size", PARALLEL_CHUNK_SIZE)
+        self._process_pool = None
+        self.sparse_output = state.get("sparse_output", False)
+        self.feature_order = state.get("feature_order")
+
+        # extractors persisted before the feature schema was introduced kept the features of the last call and
+        # extended the feature names on every call
+        for per_call_attribute in ("_seniority_features", "_salary_features", "_degree_features",
+                                   "_language_features", "_role_features"):
+            self.__dict__.pop(per_call_attribute, None)
+        if "feature_schema" not in state:
+            self.feature_schema = self.build_feature_schema() if self.__fitted else None
+            self.feature_names = list(self.feature_schema.feature_names) if self.__fitted else []
+
+    def get_config(self) -> dict:
+        """
+        JSON serializable description of everything the features depend on, apart from the data: the hierarchy
+        mappings, the language mapping order, the output format and, once fitted, the frozen feature names.
+        :return:
+        """
+        # dense extractors keep the configuration (and thereby the feature store keys) they had before sparse_output
+        output_format = {"sparse_output": True} if self.sparse_output else {}
+        return {**output_format,
+                "class": self.__class__.__name__,
+                "seniority_hierarchy_mapping": self._mapping_items(self.seniority_hierarchy_encoder),
+                "degree_hierarchy_mapping": self._mapping_items(self.degree_hierarchy_encoder),
+                "language_rating_hierarchy_mapping": self._mapping_items(self.language_rating_hierarchy_encoder),
+                "language_must_have_hierarchy_mapping": self._mapping_items(self.language_must_have_hierarchy_encoder),
+                "language_mapping_order": self.language_mapping_order.name,
+                "feature_names": self.feature_names if self.__fitted else None}
+
+    def get_artifact_state(self) -> dict:
+        """
+        JSON serializable fitted state of the extractor (the hierarchy mappings, vocabularies, feature schema and
+        settings), from which from_artifact_state rebuilds it without unpickling (see inference.model_artifact).
+        :return:
+        """
+        if not self.__fitted:
+            raise NotFittedError("Only fitted feature extractors can be stored as artifacts.")
+        return {"class": self.__class__.__name__,
+                "seniority_hierarchy_mapping": self._mapping_items(self.seniority_hierarchy_encoder),
+                "degree_hierarchy_mapping": self._mapping_items(self.degree_hierarchy_encoder),
+                "language_rating_hierarchy_mapping": self._mapping_items(self.language_rating_hierarchy_encoder),
+                "language_must_have_hierarchy_mapping": self._mapping_items(self.language_must_have_hierarchy_encoder),
+                "language_mapping_order": self.language_mapping_order.name,
+                "language_vocabulary": list(self.language_rating_hierarchy_encoder.classes_),
+                "language_must_have_vocabulary": self.language_must_have_hierarchy_encoder.classes_,
+                "role_vocabulary": [str(role) for role in self.role_encoder.classes_],
+                "feature_schema": [[group, self.feature_schema.group_feature_names(group)]
+                                   for group in self.feature_schema.groups],
+                "encoding_cache_size": self.encoding_cache_size,
+                "n_workers": self.n_workers,
+                "chunk_size": self.chunk_size,
+                "sparse_output": self.sparse_output,
+                "feature_order": None if self.feature_order is None else self.feature_order.tolist()}
+
+    @classmethod
+    def from_artifact_state(cls, state: dict) -> "BaselineFeatureExtractor":
+        """
+        Rebuild a fitted extractor from the output of get_artifact_state.
+        :param state:
+        :return:
+        """
+        if state.get("class") != cls.__name__:
+            raise UnsupportedArtifactError(f"Expected the state of a {cls.__name__}, got {state.get('class')}.")
+        feature_extractor = cls(seniority_hierarchy_mapping=dict(state["seniority_hierarchy_mapping"]),
+                                degree_hierarchy_mapping=dict(state["degree_hierarchy_mapping"]),
+                                language_rating_hierarchy_mapping=dict(state["language_rating_hierarchy_mapping"]),
+                                language_must_have_hierarchy_mapping=dict(state["language_must_have_hierarchy_mapping"]),
+                                language_mapping_order=LanguageFeaturesOrder[state["language_mapping_order"]],
+                                encoding_cache_size=state["encoding_cache_size"],
+                                n_workers=state["n_workers"],
+                                chunk_size=state["chunk_size"],
+                                sparse_output=state["sparse_output"])
+        feature_extractor.language_rating_hierarchy_encoder = LanguageFeatureHierarchyEncoder(
+            dict(state["language_rating_hierarchy_mapping"]), state["language_vocabulary"])
+        feature_extractor.language_must_have_hierarchy_encoder = LanguageFeatureHierarchyEncoder(
+            dict(state["language_must_have_hierarchy_mapping"]), state["language_must_have_vocabulary"])
+        # the fitted vocabulary, in its order
+        feature_extractor.role_encoder = MultiLabelVocabularyEncoder(state["role_vocabulary"])
+
+        feature_extractor.feature_schema = feature_extractor.build_feature_schema()
+        if feature_extractor.feature_schema != FeatureSchema(state["feature_schema"]):
+            raise UnsupportedArtifactError("The stored feature schema does not match the one of the stored vocabularies.")
+        if state.get("feature_order") is not None:
+            feature_extractor.feature_order = np.array(state["feature_order"], dtype=np.intp)
+            if sorted(state["feature_order"]) != list(range(feature_extractor.feature_schema.n_features)):
+                raise UnsupportedArtifactError("The stored feature order is not a permutation of the feature schema.")
+        feature_extractor.feature_names = feature_extractor.ordered_feature_names()
+        feature_extractor.__fitted = True
+        return feature_extractor
+
+    def produces_same_features(self, other: "BaselineFeatureExtractor") -> bool:
+        """
+        Whether both fitted extractors compute identical features for all data, i.e. have the same mappings,
+        vocabularies and feature schema. The runtime settings (cache, workers, output format) are not compared.
+        :param other:
+        :return:
+        """
+        runtime_settings = ("encoding_cache_size", "n_workers", "chunk_size", "sparse_output")
+        own_state, other_state = self.get_artifact_state(), other.get_artifact_state()
+        return all(own_state[key] == other_state.get(key) for key in own_state if key not in runtime_settings)
 
-        # N x dim
-        self._seniority_features = self.compute_seniority_features(data)
-        self._salary_features = self.compute_salary_features(data)
-        self._degree_features = self.compute_degree_features(data)
-        self._language_features = self.compute_language_features(data)
-        self._role_features = self.compute_role_features(data)
+    @staticmethod
+    def _mapping_items(encoder: FeatureHierarchyEncoder) -> List[Tuple[str, int]]:
+        return [(str(key), int(value)) for key, value in encoder.feature_hierarchy_mapping.items()]
 
+    def fit(self, data: PairsDataFrame) -> "BaselineFeatureExtractor":
+        """
+        Fit the encoders on the data, also if the extractor is fitted already.
+        :param data:
+        :return:
+        """
+        self._check_language_feature_suffix(data)
+        self.fit_encoders(data)
         self.__fitted = True
-        return np.hstack((self._seniority_features,
-                         self._salary_features,
-                         self._degree_features,
-                         self._language_features,
-                         self._role_features))
+        return self
 
-    def transform(self,
+    def fit_transform(self,
                 data: PairsDataFrame,
                 )->np.ndarray:
+        self._check_language_feature_suffix(data)
         if not self.__fitted:
-            raise NotFittedError("Algorithm not yet fitted in fit_transform")
-        return self.fit_transform(data)
-
-    def compute_role_features(self, data: PairsDataFrame)->np.ndarray:
-        logger.info("Computing role features: difference, overall intersection.")
+            self.fit_encoders(data)
+            self.__fitted = True
+        return self.transform_serial(data)
 
-        encoded_roles_talent, encoded_roles_job = self.feature_hierarchy_encoding(self.role_encoder,
-                                                                                  data.talents.job_roles,
-                                                                                  data.jobs.job_roles)
-
-        differences = self.binary_difference_encoding(encoded_roles_job, encoded_roles_talent)
-        intersection = np.array(encoded_roles_talent*encoded_roles_job).sum(axis = 1)
+    def transform(self,
+                data: PairsDataFrame,
+                )->Union[np.ndarray, "csr_matrix"]:
+        if not self.__fitted:
+            raise NotFittedError("Algorithm not yet fitted in fit_transform")
+        if self.n_workers > 1 and len(data) > self.chunk_size:
+            if self._process_pool is None:
+                self._process_pool = create_process_pool(self, self.n_workers)
+            return parallel_transform(self._process_pool, data, self.chunk_size)
+        return self.transform_serial(data)
 
-        feature_names = self.feature_names_from_label_encoder("job_role_diff_", self.role_encoder) + ["job_role_intersection"]
-        self.feature_names.extend(feature_names)
+    def transform_serial(self, data: PairsDataFrame) -> Union[np.ndarray, "csr_matrix"]:
+        """
+        Transform in the current process, regardless of n_workers.
+        :param data:
+        :return:
+        """
+        if not self.__fitted:
+            raise NotFittedError("Algorithm not yet fitted in fit_transform")
+        self._check_language_feature_suffix(data)
+
+        # the distinct entities are encoded once, the pairs index into their encodings
+        if isinstance(data, NormalizedPairsDataFrame):
+            with stage("featurize.encode_jobs", len(data.unique_jobs)):
+                unique_jobs, job_idx = self.encode_jobs_cached(data.unique_jobs), data.job_idx
+            with stage("featurize.encode_talents", len(data.unique_talents)):
+                unique_talents, talent_idx = self.encode_talents_cached(data.unique_talents), data.talent_idx
+        else:
+            with stage("featurize.encode_jobs", len(data.jobs)):
+                unique_jobs, job_idx = self._encode_unique_with_cache(data.jobs, self.encode_jobs,
+                                                                      self._job_encoding_cache, EncodedJobs,
+                                                                      self.job_field_widths())
+            with stage("featurize.encode_talents", len(data.talents)):
+                unique_talents, talent_idx = self._encode_unique_with_cache(data.talents, self.encode_talents,
+                                                                            self._talent_encoding_cache,
+                                                                            EncodedTalents,
+                                                                            self.talent_field_widths())
+
+        if self.sparse_output:
+            return self.compute_sparse_pair_features(unique_jobs, job_idx, unique_talents, talent_idx)
+        return self.compute_pair_features(unique_jobs.take(job_idx), unique_talents.take(talent_idx))
+
+    @staticmethod
+    def _check_language_feature_suffix(data: PairsDataFrame):
+        if not data.add_language_feature_suffix_flag: #only this format is ok
+            raise NotSetAttributeError("The language_features should be preprocessed by appyling the"
+                                       " add_language_feature_suffix preprocessing step on the PairsDataFrame!")
 
-        return np.hstack((differences, intersection[:, None]))
+    def close(self):
+        """
+        Shut down the process pool of the parallel transform (if any). It is recreated when needed.
+        :return:
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown()
+            self._process_pool = None
 
-    def compute_language_features(self, data: PairsDataFrame) -> np.ndarray:
-        logger.info("Computing language features: rating difference and must have difference.")
-        # N x L
-        encoded_rating_talents, encoded_rating_jobs = self.encode_language_rating(data)
+    def fit_encoders(self, data: PairsDataFrame):
+        """
+        Fit the encoders whose classes are learned from the data: the role encoder is always fit on the talents,
+        the language encoders on the side given by the language_mapping_order.
+        :param data:
+        :return:
+        """
+        jobs, talents = self._distinct_entities(data)
+        from sklearn.preprocessing import MultiLabelBinarizer
+        self.role_encoder = MultiLabelBinarizer().fit(talents.job_roles)
+        self.language_rating_hierarchy_encoder.fit(self._language_fit_data(jobs, talents))
 
         # instead of doing redundant fitting simply reuse the classes fit by the rating encoder
         self.language_must_have_hierarchy_encoder.classes_ = self.language_rating_hierarchy_encoder.classes_
-        encoded_must_have_jobs = self.language_rating_hierarchy_encoder.transform(data.jobs.must_have_languages)
-        encoded_title_talents = (encoded_rating_talents>0).astype(int)
-
-        language_rating_difference_feature = np.array(encoded_rating_talents - encoded_rating_jobs)
-        language_must_have_difference_feature = self.binary_difference_encoding(encoded_must_have_jobs, encoded_title_talents)
-
-        rating_feature_names = self.feature_names_from_label_encoder("language_rating_diff_",
-                                                                     self.language_rating_hierarchy_encoder)
-        must_have_feature_names = self.feature_names_from_label_encoder("language_must_have_",
-                                                                     self.language_rating_hierarchy_encoder)
 
-        self.feature_names.extend(rating_feature_names + must_have_feature_names)
+        self.feature_schema = self.build_feature_schema()
+        self.feature_order = None
+        self.feature_names = list(self.feature_schema.feature_names)
+        self._reset_runtime_state()
 
-        return np.hstack((language_rating_difference_feature, language_must_have_difference_feature))
+    def partial_fit(self, data: PairsDataFrame) -> "BaselineFeatureExtractor":
+        """
+        Append the job roles and languages of the data which are not known yet to the vocabularies (fit on the same
+        side as in fit_encoders), without refitting. The features of the new entries are appended behind the current
+        features, whose columns do not change. Fits the extractor if it is not fitted yet.
+        :param data:
+        :return:
+        """
+        self._check_language_feature_suffix(data)
+        if not self.__fitted:
+            self.fit_encoders(data)
+            self.__fitted = True
+            return self
+
+        jobs, talents = self._distinct_entities(data)
+        new_roles = sorted(set(chain.from_iterable(talents.job_roles)).difference(self.role_encoder.classes_))
+        if new_roles:
+            self.role_encoder = MultiLabelVocabularyEncoder(list(self.role_encoder.classes_) + new_roles)
+        new_languages = self.language_rating_hierarchy_encoder.partial_fit(self._language_fit_data(jobs, talents))
+        self.language_must_have_hierarchy_encoder.classes_ = self.language_rating_hierarchy_encoder.classes_
+        if not new_roles and not new_languages:
+            return self
+
+        previous_feature_names = self.feature_names
+        known_feature_names = set(previous_feature_names)
+        self.feature_schema = self.build_feature_schema()
+        schema_positions = {name: i for i, name in enumerate(self.feature_schema.feature_names)}
+        appended_feature_names = [name for name in self.feature_schema.feature_names if name not in known_feature_names]
+        self.feature_order = np.array([schema_positions[name]
+                                       for name in previous_feature_names + appended_feature_names], dtype=np.intp)
+        self.feature_names = self.ordered_feature_names()
+        self._reset_runtime_state()
+        logger.info(f"Extended the vocabularies by {len(new_roles)} job roles and {len(new_languages)} languages, "
+                    f"{len(appended_feature_names)} features appended.")
+        return self
+
+    def extend_features(self,
+                        features: Union[np.ndarray, "csr_matrix"],
+                        feature_names: List[str]) -> Union[np.ndarray, "csr_matrix"]:
+        """
+        Extend features computed before partial_fit (e.g. stored in a FeatureStore) to the current features, to retrain
+        on them together with newly computed features. The appended columns are zero, which is their value for the
+        pairs in which the new vocabulary entries do not occur; pairs which contain them have to be transformed again.
+        :param features: dense or sparse N x F features
+        :param feature_names: the F feature names the features were computed with
+        :return: N x len(feature_names) features of the same type
+        """
+        feature_names = list(feature_names)
+        if feature_names != self.feature_names[:len(feature_names)] or features.shape[1] != len(feature_names):
+            raise ValueError("Only features whose names are the first feature names of the extractor can be extended.")
+        n_appended = len(self.feature_names) - len(feature_names)
+        if isinstance(features, np.ndarray):
+            return np.hstack([features, np.zeros((features.shape[0], n_appended), dtype=features.dtype)])
+        from scipy import sparse
+        return sparse.hstack([features, sparse.csr_matrix((features.shape[0], n_appended), dtype=features.dtype)],
+                             format="csr")
+
+    def ordered_feature_names(self) -> List[str]:
+        if self.feature_order is None:
+            return list(self.feature_schema.feature_names)
+        return [self.feature_schema.feature_names[i] for i in self.feature_order]
+
+    def _order_features(self, features: Union[np.ndarray, "csr_matrix"]) -> Union[np.ndarray, "csr_matrix"]:
+        # the groups are computed in the order of the feature schema, the features of the vocabulary entries added by
+        # partial_fit are then moved behind the previous features
+        if self.feature_order is None:
+            return features
+        return features[:, self.feature_order]
+
+    @staticmethod
+    def _distinct_entities(data: PairsDataFrame) -> Tuple[ItemDataFrameBase, ItemDataFrameBase]:
+        # the classes only depend on the distinct values, so normalized pairs are fit on their unique entities
+        if isinstance(data, NormalizedPairsDataFrame):
+            return data.unique_jobs, data.unique_talents
+        return data.jobs, data.talents
+
+    def _language_fit_data(self, jobs: JobsDataFrame, talents: TalentsDataFrame) -> pd.Series:
+        if self.language_mapping_order == LanguageFeaturesOrder.TALENTS:
+            return talents.rating_languages
+        if self.language_mapping_order == LanguageFeaturesOrder.JOBS:
+            return jobs.rating_languages
+        raise ValueError(f"The value of language_mapping_order: {self.language_mapping_order}, is not supported.")
+
+    def _reset_runtime_state(self):
+        # cached encodings, the single pair extractor and the workers follow the previous fit
+        self._job_encoding_cache.clear()
+        self._talent_encoding_cache.clear()
+        self._single_pair_feature_extractor = None
+        self.close()
+
+    def transform_pair(self, talent: dict, job: dict) -> np.ndarray:
+        """
+        Low latency transform of a single raw talent and job (in the format provided in the task), which bypasses the
+        PairsDataFrame loading pipeline and returns the same 1 x F features as transform.
+        :param talent:
+        :param job:
+        :return:
+        """
+        if not self.__fitted:
+            raise NotFittedError("Algorithm not yet fitted in fit_transform")
+        if self._single_pair_feature_extractor is None:
+            self._single_pair_feature_extractor = SinglePairFeatureExtractor(self.seniority_hierarchy_encoder,
+                                                                             self.degree_hierarchy_encoder,
+                                                                             self.language_rating_hierarchy_encoder,
+                                                                             self.role_encoder)
+        with stage("featurize.single_pair", 1):
+            return self._order_features(self._single_pair_feature_extractor.transform(talent, job))
+
+    def encode_jobs(self, jobs: JobsDataFrame) -> EncodedJobs:
+        """
+        Encode the job side of the pair features once per job.
+        :param jobs:
+        :return:
+        """
+        if not self.__fitted:
+            raise NotFittedError("Algorithm not yet fitted in fit_transform")
+        min_required_seniority, max_required_seniority = self.seniority_hierarchy_encoder.encode_min_max(jobs.seniorities)
+
+        return EncodedJobs.from_fields(self.job_field_widths(),
+                                       seniority_min=min_required_seniority,
+                                       seniority_max=max_required_seniority,
+                                       min_degree=self.degree_hierarchy_encoder.encode(jobs.min_degree),
+                                       rating_languages=self.language_rating_hierarchy_encoder.transform_with_titles(jobs.title_languages,
+                                                                                                                     jobs.rating_languages),
+                                       must_have_languages=self.language_rating_hierarchy_encoder.transform_with_titles(jobs.title_languages,
+                                                                                                                        jobs.must_have_languages),
+                                       job_roles=self.role_encoder.transform(jobs.job_roles),
+                                       max_salary=jobs.max_salary.values)
+
+    def encode_talents(self, talents: TalentsDataFrame) -> EncodedTalents:
+        """
+        Encode the talent side of the pair features once per talent.
+        :param talents:
+        :return:
+        """
+        if not self.__fitted:
+            raise NotFittedError("Algorithm not yet fitted in fit_transform")
+        encoded_rating_talents = self.language_rating_hierarchy_encoder.transform_with_titles(talents.title_languages,
+                                                                                              talents.rating_languages)
+
+        return EncodedTalents.from_fields(self.talent_field_widths(),
+                                          seniority=self.seniority_hierarchy_encoder.encode(talents.seniority),
+                                          degree=self.degree_hierarchy_encoder.encode(talents.degree),
+                                          rating_languages=encoded_rating_talents,
+                                          title_languages=(encoded_rating_talents>0).astype(int),
+                                          job_roles=self.role_encoder.transform(talents.job_roles),
+                                          salary_expectation=talents.salary_expectation.values)
+
+    def encode_jobs_cached(self, jobs: JobsDataFrame) -> EncodedJobs:
+        """
+        Same as encode_jobs, but every distinct job is encoded only once per batch, and only if it is not found in the
+        job encoding cache. The rows of the pairs are then gathered from the encodings of the distinct jobs.
+        :param jobs:
+        :return:
+        """
+        return self._encode_with_cache(jobs, self.encode_jobs, self._job_encoding_cache,
+                                       EncodedJobs, self.job_field_widths())
 
-    def compute_degree_features(self, data: PairsDataFrame)->np.ndarray:
-        logger.info("Computing seniority features: required, available, difference.")
-        encoded_degree_jobs, encoded_degree_talents = self.feature_hierarchy_encoding(self.degree_hierarchy_encoder,
-                                                                                      data.jobs.min_degree,
-                                                                                      data.talents.degree)
-        degree_difference = encoded_degree_jobs - encoded_degree_talents
+    def encode_talents_cached(self, talents: TalentsDataFrame) -> EncodedTalents:
+        """
+        Same as encode_talents, but cached (see encode_jobs_cached).
+        :param talents:
+        :return:
+        """
+        return self._encode_with_cache(talents, self.encode_talents, self._talent_encoding_cache,
+                                       EncodedTalents, self.talent_field_widths())
+
+    def _encode_with_cache(self,
+                           items: ItemDataFrameBase,
+                           encode: Callable[[ItemDataFrameBase], EncodedEntities],
+                           cache: EncodingCache,
+                           encoded_class: Type[EncodedEntities],
+                           field_widths: List[Tuple[str, int]]) -> EncodedEntities:
+        unique_encoded, item_codes = self._encode_unique_with_cache(items, encode, cache, encoded_class, field_widths)
+        return unique_encoded.take(item_codes)
+
+    def _encode_unique_with_cache(self,
+                                  items: ItemDataFrameBase,
+                                  encode: Callable[[ItemDataFrameBase], EncodedEntities],
+                                  cache: EncodingCache,
+                                  encoded_class: Type[EncodedEntities],
+                                  field_widths: List[Tuple[str, int]]) -> Tuple[EncodedEntities, np.ndarray]:
+        """
+        :return: the encodings of the distinct items, and the position of every item among them
+        """
+        if cache.maxsize <= 0:
+            return encode(items), np.arange(len(items))
+
+        # node ids identify the distinct items of the batch, the content hash identifies them across batches
+        item_codes, _ = pd.factorize(items.node_id)
+        _, first_positions = np.unique(item_codes, return_index=True)
+        content_hashes = compute_content_hashes(items.data.iloc[first_positions]).values
+
+        unique_rows = [cache.get(content_hash) for content_hash in content_hashes]
+        missing = [i for i, row in enumerate(unique_rows) if row is None]
+        if missing:
+            encoded = encode(items.iloc[list(first_positions[missing])])
+            for i, row in zip(missing, encoded.table):
+                unique_rows[i] = row.copy()
+                cache.put(content_hashes[i], unique_rows[i])
+
+        return encoded_class(np.vstack(unique_rows), EncodedEntities.compute_layout(field_widths)), item_codes
+
+    def job_field_widths(self) -> List[Tuple[str, int]]:
+        n_languages = len(self.language_rating_hierarchy_encoder.classes_)
+        return [("seniority_min", 1), ("seniority_max", 1), ("min_degree", 1),
+                ("rating_languages", n_languages), ("must_have_languages", n_languages),
+                ("job_roles", len(self.role_encoder.classes_)), ("max_salary", 1)]
+
+    def talent_field_widths(self) -> List[Tuple[str, int]]:
+        n_languages = len(self.language_rating_hierarchy_encoder.classes_)
+        return [("seniority", 1), ("degree", 1),
+                ("rating_languages", n_languages), ("title_languages", n_languages),
+                ("job_roles", len(self.role_encoder.classes_)), ("salary_expectation", 1)]
+
+    def build_feature_schema(self) -> FeatureSchema:
+        """
+        Names and columns of the feature groups, as given by the fitted encoders.
+        :return:
+        """
+        return FeatureSchema([
+            ("seniority", ["min_required_seniority", "max_required_seniority", "seniority_talents",
+                           "seniority_diff_min", "seniority_diff_max"]),
+            ("salary", ["salary_diff"]),
+            ("degree", ['min_degree_hierarchic_job', 'degree_hierarchic_talent', "degree_diff"]),
+            ("language", self.feature_names_from_label_encoder("language_rating_diff_",
+                                                               self.language_rating_hierarchy_encoder) +
+                         self.feature_names_from_label_encoder("language_must_have_",
+                                                               self.language_rating_hierarchy_encoder)),
+            ("role", self.feature_names_from_label_encoder("job_role_diff_", self.role_encoder) +
+                     ["job_role_intersection"])])
+
+    def compute_pair_features(self, jobs: EncodedJobs, talents: EncodedTalents) -> np.ndarray:
+        """
+        Compute the pair features from encoded jobs and talents. The two are either aligned row by row, or one of them
+        holds a single item, which is then broadcast against all items of the other. Every feature group is written
+        into its columns of a single preallocated N x F matrix.
+        :param jobs:
+        :param talents:
+        :return:
+        """
+        n_pairs = self.n_pairs(jobs, talents)
+        # N x F
+        features = np.empty((n_pairs, self.feature_schema.n_features))
+        with stage("featurize.seniority", n_pairs):
+            self.compute_seniority_features(jobs, talents, out=features[:, self.feature_schema.columns("seniority")])
+        with stage("featurize.salary", n_pairs):
+            self.compute_salary_features(jobs, talents, out=features[:, self.feature_schema.columns("salary")])
+        with stage("featurize.degree", n_pairs):
+            self.compute_degree_features(jobs, talents, out=features[:, self.feature_schema.columns("degree")])
+        with stage("featurize.language", n_pairs):
+            self.compute_language_features(jobs, talents, out=features[:, self.feature_schema.columns("language")])
+        with stage("featurize.role", n_pairs):
+            self.compute_role_features(jobs, talents, out=features[:, self.feature_schema.columns("role")])
+        return self._order_features(features)
+
+    def compute_sparse_pair_features(self,
+                                     jobs: EncodedJobs,
+                                     job_idx: np.ndarray,
+                                     talents: EncodedTalents,
+                                     talent_idx: np.ndarray) -> "csr_matrix":
+        """
+        Sparse version of compute_pair_features for the pairs (jobs[job_idx[i]], talents[talent_idx[i]]). Only the
+        scalar fields are gathered per pair, the role and language blocks are gathered as sparse rows, and the role
+        and language groups computed on them.
+        :param jobs: encodings of the distinct jobs
+        :param job_idx: position of the job of every pair
+        :param talents: encodings of the distinct talents
+        :param talent_idx: position of the talent of every pair
+        :return: N x F CSR matrix, equal to the dense features
+        """
+        from scipy import sparse
+        if len(job_idx) != len(talent_idx):
+            raise ValueError(f"Cannot pair {len(job_idx)} jobs with {len(talent_idx)} talents.")
+        n_pairs = len(job_idx)
+        blocks = {}
+
+        scalar_jobs = jobs.select(["seniority_min", "seniority_max", "min_degree", "max_salary"]).take(job_idx)
+        scalar_talents = talents.select(["seniority", "degree", "salary_expectation"]).take(talent_idx)
+        for group, compute_features in [("seniority", self.compute_seniority_features),
+                                        ("salary", self.compute_salary_features),
+                                        ("degree", self.compute_degree_features)]:
+            with stage(f"featurize.{group}", n_pairs):
+                blocks[group] = sparse.csr_matrix(compute_features(scalar_jobs, scalar_talents))
+
+        def pair_rows(encoded: EncodedEntities, field: str, idx: np.ndarray) -> "csr_matrix":
+            return sparse.csr_matrix(encoded.block(field))[idx]
+
+        with stage("featurize.language", n_pairs):
+            rating_differences = pair_rows(talents, "rating_languages", talent_idx) - \
+                pair_rows(jobs, "rating_languages", job_idx)
+            rating_differences.eliminate_zeros()
+            must_have_differences = self.sparse_binary_difference_encoding(
+                pair_rows(jobs, "must_have_languages", job_idx), pair_rows(talents, "title_languages", talent_idx))
+            blocks["language"] = sparse.hstack([rating_differences, must_have_differences], format="csr")
+
+        with stage("featurize.role", n_pairs):
+            role_differences = self.sparse_binary_difference_encoding(pair_rows(jobs, "job_roles", job_idx),
+                                                                      pair_rows(talents, "job_roles", talent_idx))
+            # 3 encodes roles which are both required and present
+            pair_of_entry = np.repeat(np.arange(n_pairs), np.diff(role_differences.indptr))
+            intersection = np.bincount(pair_of_entry[role_differences.data == 3], minlength=n_pairs)
+            blocks["role"] = sparse.hstack([role_differences,
+                                            sparse.csr_matrix(intersection.astype(np.float64)[:, np.newaxis])],
+                                           format="csr")
+
+        return self._order_features(sparse.hstack([blocks[group] for group in self.feature_schema.groups], format="csr"))
+
+    @staticmethod
+    def n_pairs(jobs: EncodedJobs, talents: EncodedTalents) -> int:
+        if len(jobs) == len(talents) or len(talents) == 1:
+            return len(jobs)
+        if len(jobs) == 1:
+            return len(talents)
+        raise ValueError(f"Cannot pair {len(jobs)} jobs with {len(talents)} talents.")
+
+    def _allocate_group(self, jobs: EncodedJobs, talents: EncodedTalents, group: str,
+                        out: Optional[np.ndarray]) -> np.ndarray:
+        if out is None:
+            out = np.empty((self.n_pairs(jobs, talents), self.feature_schema.width(group)))
+        return out
+
+    def compute_role_features(self, jobs: EncodedJobs, talents: EncodedTalents,
+                              out: Optional[np.ndarray] = None)->np.ndarray:
+        out = self._allocate_group(jobs, talents, "role", out)
+
+        differences = self.binary_difference_encoding(jobs.job_roles, talents.job_roles, out=out[:, :-1])
+        # 3 encodes roles which are both required and present
+        np.sum(differences == 3, axis=1, out=out[:, -1])
+        return out
+
+    def compute_language_features(self, jobs: EncodedJobs, talents: EncodedTalents,
+                                  out: Optional[np.ndarray] = None) -> np.ndarray:
+        out = self._allocate_group(jobs, talents, "language", out)
+        n_languages = len(self.language_rating_hierarchy_encoder.classes_)
 
-        self.feature_names.extend(['min_degree_hierarchic_job', 'degree_hierarchic_talent', "degree_diff"])
-        return np.hstack((encoded_degree_jobs.values[:, None],
-                         encoded_degree_talents.values[:, None],
-                         degree_difference.values[:, None]))
+        # N x L
+        np.subtract(talents.rating_languages, jobs.rating_languages, out=out[:, :n_languages])
+        self.binary_difference_encoding(jobs.must_have_languages, talents.title_languages, out=out[:, n_languages:])
+        return out
 
-    def compute_salary_features(self, data: PairsDataFrame)->np.ndarray:
-        logger.info("Computing salary features: difference.")
-        salary_difference_feature = data.jobs.max_salary.values - data.talents.salary_expectation.values
+    def compute_degree_features(self, jobs: EncodedJobs, talents: EncodedTalents,
+                                out: Optional[np.ndarray] = None)->np.ndarray:
+        out = self._allocate_group(jobs, talents, "degree", out)
 
-        self.feature_names.append("salary_diff")
-        return salary_difference_feature[:, None]
+        out[:, 0] = jobs.min_degree
+        out[:, 1] = talents.degree
+        np.subtract(out[:, 0], out[:, 1], out=out[:, 2])
+        return out
 
-    def compute_seniority_features(self, data: PairsDataFrame)->np.ndarray:
-        logger.info("Computing seniority features:min required, max required, actual,"
-                    " difference from min required, and difference from max required.")
-        encoded_seniority_jobs, encoded_seniority_talents = self.feature_hierarchy_encoding(self.seniority_hierarchy_encoder,
-                                                                                            data.jobs.seniorities,
-                                                                                            data.talents.seniority)
-        max_required_seniority = encoded_seniority_jobs.apply(max).values
-        min_required_seniority = encoded_seniority_jobs.apply(min).values
-        encoded_seniority_talents = encoded_seniority_talents.values
+    def compute_salary_features(self, jobs: EncodedJobs, talents: EncodedTalents,
+                                out: Optional[np.ndarray] = None)->np.ndarray:
+        out = self._allocate_group(jobs, talents, "salary", out)
 
-        seniority_difference_feature_max = encoded_seniority_talents - max_required_seniority
-        seniority_difference_feature_min = encoded_seniority_talents - min_required_seniority
+        np.subtract(jobs.max_salary, talents.salary_expectation, out=out[:, 0])
+        return out
 
-        self.feature_names.extend(["min_required_seniority", "max_required_seniority", "seniority_talents", "seniority_diff_min", "seniority_diff_max"])
-        return np.hstack((min_required_seniority[:, None],
-                          max_required_seniority[:, None],
-                          encoded_seniority_talents[:, None],
-                          seniority_difference_feature_min[:, None],
-                          seniority_difference_feature_max[:, None]))
+    def compute_seniority_features(self, jobs: EncodedJobs, talents: EncodedTalents,
+                                   out: Optional[np.ndarray] = None)->np.ndarray:
+        out = self._allocate_group(jobs, talents, "seniority", out)
 
+        out[:, 0] = jobs.seniority_min
+        out[:, 1] = jobs.seniority_max
+        out[:, 2] = talents.seniority
+        np.subtract(out[:, 2], out[:, 0], out=out[:, 3])
+        np.subtract(out[:, 2], out[:, 1], out=out[:, 4])
+        return out
 
     def feature_names_from_label_encoder(self, feature_prefix: str,
-                                         label_encoder: Union[FeatureHierarchyEncoder, MultiLabelBinarizer])->List[str]:
+                                         label_encoder: Union[FeatureHierarchyEncoder, "MultiLabelBinarizer",
+                                                              MultiLabelVocabularyEncoder])->List[str]:
         return [feature_prefix + role for role in label_encoder.classes_]
 
-    def binary_difference_encoding(self, a: Union[np.ndarray, pd.Series], b: Union[np.ndarray, pd.Series]):
+    def binary_difference_encoding(self, a: Union[np.ndarray, pd.Series], b: Union[np.ndarray, pd.Series],
+                                   out: Optional[np.ndarray] = None):
         """
         a and b are assumed to have binary values
         :param a:
         :param b:
+        :param out: optional array to write the encoding into
         :return: 0 neither required nor present, 1 present but not required, -1 required but not present, 3 required and present
 
         """
-        binary_difference = np.array(a*2 + b)
+        if out is None:
+            binary_difference = np.array(a*2 + b)
+        else:
+            binary_difference = np.multiply(a, 2, out=out)
+            binary_difference += b
         binary_difference[binary_difference == 2] = -1
         return binary_difference
 
-    def feature_hierarchy_encoding(self,
-                                   feature_hierarchy_encoder: Union[FeatureHierarchyEncoder, MultiLabelBinarizer],
-                                   features_fit_transform: pd.Series,
-                                   features_transform: pd.Series) -> Tuple[Union[pd.Series, np.ndarray],...]:
-        if not self.__fitted:
-            encoded_a = feature_hierarchy_encoder.fit_transform(features_fit_transform)
-        else:
-            encoded_a = feature_hierarchy_encoder.transform(features_fit_transform)
-        encoded_b = feature_hierarchy_encoder.transform(features_transform)
-        return encoded_a, encoded_b
-
-    def encode_language_rating(self, data: PairsDataFrame)->Tuple[np.ndarray,...]:
-        if self.language_mapping_order == LanguageFeaturesOrder.TALENTS:
-            encoded_rating_talents, encoded_rating_jobs = self.feature_hierarchy_encoding(self.language_rating_hierarchy_encoder,
-                                                                                          data.talents.rating_languages,
-                                                                                          data.jobs.rating_languages)
-
-        elif self.language_mapping_order == LanguageFeaturesOrder.JOBS:
-            encoded_rating_jobs, encoded_rating_talents = self.feature_hierarchy_encoding(self.language_rating_hierarchy_encoder,
-                                                                                          data.jobs.rating_languages,
-                                                                                          data.talents.rating_languages)
-
-        else:
-            raise ValueError(f"The value of language_mapping_order: {self.language_mapping_order}, is not supported.")
-        return encoded_rating_talents, encoded_rating_jobs
\ No newline at end of file
+    @staticmethod
+    def sparse_binary_difference_encoding(a: "csr_matrix", b: "csr_matrix") -> "csr_matrix":
+        """
+        binary_difference_encoding of sparse binary matrices, whose zeros (neither required nor present) stay implicit.
+        :param a:
+        :param b:
+        :return:
+        """
+        binary_difference = (a * 2 + b).tocsr()
+        binary_difference.data[binary_difference.data == 2] = -1
+        return binary_difference
@@ -0,0 +1,123 @@
+import numpy as np
+from typing import Dict, List, Tuple, Union
+
+
+class EncodedEntities:
+    """
+    The encoded side of a set of items (jobs or talents) stored as a single float matrix, in which every encoded
+    field occupies a fixed block of columns. The pair features are then computed from (aligned or broadcast) rows of
+    two such objects, so that each item has to be encoded only once, no matter in how many pairs it appears.
+    """
+    def __init__(self, table: np.ndarray, layout: Dict[str, slice]):
+        self.table = table
+        self.layout = layout
+
+    @staticmethod
+    def compute_layout(field_widths: List[Tuple[str, int]]) -> Dict[str, slice]:
+        layout = {}
+        offset = 0
+        for field, width in field_widths:
+            layout[field] = slice(offset, offset + width)
+            offset += width
+        return layout
+
+    @classmethod
+    def from_fields(cls, field_widths: List[Tuple[str, int]], **fields: np.ndarray) -> "EncodedEntities":
+        layout = cls.compute_layout(field_widths)
+        n_items = len(next(iter(fields.values())))
+        table = np.empty((n_items, list(layout.values())[-1].stop), dtype=np.float64)
+        for field, columns in layout.items():
+            values = np.asarray(fields[field], dtype=np.float64)
+            table[:, columns] = values.reshape(n_items, -1)
+        return cls(table, layout)
+
+    def block(self, name: str) -> np.ndarray:
+        """
+        Return a (N x width) view on the columns of a field.
+        :param name:
+        :return:
+        """
+        return self.table[:, self.layout[name]]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Return a 1-d view on a single column field.
+        :param name:
+        :return:
+        """
+        return self.table[:, self.layout[name].start]
+
+    def take(self, indices: Union[np.ndarray, List[int]]) -> "EncodedEntities":
+        return self.__class__(self.table[indices], self.layout)
+
+    def select(self, fields: List[str]) -> "EncodedEntities":
+        """
+        Copy of the encodings restricted to the given fields.
+        :param fields:
+        :return:
+        """
+        columns = np.concatenate([np.arange(self.layout[field].start, self.layout[field].stop) for field in fields])
+        layout = self.compute_layout([(field, self.layout[field].stop - self.layout[field].start) for field in fields])
+        return self.__class__(self.table[:, columns], layout)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} object with {len(self)} elements. \nFields: {list(self.layout.keys())}."
+
+
+class EncodedJobs(EncodedEntities):
+    @property
+    def seniority_min(self):
+        return self.column("seniority_min")
+
+    @property
+    def seniority_max(self):
+        return self.column("seniority_max")
+
+    @property
+    def min_degree(self):
+        return self.column("min_degree")
+
+    @property
+    def rating_languages(self):
+        return self.block("rating_languages")
+
+    @property
+    def must_have_languages(self):
+        return self.block("must_have_languages")
+
+    @property
+    def job_roles(self):
+        return self.block("job_roles")
+
+    @property
+    def max_salary(self):
+        return self.column("max_salary")
+
+
+class EncodedTalents(EncodedEntities):
+    @property
+    def seniority(self):
+        return self.column("seniority")
+
+    @property
+    def degree(self):
+        return self.column("degree")
+
+    @property
+    def rating_languages(self):
+        return self.block("rating_languages")
+
+    @property
+    def title_languages(self):
+        return self.block("title_languages")
+
+    @property
+    def job_roles(self):
+        return self.block("job_roles")
+
+    @property
+    def salary_expectation(self):
+        return self.column("salary_expectation")
@@ -0,0 +1,43 @@
+import numpy as np
+from collections import OrderedDict
+from typing import Optional, Hashable
+
+
+class EncodingCache:
+    """
+    Bounded LRU cache of encoded rows, keyed by a stable content hash of the item (job or talent) they were encoded
+    from. A maxsize of 0 disables the cache.
+    """
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._rows: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        row = self._rows.get(key)
+        if row is None:
+            self.misses += 1
+            return None
+        self._rows.move_to_end(key)
+        self.hits += 1
+        return row
+
+    def put(self, key: Hashable, row: np.ndarray):
+        if self.maxsize <= 0:
+            return
+        self._rows[key] = row
+        self._rows.move_to_end(key)
+        while len(self._rows) > self.maxsize:
+            self._rows.popitem(last=False)
+
+    def clear(self):
+        self._rows.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(maxsize={self.maxsize}, size={len(self)}, hits={self.hits}, misses={self.misses})"
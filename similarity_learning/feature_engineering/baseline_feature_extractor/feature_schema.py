@@ -0,0 +1,38 @@
+from typing import List, Tuple, Dict
+
+
+class FeatureSchema:
+    """
+    Names and column offsets of the feature groups of the feature matrix. It is frozen when the feature extractor is
+    fitted, so that every transform writes the same columns and the feature names never change.
+    """
+    def __init__(self, groups: List[Tuple[str, List[str]]]):
+        self.groups: Dict[str, slice] = {}
+        self.feature_names: List[str] = []
+        for group, feature_names in groups:
+            self.groups[group] = slice(len(self.feature_names), len(self.feature_names) + len(feature_names))
+            self.feature_names.extend(feature_names)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def columns(self, group: str) -> slice:
+        return self.groups[group]
+
+    def width(self, group: str) -> int:
+        return self.groups[group].stop - self.groups[group].start
+
+    def group_feature_names(self, group: str) -> List[str]:
+        return self.feature_names[self.groups[group]]
+
+    def __len__(self):
+        return self.n_features
+
+    def __eq__(self, other):
+        return isinstance(other, FeatureSchema) and self.feature_names == other.feature_names \
+            and self.groups == other.groups
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} with {self.n_features} features in groups: " \
+               f"{ {group: self.width(group) for group in self.groups} }."
@@ -0,0 +1,55 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from similarity_learning.loading_pipeline import PairsDataFrame
+
+# the fitted feature extractor held by each worker process of the pool
+_worker_feature_extractor = None
+
+
+def create_process_pool(feature_extractor, n_workers: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers each hold a copy of the (fitted) feature extractor, which is thus sent to
+    the workers only once, and not with every chunk.
+    :param feature_extractor:
+    :param n_workers:
+    :return:
+    """
+    return ProcessPoolExecutor(max_workers=n_workers,
+                               initializer=_initialize_worker,
+                               initargs=(feature_extractor,))
+
+
+def parallel_transform(process_pool: ProcessPoolExecutor, data: PairsDataFrame, chunk_size: int) -> np.ndarray:
+    """
+    Split the pairs into chunks of chunk_size pairs, transform them in the process pool and reassemble the feature
+    matrix in the order of the pairs.
+    :param process_pool:
+    :param data:
+    :param chunk_size:
+    :return:
+    """
+    chunks = (data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size))
+
+    features = None
+    sparse_chunks = []
+    for start, chunk_features in zip(range(0, len(data), chunk_size), process_pool.map(_transform_chunk, chunks)):
+        if hasattr(chunk_features, "tocsr"):
+            # sparse features (see BaselineFeatureExtractor.sparse_output) are stacked at the end
+            sparse_chunks.append(chunk_features)
+            continue
+        if features is None:
+            features = np.empty((len(data), chunk_features.shape[1]), dtype=chunk_features.dtype)
+        features[start:start + len(chunk_features)] = chunk_features
+    if sparse_chunks:
+        from scipy import sparse
+        return sparse.vstack(sparse_chunks, format="csr")
+    return features
+
+
+def _initialize_worker(feature_extractor):
+    global _worker_feature_extractor
+    _worker_feature_extractor = feature_extractor
+
+
+def _transform_chunk(data: PairsDataFrame) -> np.ndarray:
+    return _worker_feature_extractor.transform_serial(data)
@@ -0,0 +1,130 @@
+import numpy as np
+from typing import Dict, Any, Optional, Union, TYPE_CHECKING
+from ..feature_hierarchy_encoder import FeatureHierarchyEncoder
+from ..language import LanguageFeatureHierarchyEncoder
+from ..multi_label_vocabulary_encoder import MultiLabelVocabularyEncoder
+if TYPE_CHECKING:
+    from sklearn.preprocessing import MultiLabelBinarizer
+
+N_SENIORITY_FEATURES = 5
+N_SALARY_FEATURES = 1
+N_DEGREE_FEATURES = 3
+
+
+class SinglePairFeatureExtractor:
+    """
+    Low latency path from a single raw talent and job (in the format provided in the task) to the feature vector
+    computed by a fitted BaselineFeatureExtractor, without going through the pandas based loading pipeline. The fitted
+    encoders are snapshotted into plain dictionaries, the features are then written into a preallocated 1 x F array.
+    """
+    def __init__(self,
+                 seniority_hierarchy_encoder: FeatureHierarchyEncoder,
+                 degree_hierarchy_encoder: FeatureHierarchyEncoder,
+                 language_rating_hierarchy_encoder: LanguageFeatureHierarchyEncoder,
+                 role_encoder: Union["MultiLabelBinarizer", MultiLabelVocabularyEncoder]):
+        self.seniority_hierarchy_mapping = dict(seniority_hierarchy_encoder.feature_hierarchy_mapping)
+        self.degree_hierarchy_mapping = dict(degree_hierarchy_encoder.feature_hierarchy_mapping)
+        self.language_rating_hierarchy_mapping = dict(language_rating_hierarchy_encoder.feature_hierarchy_mapping)
+        self.language_idx_map = {language: i for i, language in enumerate(language_rating_hierarchy_encoder.classes_)}
+        self.role_idx_map = {role: i for i, role in enumerate(role_encoder.classes_)}
+
+        n_languages = len(self.language_idx_map)
+        self._language_rating_offset = N_SENIORITY_FEATURES + N_SALARY_FEATURES + N_DEGREE_FEATURES
+        self._language_must_have_offset = self._language_rating_offset + n_languages
+        self._role_offset = self._language_must_have_offset + n_languages
+        self.n_features = self._role_offset + len(self.role_idx_map) + 1
+
+    def transform(self, talent: Dict[str, Any], job: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Compute the 1 x F feature matrix of a single pair.
+        :param talent:
+        :param job:
+        :param out: optional preallocated 1 x F array to write the features into
+        :return:
+        """
+        if out is None:
+            out = np.zeros((1, self.n_features))
+        else:
+            out.fill(0)
+        features = out[0]
+
+        self._compute_seniority_features(talent, job, features)
+        self._compute_salary_features(talent, job, features)
+        self._compute_degree_features(talent, job, features)
+        self._compute_language_features(talent, job, features)
+        self._compute_role_features(talent, job, features)
+        return out
+
+    def _compute_seniority_features(self, talent: Dict[str, Any], job: Dict[str, Any], features: np.ndarray):
+        # not handling the key error since this should be handled in the data loading or elsewhere
+        encoded_seniority_jobs = [self.seniority_hierarchy_mapping[seniority] for seniority in job["seniorities"]]
+        min_required_seniority, max_required_seniority = min(encoded_seniority_jobs), max(encoded_seniority_jobs)
+        encoded_seniority_talent = self.seniority_hierarchy_mapping[talent["seniority"]]
+
+        features[0:N_SENIORITY_FEATURES] = (min_required_seniority,
+                                            max_required_seniority,
+                                            encoded_seniority_talent,
+                                            encoded_seniority_talent - min_required_seniority,
+                                            encoded_seniority_talent - max_required_seniority)
+
+    def _compute_salary_features(self, talent: Dict[str, Any], job: Dict[str, Any], features: np.ndarray):
+        features[N_SENIORITY_FEATURES] = job["max_salary"] - talent["salary_expectation"]
+
+    def _compute_degree_features(self, talent: Dict[str, Any], job: Dict[str, Any], features: np.ndarray):
+        encoded_degree_job = self.degree_hierarchy_mapping[job["min_degree"]]
+        encoded_degree_talent = self.degree_hierarchy_mapping[talent["degree"]]
+
+        offset = N_SENIORITY_FEATURES + N_SALARY_FEATURES
+        features[offset:offset + N_DEGREE_FEATURES] = (encoded_degree_job,
+                                                       encoded_degree_talent,
+                                                       encoded_degree_job - encoded_degree_talent)
+
+    def _compute_language_features(self, talent: Dict[str, Any], job: Dict[str, Any], features: np.ndarray):
+        encoded_rating_talent = self._encode_languages(talent["languages"], "rating")
+        encoded_rating_job = self._encode_languages(job["languages"], "rating")
+        # the must have flags are encoded with the rating hierarchy, as done by BaselineFeatureExtractor
+        encoded_must_have_job = self._encode_languages(job["languages"], "must_have")
+
+        rating_difference = features[self._language_rating_offset:self._language_must_have_offset]
+        must_have_difference = features[self._language_must_have_offset:self._role_offset]
+        for language_idx, value in encoded_rating_talent.items():
+            rating_difference[language_idx] = value
+            must_have_difference[language_idx] = int(value > 0)
+        for language_idx, value in encoded_rating_job.items():
+            rating_difference[language_idx] -= value
+        for language_idx, value in encoded_must_have_job.items():
+            must_have_difference[language_idx] = self._binary_difference(value, must_have_difference[language_idx])
+
+    def _compute_role_features(self, talent: Dict[str, Any], job: Dict[str, Any], features: np.ndarray):
+        # roles unknown to the role encoder are ignored
+        encoded_roles_talent = {self.role_idx_map[role] for role in talent["job_roles"] if role in self.role_idx_map}
+        encoded_roles_job = {self.role_idx_map[role] for role in job["job_roles"] if role in self.role_idx_map}
+
+        role_differences = features[self._role_offset:self.n_features - 1]
+        for role_idx in encoded_roles_talent:
+            role_differences[role_idx] = 1
+        for role_idx in encoded_roles_job:
+            role_differences[role_idx] = self._binary_difference(1, role_differences[role_idx])
+        features[self.n_features - 1] = len(encoded_roles_talent & encoded_roles_job)
+
+    def _encode_languages(self, languages: list, feature_key: str) -> Dict[int, int]:
+        """
+        Map the languages of an item to {language index: hierarchy value}, skipping unknown languages and values.
+        Like in the pandas pipeline, a repeated language keeps its last value.
+        :param languages:
+        :param feature_key:
+        :return:
+        """
+        encoded = {}
+        for language in languages:
+            language_idx = self.language_idx_map.get(language["title"])
+            value = self.language_rating_hierarchy_mapping.get(str(language.get(feature_key)))
+            if language_idx is not None and value is not None:
+                encoded[language_idx] = value
+        return encoded
+
+    @staticmethod
+    def _binary_difference(a: int, b: int) -> int:
+        # see BaselineFeatureExtractor.binary_difference_encoding
+        binary_difference = a * 2 + b
+        return -1 if binary_difference == 2 else binary_difference
@@ -1,4 +1,5 @@
-from typing import Union, Dict, List, Any
+from typing import Union, Dict, List, Any, Tuple
+from itertools import chain
 import numpy as np
 import pandas as pd
 
@@ -18,7 +19,13 @@ class FeatureHierarchyEncoder:
         pass
 
     def transform(self, data: pd.Series) -> pd.Series:
-        return data.apply(self.apply_feature_hierarchy_mapping)
+        if len(data) and isinstance(data.iloc[0], list):
+            values, offsets = self.encode_lists(data)
+            values = values.tolist()
+            bounds = offsets.tolist() + [len(values)]
+            return pd.Series([values[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])],
+                             index=data.index, dtype=object)
+        return pd.Series(self.encode(data), index=data.index)
 
     def fit_transform(self, data: pd.Series) -> pd.Series:
         return self.transform(data)
@@ -29,3 +36,53 @@ class FeatureHierarchyEncoder:
             return [self.feature_hierarchy_mapping[value] for value in feature_value]
         return self.feature_hierarchy_mapping[feature_value]
 
+    def encode(self, data: Union[pd.Series, np.ndarray, List[Any]]) -> np.ndarray:
+        """
+        Vectorized mapping of single valued features to their hierarchy: the values are converted to categorical codes
+        (the position among the keys of feature_hierarchy_mapping), which are then used to take the hierarchy values.
+        :param data:
+        :return:
+        """
+        codes = self.hierarchy_codes(data)
+        if (codes < 0).any():
+            # not handling the key error since this should be handled in the data loading or elsewhere
+            raise KeyError(np.asarray(data, dtype=object)[codes < 0][0])
+        return np.take(self.hierarchy_values(), codes)
+
+    def hierarchy_codes(self, data: Union[pd.Series, np.ndarray, List[Any]]) -> np.ndarray:
+        """
+        Categorical codes of the values, i.e. their position among the keys of feature_hierarchy_mapping,
+        -1 for values that are not part of the hierarchy.
+        :param data:
+        :return:
+        """
+        return pd.Categorical(data, categories=list(self.feature_hierarchy_mapping.keys())).codes
+
+    def hierarchy_values(self) -> np.ndarray:
+        return np.array(list(self.feature_hierarchy_mapping.values()))
+
+    def encode_lists(self, data: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized mapping of list valued features. The lists are flattened into a single array of encoded values,
+        the start of the i-th list in this array is given by offsets[i].
+        :param data:
+        :return: values, offsets
+        """
+        lengths = np.fromiter(map(len, data), dtype=np.int64, count=len(data))
+        offsets = np.zeros(len(data), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+        values = self.encode(list(chain.from_iterable(data)))
+        return values, offsets
+
+    def encode_min_max(self, data: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Minimum and maximum of the hierarchy values of each list in a list valued feature.
+        :param data:
+        :return: minimum, maximum
+        """
+        values, offsets = self.encode_lists(data)
+        if len(offsets) == 0:
+            return values, values
+        if (np.diff(np.append(offsets, len(values))) == 0).any():
+            raise ValueError("Cannot compute the minimum/maximum hierarchy value of an empty list.")
+        return np.minimum.reduceat(values, offsets), np.maximum.reduceat(values, offsets)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Union, List, Optional, Any, TYPE_CHECKING
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame, PairsDataFrame
+from similarity_learning.loading_pipeline.preprocessing.node_id_generation import compute_content_hashes
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+import logging
+logger = logging.getLogger("similarity_learning")
+
+FEATURE_STORE_FORMAT_VERSION = 2
+FEATURES_FILE_NAME = "features.npy"
+# the arrays of sparse (CSR) feature matrices
+SPARSE_FEATURES_FILE_NAMES = {"data": "features_data.npy", "indices": "features_indices.npy",
+                              "indptr": "features_indptr.npy"}
+LABELS_FILE_NAME = "labels.npy"
+METADATA_FILE_NAME = "metadata.json"
+
+
+class StoredFeatures:
+    """
+    Feature matrix, labels and feature names of one entry of the FeatureStore. The arrays are read only memory maps of
+    the stored files, so processes loading the same entry share the pages of the files. Sparse feature matrices are
+    CSR matrices on memory mapped arrays.
+    """
+    def __init__(self, features: Union[np.ndarray, "csr_matrix"], labels: np.ndarray, feature_names: List[str]):
+        self.features = features
+        self.labels = labels
+        self.feature_names = feature_names
+
+    def __len__(self):
+        return self.features.shape[0]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} with {len(self)} pairs and {len(self.feature_names)} features."
+
+
+class FeatureStore:
+    """
+    Directory of precomputed feature matrices, each keyed by the configuration of the feature extractor
+    (see BaselineFeatureExtractor.get_config) and a fingerprint of the content of the labeled pairs. An entry holds
+    the features of the pairs computed by the extractor fitted on these pairs.
+    """
+    def __init__(self, directory: Union[Path, str]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, feature_extractor: Any, data: PairsDataFrame) -> str:
+        # the feature names follow from fitting on the data, so the key is the same before and after fitting
+        extractor_configuration = {name: value for name, value in feature_extractor.get_config().items()
+                                   if name != "feature_names"}
+        configuration = json.dumps({"format_version": FEATURE_STORE_FORMAT_VERSION,
+                                    "feature_extractor": extractor_configuration,
+                                    "data": compute_data_fingerprint(data)}, sort_keys=True)
+        return hashlib.blake2b(configuration.encode("utf8"), digest_size=16).hexdigest()
+
+    def get_or_compute(self, feature_extractor: Any, data: LabeledPairsDataFrame) -> StoredFeatures:
+        """
+        Load the features of the data from the store, or compute them with the feature extractor fitted on the data
+        and store them first. In both cases the feature extractor is fitted on the data (see BaselineFeatureExtractor.fit)
+        and can then transform other data, e.g. for evaluation.
+        :param feature_extractor:
+        :param data:
+        :return:
+        """
+        key = self.key(feature_extractor, data)
+        stored = self.load(key)
+        if stored is not None:
+            logger.info(f"Loaded the features {key} from the feature store.")
+            feature_extractor.fit(data)
+            return stored
+
+        logger.info(f"Computing the features {key} for the feature store.")
+        features = feature_extractor.fit(data).transform(data)
+        self.save(key, features, data.labels.values, feature_extractor.feature_names)
+        return self.load(key)
+
+    def load(self, key: str) -> Optional[StoredFeatures]:
+        """
+        :param key:
+        :return: the memory mapped entry, None if there is no entry for the key
+        """
+        entry_directory = self.directory / key
+        if not entry_directory.is_dir():
+            return None
+        with open(entry_directory / METADATA_FILE_NAME, "r", encoding="utf8") as f:
+            metadata = json.load(f)
+        if metadata.get("sparse", False):
+            from scipy import sparse
+            arrays = {name: np.load(entry_directory / file_name, mmap_mode="r")
+                      for name, file_name in SPARSE_FEATURES_FILE_NAMES.items()}
+            features = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                         shape=tuple(metadata["shape"]))
+        else:
+            features = np.load(entry_directory / FEATURES_FILE_NAME, mmap_mode="r")
+        return StoredFeatures(features=features,
+                              labels=np.load(entry_directory / LABELS_FILE_NAME, mmap_mode="r"),
+                              feature_names=metadata["feature_names"])
+
+    def save(self, key: str, features: Union[np.ndarray, "csr_matrix"], labels: np.ndarray, feature_names: List[str]):
+        """
+        Write the entry into a temporary directory which is then renamed, so that concurrent readers never see
+        a partially written entry. If another process stored the same key in the meantime, its entry is kept.
+        :param key:
+        :param features:
+        :param labels:
+        :param feature_names:
+        :return:
+        """
+        if features.shape[0] != len(labels) or features.shape[1] != len(feature_names):
+            raise ValueError(f"Features of shape {features.shape} do not match {len(labels)} labels and "
+                             f"{len(feature_names)} feature names.")
+
+        temporary_directory = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self.directory))
+        try:
+            is_sparse = hasattr(features, "tocsr")
+            if is_sparse:
+                features = features.tocsr()
+                for name, file_name in SPARSE_FEATURES_FILE_NAMES.items():
+                    np.save(temporary_directory / file_name, getattr(features, name))
+            else:
+                np.save(temporary_directory / FEATURES_FILE_NAME, np.ascontiguousarray(features))
+            np.save(temporary_directory / LABELS_FILE_NAME, np.asarray(labels))
+            with open(temporary_directory / METADATA_FILE_NAME, "w", encoding="utf8") as f:
+                json.dump({"feature_names": list(feature_names), "shape": list(features.shape), "sparse": is_sparse}, f)
+            os.rename(temporary_directory, self.directory / key)
+        except OSError:
+            if not (self.directory / key).is_dir():
+                raise
+        finally:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+
+    def __contains__(self, key: str) -> bool:
+        return (self.directory / key).is_dir()
+
+
+def compute_data_fingerprint(data: PairsDataFrame) -> str:
+    """
+    Fingerprint of the content of the pairs (in their order), which does not depend on the node ids or the index.
+    :param data:
+    :return:
+    """
+    fingerprint = hashlib.blake2b(digest_size=16)
+    fingerprint.update(str(data.add_language_feature_suffix_flag).encode("utf8"))
+    for items in (data.jobs, data.talents):
+        fingerprint.update(compute_content_hashes(items.data).values.astype(np.uint64).tobytes())
+    if isinstance(data, LabeledPairsDataFrame):
+        fingerprint.update(pd.Series(data.labels).values.astype(np.int8).tobytes())
+    return fingerprint.hexdigest()
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from itertools import chain
 from typing import List, Dict, Tuple, Union
 from ..feature_hierarchy_encoder import FeatureHierarchyEncoder
 
@@ -21,8 +22,25 @@ class LanguageFeatureHierarchyEncoder(FeatureHierarchyEncoder):
         :return:
         """
         if self.language_idx_map is None:
-            data = self._separate_features_and_languages(data)
-            self._fit_on_separated_features_and_languages(data)
+            _, languages, _ = self._separate_features_and_languages(data)
+            self._fit_on_languages(languages)
+
+    def partial_fit(self, data: pd.Series) -> List[str]:
+        """
+        Append the languages of the data which are not known yet to the classes (in sorted order, behind the known
+        ones), so that the columns of the known languages do not change. Fits the encoder if it is not fitted yet.
+        :param data: entries in the format of fit
+        :return: the appended languages
+        """
+        _, languages, _ = self._separate_features_and_languages(data)
+        if self.classes_ is None:
+            self._fit_on_languages(languages)
+            return list(self.classes_)
+        new_languages = sorted(set(languages).difference(self.classes_))
+        if new_languages:
+            self.classes_ = list(self.classes_) + new_languages
+            self.language_idx_map = self.process_list_to_index_map(self.classes_)
+        return new_languages
 
     def fit_transform(self, data: pd.Series)->np.ndarray:
         """
@@ -30,10 +48,9 @@ class LanguageFeatureHierarchyEncoder(FeatureHierarchyEncoder):
         :param data:
         :return:
         """
-        data = self._separate_features_and_languages(data)
-        self._fit_on_separated_features_and_languages(data)
-        feature_matrix = self.compute_feature_matrix(data)
-        return feature_matrix
+        row_ids, languages, features = self._separate_features_and_languages(data)
+        self._fit_on_languages(languages)
+        return self.transform_exploded(row_ids, languages, features, n_rows=len(data))
 
     def transform(self, data: pd.Series)->np.ndarray:
         """
@@ -42,51 +59,105 @@ class LanguageFeatureHierarchyEncoder(FeatureHierarchyEncoder):
         :param data:
         :return:
         """
-        data = self._separate_features_and_languages(data)
-        feature_matrix = self.compute_feature_matrix(data)
-        return feature_matrix
+        row_ids, languages, features = self._separate_features_and_languages(data)
+        return self.transform_exploded(row_ids, languages, features, n_rows=len(data))
 
-
-    def _fit_on_separated_features_and_languages(self, data: pd.Series):
+    def transform_with_titles(self, titles: pd.Series, data: pd.Series) -> np.ndarray:
         """
-        Data is in the format List [Tuple[str], Tuple[str]], where the tuples are the separated features/ languages
+        Same as transform, but the languages are taken from the title_languages column the "<feature>_<language>"
+        entries were built from (see add_language_suffix), so that the entries are never split.
+        :param titles:
         :param data:
         :return:
         """
-        self.classes_ = sorted(list(data.apply(lambda x: x[1]).explode().unique()))
-        self.language_idx_map = self.process_list_to_index_map(self.classes_)
-
+        row_ids, languages, features = explode_language_feature(titles, data)
+        return self.transform_exploded(row_ids, languages, features, n_rows=len(data))
 
-    def compute_feature_matrix(self, data):
+    def transform_exploded(self,
+                           row_ids: np.ndarray,
+                           languages: List[str],
+                           features: List[str],
+                           n_rows: int) -> np.ndarray:
         """
-        Data is in the format List [Tuple[str], Tuple[str]], where the tuples are the separated features/ languages
-        :param data:
+        Data is given in the exploded format: one (row id, language, feature) triple per language of each row.
+        :param row_ids:
+        :param languages:
+        :param features:
+        :param n_rows:
         :return:
         """
-        feature_series = data.apply(lambda x: self.compute_feature_vector(*x))
-        return np.vstack(feature_series)
+        language_ids = pd.Categorical(languages, categories=self.classes_).codes
+        feature_codes = self.hierarchy_codes(features)
 
-    def compute_feature_vector(self, features, languages):
-        vector = np.zeros(len(self.language_idx_map))
-        for feature, language in zip(features, languages):
+        # if language is not in the language index map or the language hierarchy map-> don't update the matrix
+        is_known = (language_ids >= 0) & (feature_codes >= 0)
+        return self.compute_feature_matrix(np.asarray(row_ids)[is_known],
+                                           language_ids[is_known],
+                                           self.hierarchy_values()[feature_codes[is_known]],
+                                           n_rows)
 
-            try:
-                vector[self.language_idx_map[language]] = self.apply_feature_hierarchy_mapping(feature)
-            except KeyError:
-                # if language is not in the language index map or the language hierarchy map-> don't update the vector
-                pass
+    def compute_feature_matrix(self,
+                               row_ids: np.ndarray,
+                               language_ids: np.ndarray,
+                               values: np.ndarray,
+                               n_rows: int) -> np.ndarray:
+        """
+        Scatter the (row id, language id, hierarchy value) integer triples into a N x L matrix.
+        :param row_ids:
+        :param language_ids:
+        :param values:
+        :param n_rows:
+        :return:
+        """
+        feature_matrix = np.zeros((n_rows, len(self.classes_)))
+        flat_positions = row_ids * len(self.classes_) + language_ids
 
-        return vector
+        # if a language appears more than once in a row, the last value is kept
+        _, last_occurrences = np.unique(flat_positions[::-1], return_index=True)
+        last_occurrences = len(flat_positions) - 1 - last_occurrences
 
-    def _separate_features_and_languages(self, data: pd.Series):
-        data = data.copy()
-        data = data.apply(self._separate_features_and_languages_in_row)
-        return data
+        feature_matrix.ravel()[flat_positions[last_occurrences]] = values[last_occurrences]
+        return feature_matrix
+
+    def _fit_on_languages(self, languages: List[str]):
+        self.classes_ = sorted(set(languages))
+        self.language_idx_map = self.process_list_to_index_map(self.classes_)
 
-    def _separate_features_and_languages_in_row(self, data_row: List[str]) -> List[Tuple[str]]:
+    def _separate_features_and_languages(self, data: pd.Series) -> Tuple[np.ndarray, List[str], List[str]]:
         """
-        The initial data is a list of "feature_language", now it will be separate lists of features and languages
-        :param data_row:
+        The initial data is a list of "feature_language" per row, now it will be exploded into row ids, languages and
+        features. Features never contain an underscore, thus the entries are separated at the first one (languages may
+        contain underscores).
+        :param data:
         :return:
         """
-        return list(zip(*[element.split("_") for element in data_row]))
\ No newline at end of file
+        row_ids, entries = explode_lists(data)
+        features, _, languages = zip(*[entry.partition("_") for entry in entries]) if entries else ((), (), ())
+        return row_ids, list(languages), list(features)
+
+
+def explode_lists(data: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """
+    Flatten a series of lists into the row id of every element and the elements.
+    :param data:
+    :return:
+    """
+    lengths = np.fromiter(map(len, data), dtype=np.int64, count=len(data))
+    return np.repeat(np.arange(len(data)), lengths), list(chain.from_iterable(data))
+
+
+def explode_language_feature(titles: pd.Series, data: pd.Series) -> Tuple[np.ndarray, List[str], List[str]]:
+    """
+    Explode "<feature>_<language>" entries into row ids, languages and features, using the language titles they
+    were built from: the feature is recovered by removing the known "_<language>" suffix.
+    :param titles:
+    :param data:
+    :return:
+    """
+    row_ids, entries = explode_lists(data)
+    if len(titles) and len(entries) != sum(map(len, titles)):
+        # the suffixed entries were built by zipping, i.e. are truncated to the shorter of the two lists
+        titles = [row_titles[:len(row_entries)] for row_titles, row_entries in zip(titles, data)]
+    languages = list(chain.from_iterable(titles))
+    features = [entry[:len(entry) - len(language) - 1] for entry, language in zip(entries, languages)]
+    return row_ids, languages, features
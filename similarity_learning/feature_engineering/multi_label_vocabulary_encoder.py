@@ -0,0 +1,33 @@
+import warnings
+import numpy as np
+from itertools import chain
+from typing import List, Iterable, Any
+
+
+class MultiLabelVocabularyEncoder:
+    """
+    Fitted multi label vocabulary (e.g. the job roles): encodes lists of labels as N x C binary indicator matrices,
+    with the columns in the order of classes_, as MultiLabelBinarizer.transform does. Unknown labels are ignored with
+    a warning. Unlike MultiLabelBinarizer, it is restored from a stored vocabulary without importing sklearn.
+    """
+    def __init__(self, classes: Iterable[Any]):
+        self.classes_ = np.array(list(classes), dtype=object)
+        self.class_idx_map = {label: i for i, label in enumerate(self.classes_)}
+
+    def transform(self, data: Iterable[List[Any]]) -> np.ndarray:
+        rows = list(data)
+        lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+        labels = list(chain.from_iterable(rows))
+        columns = np.fromiter((self.class_idx_map.get(label, -1) for label in labels), dtype=np.int64, count=len(labels))
+        row_ids = np.repeat(np.arange(len(rows)), lengths)
+
+        is_known = columns >= 0
+        if not is_known.all():
+            unknown = sorted({label for label, known in zip(labels, is_known) if not known}, key=str)
+            warnings.warn(f"unknown class(es) {unknown} will be ignored")
+        indicators = np.zeros((len(rows), len(self.classes_)), dtype=np.int64)
+        indicators[row_ids[is_known], columns[is_known]] = 1
+        return indicators
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} with {len(self.classes_)} classes."
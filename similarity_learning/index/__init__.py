@@ -0,0 +1,3 @@
+from .job_index import JobIndex
+from .talent_index import TalentIndex
+from .job_blocking_index import JobBlockingIndex, BlockingRules, BlockingResult
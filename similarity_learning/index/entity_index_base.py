@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Union
+from similarity_learning.feature_engineering import BaselineFeatureExtractor
+from similarity_learning.feature_engineering.baseline_feature_extractor.encoded_entities import EncodedEntities
+
+
+class EntityIndexBase(ABC):
+    """
+    A corpus of items (jobs or talents) loaded and encoded once, against which single queries can be scored without
+    re-featurizing the corpus.
+    """
+    def __init__(self, items: List[Dict[str, Any]], encoded: EncodedEntities):
+        if len(items) != len(encoded):
+            raise ValueError(f"items and encoded items must be of the same length, but are:"
+                             f"{len(items)} and {len(encoded)} respectively.")
+        self.items = items
+        self.encoded = encoded
+
+    @classmethod
+    def from_full_json(cls,
+                       data: Union[Dict[str, Any], List[Dict[str, Any]]],
+                       feature_extractor: BaselineFeatureExtractor) -> "EntityIndexBase":
+        items = [data] if isinstance(data, dict) else list(data)
+        return cls(items, cls.encode_items(items, feature_extractor))
+
+    @classmethod
+    @abstractmethod
+    def encode_items(cls, items: List[Dict[str, Any]], feature_extractor: BaselineFeatureExtractor) -> EncodedEntities:
+        """
+        Encode raw items (in the format provided in the task) with a fitted feature extractor.
+        :param items:
+        :param feature_extractor:
+        :return:
+        """
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, item: int) -> Dict[str, Any]:
+        return self.items[item]
+
+    def __repr__(self):
+        return f"{self.__class__} object with {len(self)} elements."
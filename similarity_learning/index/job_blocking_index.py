@@ -0,0 +1,144 @@
+import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+class BlockingRules:
+    """
+    Hard constraints a job has to satisfy to be scored against a talent:
+    - require_role_overlap: the job and the talent share at least one job role
+    - require_must_have_languages: the talent speaks every must have language of the job (the rule of
+      is_required_language_missing, the ratings are not considered)
+    - max_salary_shortfall: if given, the max salary of the job is at most this much below the salary expectation
+    """
+    def __init__(self,
+                 require_role_overlap: bool = True,
+                 require_must_have_languages: bool = True,
+                 max_salary_shortfall: Optional[float] = None):
+        self.require_role_overlap = require_role_overlap
+        self.require_must_have_languages = require_must_have_languages
+        self.max_salary_shortfall = max_salary_shortfall
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(require_role_overlap={self.require_role_overlap}, " \
+               f"require_must_have_languages={self.require_must_have_languages}, " \
+               f"max_salary_shortfall={self.max_salary_shortfall})"
+
+
+class BlockingResult:
+    """
+    Candidate jobs of one talent, with the number of jobs each rule rejected (a job can be rejected by several rules).
+    """
+    def __init__(self, candidates: np.ndarray, n_items: int, pruned_per_rule: Dict[str, int]):
+        self.candidates = candidates
+        self.n_items = n_items
+        self.pruned_per_rule = pruned_per_rule
+
+    @property
+    def n_pruned(self) -> int:
+        return self.n_items - len(self.candidates)
+
+    @property
+    def pruned_fraction(self) -> float:
+        return self.n_pruned / self.n_items if self.n_items else 0.
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self.candidates)} of {self.n_items} candidates, " \
+               f"pruned per rule: {self.pruned_per_rule})"
+
+
+class JobBlockingIndex:
+    """
+    Prunes the jobs which violate the blocking rules before they are scored. The jobs are indexed by inverted lists
+    (sorted positions in the corpus) per job role and per must have language, and by their max salaries in sorted
+    order, so that the candidates of a talent are found with a few vectorized operations over the postings.
+
+    The index keeps running totals of the queries, the considered and the pruned jobs (see statistics).
+    """
+    def __init__(self, jobs: List[Dict[str, Any]], rules: Optional[BlockingRules] = None):
+        self.rules = rules if rules is not None else BlockingRules()
+        self.n_items = len(jobs)
+
+        role_postings = defaultdict(list)
+        must_have_postings = defaultdict(list)
+        self.n_must_have_languages = np.zeros(self.n_items, dtype=np.int32)
+        for position, job in enumerate(jobs):
+            for role in set(job["job_roles"]):
+                role_postings[role].append(position)
+            must_have_titles = {language["title"] for language in job["languages"] if language["must_have"]}
+            for title in must_have_titles:
+                must_have_postings[title].append(position)
+            self.n_must_have_languages[position] = len(must_have_titles)
+        self.role_postings = {role: np.array(positions, dtype=np.intp) for role, positions in role_postings.items()}
+        self.must_have_postings = {title: np.array(positions, dtype=np.intp)
+                                   for title, positions in must_have_postings.items()}
+
+        max_salaries = np.array([job["max_salary"] for job in jobs], dtype=np.float64)
+        self.salary_order = np.argsort(max_salaries, kind="stable")
+        self.sorted_max_salaries = max_salaries[self.salary_order]
+
+        self._lock = threading.Lock()
+        self.n_queries = 0
+        self.n_considered = 0
+        self.n_candidates = 0
+        self.pruned_per_rule = defaultdict(int)
+
+    def candidates(self, talent: Dict[str, Any]) -> BlockingResult:
+        """
+        :param talent: raw talent (in the format provided in the task)
+        :return: the sorted corpus positions of the jobs which satisfy all rules
+        """
+        is_candidate = np.ones(self.n_items, dtype=bool)
+        pruned_per_rule = {}
+
+        if self.rules.require_role_overlap:
+            shares_role = np.zeros(self.n_items, dtype=bool)
+            for role in set(talent["job_roles"]):
+                postings = self.role_postings.get(role)
+                if postings is not None:
+                    shares_role[postings] = True
+            pruned_per_rule["role_overlap"] = int(self.n_items - shares_role.sum())
+            is_candidate &= shares_role
+
+        if self.rules.require_must_have_languages:
+            spoken_must_haves = np.zeros(self.n_items, dtype=np.int32)
+            for title in {language["title"] for language in talent["languages"]}:
+                postings = self.must_have_postings.get(title)
+                if postings is not None:
+                    spoken_must_haves[postings] += 1
+            speaks_must_haves = spoken_must_haves == self.n_must_have_languages
+            pruned_per_rule["must_have_languages"] = int(self.n_items - speaks_must_haves.sum())
+            is_candidate &= speaks_must_haves
+
+        if self.rules.max_salary_shortfall is not None:
+            min_max_salary = talent["salary_expectation"] - self.rules.max_salary_shortfall
+            n_too_low = int(np.searchsorted(self.sorted_max_salaries, min_max_salary, side="left"))
+            is_candidate[self.salary_order[:n_too_low]] = False
+            pruned_per_rule["salary"] = n_too_low
+
+        result = BlockingResult(np.flatnonzero(is_candidate), self.n_items, pruned_per_rule)
+        with self._lock:
+            self.n_queries += 1
+            self.n_considered += self.n_items
+            self.n_candidates += len(result.candidates)
+            for rule, n_pruned in pruned_per_rule.items():
+                self.pruned_per_rule[rule] += n_pruned
+        return result
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        :return: totals over all queries so far
+        """
+        with self._lock:
+            return {"queries": self.n_queries,
+                    "considered": self.n_considered,
+                    "candidates": self.n_candidates,
+                    "pruned_fraction": 1 - self.n_candidates / self.n_considered if self.n_considered else 0.,
+                    "pruned_per_rule": dict(self.pruned_per_rule)}
+
+    def __len__(self):
+        return self.n_items
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} of {self.n_items} jobs with {self.rules}"
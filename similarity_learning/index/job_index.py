@@ -0,0 +1,13 @@
+from typing import List, Dict, Any
+from .entity_index_base import EntityIndexBase
+from similarity_learning.feature_engineering import BaselineFeatureExtractor
+from similarity_learning.feature_engineering.baseline_feature_extractor.encoded_entities import EncodedJobs
+from similarity_learning.loading_pipeline.data_model import JobsDataFrame
+
+
+class JobIndex(EntityIndexBase):
+    encoded: EncodedJobs
+
+    @classmethod
+    def encode_items(cls, items: List[Dict[str, Any]], feature_extractor: BaselineFeatureExtractor) -> EncodedJobs:
+        return feature_extractor.encode_jobs(JobsDataFrame.from_full_json(items, add_language_suffix=True))
@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, sorted descending by score. Ties keep the order of the corpus, so that the result
+    is deterministic even though a decision tree assigns the same score to many items.
+    :param scores:
+    :param k:
+    :return:
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+
+    kth_score = np.partition(scores, len(scores) - k)[len(scores) - k]
+    candidates = np.flatnonzero(scores >= kth_score)
+    return candidates[np.argsort(-scores[candidates], kind="stable")][:k]
@@ -1,2 +1,3 @@
 from .model import Model
-from .baseline_model.decision_tree_model import DecisionTreeModel
\ No newline at end of file
+from .baseline_model.decision_tree_model import DecisionTreeModel
+from .shadowed_model import ShadowedModel, MultiModelOutput
\ No newline at end of file
@@ -0,0 +1,151 @@
+import numpy as np
+from typing import Any, List, Dict
+
+# marker of the leaves in the children arrays, as in sklearn.tree._tree.TREE_LEAF
+TREE_LEAF = -1
+# up to this batch size, looping over the samples is faster than the vectorized level by level traversal
+SCALAR_TRAVERSAL_MAX_BATCH_SIZE = 16
+# sparse features are made dense in chunks of this many rows
+SPARSE_CHUNK_SIZE = 8192
+# the arrays which fully describe a compiled tree (see CompiledTree.arrays)
+COMPILED_TREE_ARRAYS = ("feature", "threshold", "children_left", "children_right", "leaf_probability")
+
+
+class CompiledTree:
+    """
+    A fitted decision tree classifier flattened into NumPy arrays. Batches are evaluated by a vectorized, level by
+    level traversal of the tree, single samples by a plain loop. The class probabilities are the ones computed by
+    DecisionTreeClassifier.predict_proba, but without its per call input validation.
+    """
+    def __init__(self,
+                 feature: np.ndarray,
+                 threshold: np.ndarray,
+                 children_left: np.ndarray,
+                 children_right: np.ndarray,
+                 leaf_probability: np.ndarray,
+                 n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.leaf_probability = leaf_probability
+        self.n_features = n_features
+
+        # the batch traversal runs max_depth levels for all samples, for which leaves point to themselves
+        is_leaf = children_left == TREE_LEAF
+        node_ids = np.arange(len(feature))
+        self._level_feature = np.where(is_leaf, 0, feature)
+        self._level_children = np.column_stack((np.where(is_leaf, node_ids, children_left),
+                                                np.where(is_leaf, node_ids, children_right))).ravel()
+        self.max_depth = self._compute_max_depth(children_left, children_right)
+
+        # python lists are faster than arrays for the scalar traversal
+        self._feature_list = feature.tolist()
+        self._threshold_list = threshold.tolist()
+        self._children_left_list = children_left.tolist()
+        self._children_right_list = children_right.tolist()
+
+    @classmethod
+    def from_estimator(cls, estimator: Any) -> "CompiledTree":
+        """
+        Compile a fitted (single output) sklearn DecisionTreeClassifier. Only the compilation needs the estimator, the
+        compiled tree itself does not depend on sklearn.
+        :param estimator:
+        :return:
+        """
+        tree = estimator.tree_
+        if tree.n_outputs != 1:
+            raise ValueError(f"Only single output trees can be compiled, but the tree has {tree.n_outputs} outputs.")
+
+        # normalization of the leaf values as in DecisionTreeClassifier.predict_proba
+        leaf_probability = np.array(tree.value[:, 0, :estimator.n_classes_], dtype=np.float64)
+        normalizer = leaf_probability.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        leaf_probability /= normalizer
+
+        return cls(feature=np.array(tree.feature, dtype=np.intp),
+                   threshold=np.array(tree.threshold, dtype=np.float64),
+                   children_left=np.array(tree.children_left, dtype=np.intp),
+                   children_right=np.array(tree.children_right, dtype=np.intp),
+                   leaf_probability=leaf_probability,
+                   n_features=estimator.n_features_in_)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        The arrays from which the tree is rebuilt, together with n_features: CompiledTree(**arrays, n_features=...).
+        :return:
+        """
+        return {name: getattr(self, name) for name in COMPILED_TREE_ARRAYS}
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        N x n_classes class probabilities of a batch. Like sklearn, the features are assumed to be finite.
+        :param features: N x F, dense or scipy.sparse
+        :return:
+        """
+        if hasattr(features, "tocsr"):
+            # scipy.sparse matrix, only a chunk of it is dense at any time
+            features = features.tocsr()
+            probabilities = np.empty((features.shape[0], self.leaf_probability.shape[1]), dtype=np.float64)
+            for start in range(0, features.shape[0], SPARSE_CHUNK_SIZE):
+                stop = min(start + SPARSE_CHUNK_SIZE, features.shape[0])
+                probabilities[start:stop] = self.predict_proba(features[start:stop].toarray())
+            return probabilities
+
+        features = np.ascontiguousarray(features)
+        if features.ndim != 2 or features.shape[1] != self.n_features:
+            raise ValueError(f"Expected features of shape (N, {self.n_features}), got {features.shape}.")
+
+        if len(features) <= SCALAR_TRAVERSAL_MAX_BATCH_SIZE:
+            leaves = [self._traverse(row) for row in self._as_float32(features).tolist()]
+            return self.leaf_probability[leaves]
+
+        flat_features = features.reshape(-1)
+        row_offsets = np.arange(len(features)) * self.n_features
+        nodes = np.zeros(len(features), dtype=np.intp)
+        for _ in range(self.max_depth):
+            values = self._as_float32(flat_features[row_offsets + self._level_feature[nodes]])
+            go_right = values > self.threshold[nodes]
+            nodes = self._level_children[2 * nodes + go_right]
+
+        return self.leaf_probability[nodes]
+
+    def predict_proba_single(self, features: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities of a single sample.
+        :param features: F
+        :return:
+        """
+        features = self._as_float32(features).ravel()
+        if len(features) != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {len(features)}.")
+        return self.leaf_probability[self._traverse(features.tolist())]
+
+    def _traverse(self, features: List[float]) -> int:
+        node = 0
+        while self._children_left_list[node] != TREE_LEAF:
+            if features[self._feature_list[node]] <= self._threshold_list[node]:
+                node = self._children_left_list[node]
+            else:
+                node = self._children_right_list[node]
+        return node
+
+    @staticmethod
+    def _compute_max_depth(children_left: np.ndarray, children_right: np.ndarray) -> int:
+        depth = np.zeros(len(children_left), dtype=np.intp)
+        # sklearn stores the nodes in depth first order, i.e. every parent before its children
+        for node, (left, right) in enumerate(zip(children_left.tolist(), children_right.tolist())):
+            if left != TREE_LEAF:
+                depth[left] = depth[right] = depth[node] + 1
+        return int(depth.max())
+
+    @staticmethod
+    def _as_float32(features: np.ndarray) -> np.ndarray:
+        # sklearn trees compare float32 features to float64 thresholds
+        return np.asarray(features, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.feature)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} with {len(self)} nodes and {self.n_features} features."
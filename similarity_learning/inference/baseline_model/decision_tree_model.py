@@ -1,25 +1,83 @@
 import numpy as np
 from ..model import Model
-from sklearn.base import BaseEstimator
 from similarity_learning.feature_engineering import BaselineFeatureExtractor
+from similarity_learning.feature_engineering.baseline_feature_extractor.encoded_entities import EncodedJobs, EncodedTalents
+from .compiled_tree import CompiledTree
 from ..model_output import ModelOutput
 from ...loading_pipeline import PairsDataFrame
-from typing import List
+from similarity_learning.instrumentation import stage
+from pathlib import Path
+from typing import List, Optional, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+    from sklearn.base import BaseEstimator
+    from scipy.sparse import csr_matrix
 
 
 class DecisionTreeModel(Model):
-    def __init__(self, model: BaseEstimator, feature_extractor: BaselineFeatureExtractor):
+    # models persisted before compilation was introduced have no compiled_tree attribute
+    compiled_tree: Optional[CompiledTree] = None
+
+    def __init__(self, model: "BaseEstimator", feature_extractor: BaselineFeatureExtractor):
         super().__init__(model)
         self.feature_extractor = feature_extractor
+        self.compiled_tree = None
+
+    def compile(self) -> "DecisionTreeModel":
+        """
+        Compile the fitted tree into flat arrays (see CompiledTree), which are then used by all predict methods
+        instead of the sklearn estimator. The scores are identical.
+        :return:
+        """
+        if self.model is None:
+            # loaded from a model artifact, which only holds the compiled tree
+            return self
+        self.compiled_tree = CompiledTree.from_estimator(self.model)
+        return self
+
+    def save(self, file_path: Union[Path, str]):
+        """
+        Save the model as a model artifact directory: a JSON manifest and flat .npy arrays of the compiled tree (see
+        inference.model_artifact). Model.load reads both the artifacts and the pickles of older versions.
+        :param file_path: path of the artifact directory
+        :return:
+        """
+        from ..model_artifact import save_model_artifact
+        save_model_artifact(self, file_path)
 
     def predict(self, data: PairsDataFrame) -> ModelOutput:
         features = self.feature_extractor.transform(data)
+        return self.predict_features(features)
+
+    def predict_pair(self, talent: dict, job: dict) -> ModelOutput:
+        features = self.feature_extractor.transform_pair(talent, job)
+        return self.predict_features(features)
+
+    def predict_encoded(self, jobs: EncodedJobs, talents: EncodedTalents) -> ModelOutput:
+        """
+        Predict on already encoded jobs and talents (see BaselineFeatureExtractor.compute_pair_features).
+        :param jobs:
+        :param talents:
+        :return:
+        """
+        features = self.feature_extractor.compute_pair_features(jobs, talents)
+        return self.predict_features(features)
 
-        scores: np.ndarray = self.model.predict_proba(features)
-        similarity_scores = self.compute_similarity_score(scores)
-        labels: List[bool] = self.label_assignment(similarity_scores)
+    def predict_features(self, features: Union[np.ndarray, "csr_matrix"]) -> ModelOutput:
+        """
+        :param features: dense or (see BaselineFeatureExtractor.sparse_output) sparse N x F features
+        :return:
+        """
+        with stage("predict.model", features.shape[0]):
+            if self.compiled_tree is None:
+                scores: np.ndarray = self.model.predict_proba(features)
+            elif features.shape[0] == 1 and isinstance(features, np.ndarray):
+                scores = self.compiled_tree.predict_proba_single(features[0])[np.newaxis, :]
+            else:
+                scores = self.compiled_tree.predict_proba(features)
+            similarity_scores = self.compute_similarity_score(scores)
+            labels: List[bool] = self.label_assignment(similarity_scores)
 
         return ModelOutput(labels, similarity_scores)
 
     def compute_similarity_score(self, scores: np.ndarray) -> np.ndarray:
-        return scores[:, 1]
\ No newline at end of file
+        return scores[:, 1]
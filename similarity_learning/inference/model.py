@@ -1,21 +1,33 @@
 from abc import ABC, abstractmethod
-from sklearn.base import BaseEstimator
-from typing import Union, List
-import torch.nn as nn
-from ..loading_pipeline import PairsDataFrame
+from typing import Union, List, TYPE_CHECKING
+from ..loading_pipeline import PairsDataFrame, UnlabeledPairsDataFrame
 from .model_output import ModelOutput
 import numpy as np
 from pathlib import Path
 import pickle
+if TYPE_CHECKING:
+    # only needed for the annotations, the libraries are imported by the models which use them
+    from sklearn.base import BaseEstimator
+    import torch.nn as nn
 
 class Model(ABC):
-    def __init__(self, model: Union[BaseEstimator, nn.Module]):
+    def __init__(self, model: Union["BaseEstimator", "nn.Module"]):
         self.model = model
 
     @classmethod
     def load(cls, file_path: Union[Path, str]) -> "Model":
-        with open(file_path, 'rb') as f:
-            model = pickle.load(f)
+        """
+        Load a model artifact directory (see inference.model_artifact) or, for older models, a pickle file.
+        Only load pickles from trusted sources: unpickling can execute arbitrary code.
+        :param file_path:
+        :return:
+        """
+        if Path(file_path).is_dir():
+            from .model_artifact import load_model_artifact
+            model = load_model_artifact(file_path)
+        else:
+            with open(file_path, 'rb') as f:
+                model = pickle.load(f)
 
         if isinstance(model, cls):
             return model
@@ -24,6 +36,12 @@ class Model(ABC):
 
 
     def save(self, file_path: Union[Path, str]):
+        """
+        Legacy storage as a pickle file, for models without an artifact format. Models which have one override save
+        (see DecisionTreeModel.save), Model.load reads both.
+        :param file_path:
+        :return:
+        """
         with open(file_path, 'wb') as f:
             pickle.dump(self, f)
 
@@ -35,6 +53,15 @@ class Model(ABC):
         :return:
         """
 
+    def predict_pair(self, talent: dict, job: dict) -> ModelOutput:
+        """
+        Predict on a single raw talent and job (in the format provided in the task).
+        :param talent:
+        :param job:
+        :return:
+        """
+        return self.predict(UnlabeledPairsDataFrame.from_full_json(job, talent, add_language_suffix=True))
+
     def label_assignment(self, similarity_scores: np.ndarray) -> List[bool]:
         if len(similarity_scores.shape) != 1:
             raise ValueError("Similarity score per batch element should be a single float literal.")
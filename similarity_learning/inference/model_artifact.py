@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Union, Dict, Any
+import numpy as np
+from similarity_learning.feature_engineering import BaselineFeatureExtractor
+from similarity_learning.exceptions import UnsupportedArtifactError
+from .baseline_model.compiled_tree import CompiledTree, COMPILED_TREE_ARRAYS
+from .baseline_model.decision_tree_model import DecisionTreeModel
+
+MODEL_ARTIFACT_FORMAT = "similarity_learning.model_artifact"
+MODEL_ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.json"
+
+
+def save_model_artifact(model: DecisionTreeModel, directory: Union[Path, str]):
+    """
+    Store the model as a directory holding a JSON manifest (format version, feature extractor state: hierarchy
+    mappings, vocabularies and feature schema) and one .npy file per array of the compiled tree. Unlike a pickle, the
+    artifact does not depend on the module layout of the classes, and loading it executes no code from the artifact.
+
+    The artifact is written into a temporary directory which is then renamed. An existing artifact at the same path
+    is replaced, any other existing path is left untouched.
+    :param model:
+    :param directory:
+    :return:
+    """
+    directory = Path(directory)
+    if directory.exists() and not (directory / MANIFEST_FILE_NAME).is_file():
+        raise FileExistsError(f"{directory} exists and is not a model artifact.")
+    compiled_tree = model.compiled_tree if model.compiled_tree is not None else CompiledTree.from_estimator(model.model)
+    array_file_names = {name: f"tree_{name}.npy" for name in COMPILED_TREE_ARRAYS}
+    manifest = {"format": MODEL_ARTIFACT_FORMAT,
+                "format_version": MODEL_ARTIFACT_FORMAT_VERSION,
+                "model_class": model.__class__.__name__,
+                "tree": {"n_features": compiled_tree.n_features,
+                         "n_nodes": len(compiled_tree),
+                         "arrays": array_file_names},
+                "feature_extractor": model.feature_extractor.get_artifact_state()}
+
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    temporary_directory = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+    try:
+        for name, array in compiled_tree.arrays().items():
+            np.save(temporary_directory / array_file_names[name], np.ascontiguousarray(array))
+        with open(temporary_directory / MANIFEST_FILE_NAME, "w", encoding="utf8") as f:
+            json.dump(manifest, f, indent=1)
+        if directory.exists():
+            replaced_directory = Path(tempfile.mkdtemp(prefix=f".{directory.name}.replaced.", dir=directory.parent))
+            os.rename(directory, replaced_directory / directory.name)
+            os.rename(temporary_directory, directory)
+            shutil.rmtree(replaced_directory, ignore_errors=True)
+        else:
+            os.rename(temporary_directory, directory)
+    finally:
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+
+
+def load_model_artifact(directory: Union[Path, str], mmap: bool = True) -> DecisionTreeModel:
+    """
+    Load a model stored by save_model_artifact. The arrays of the tree are read only memory maps of the files (unless
+    mmap is False), and no pickled objects are accepted. The loaded model predicts with the compiled tree only.
+    :param directory:
+    :param mmap:
+    :return:
+    """
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    tree = manifest["tree"]
+    arrays = {name: np.load(directory / tree["arrays"][name], mmap_mode="r" if mmap else None, allow_pickle=False)
+              for name in COMPILED_TREE_ARRAYS}
+    n_nodes = len(arrays["feature"])
+    if any(len(array) != n_nodes for array in arrays.values()) or n_nodes != tree["n_nodes"]:
+        raise UnsupportedArtifactError(f"The tree arrays of {directory} do not have {tree['n_nodes']} nodes each.")
+
+    model = DecisionTreeModel(None, BaselineFeatureExtractor.from_artifact_state(manifest["feature_extractor"]))
+    model.compiled_tree = CompiledTree(n_features=tree["n_features"], **arrays)
+    return model
+
+
+def read_manifest(directory: Union[Path, str]) -> Dict[str, Any]:
+    """
+    :param directory:
+    :return: the manifest of the artifact, after checking its format and version
+    """
+    with open(Path(directory) / MANIFEST_FILE_NAME, "r", encoding="utf8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != MODEL_ARTIFACT_FORMAT:
+        raise UnsupportedArtifactError(f"{directory} is not a model artifact.")
+    if manifest.get("format_version") != MODEL_ARTIFACT_FORMAT_VERSION:
+        raise UnsupportedArtifactError(f"Unsupported model artifact format version {manifest.get('format_version')}, "
+                                       f"expected {MODEL_ARTIFACT_FORMAT_VERSION}.")
+    if manifest.get("model_class") != DecisionTreeModel.__name__:
+        raise UnsupportedArtifactError(f"Unsupported model class {manifest.get('model_class')} in {directory}.")
+    return manifest
@@ -0,0 +1,89 @@
+import numpy as np
+from .model import Model
+from .model_output import ModelOutput
+from .baseline_model.decision_tree_model import DecisionTreeModel
+from similarity_learning.feature_engineering.baseline_feature_extractor.encoded_entities import EncodedJobs, EncodedTalents
+from ..loading_pipeline import PairsDataFrame
+from similarity_learning.exceptions import UnsavableModelError
+from pathlib import Path
+from typing import Dict, List, Union, TYPE_CHECKING
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+
+class MultiModelOutput(ModelOutput):
+    """
+    Output of the primary model (the labels and similarity scores), with the outputs of the shadow models on the same
+    pairs by name.
+    """
+    def __init__(self, primary_output: ModelOutput, shadow_outputs: Dict[str, ModelOutput]):
+        super().__init__(primary_output.labels, primary_output.similarity_scores)
+        self.shadow_outputs = shadow_outputs
+
+    def shadow_scores(self, i: int) -> Dict[str, float]:
+        """
+        :param i: position of the pair
+        :return: the similarity score of each shadow model for the pair
+        """
+        return {name: output.similarity_scores[i] for name, output in self.shadow_outputs.items()}
+
+    def __repr__(self):
+        return f"{super().__repr__()}\nShadow models: {list(self.shadow_outputs.keys())}"
+
+
+class ShadowedModel(Model):
+    """
+    A primary model evaluated together with shadow (or A/B candidate) models which compute the same features, so that
+    each batch is featurized only once: the shadow models only add their tree evaluations. The predict methods return
+    MultiModelOutputs, whose labels and scores are the ones of the primary model, which makes a ShadowedModel a drop in
+    replacement of the primary model (e.g. in Search).
+    """
+    def __init__(self, primary: DecisionTreeModel, shadows: Dict[str, DecisionTreeModel]):
+        super().__init__(primary.model)
+        for name, shadow in shadows.items():
+            if not primary.feature_extractor.produces_same_features(shadow.feature_extractor):
+                raise ValueError(f"The shadow model {name} computes other features than the primary model, "
+                                 f"the features can only be shared by models with the same feature extractor.")
+        self.primary = primary
+        self.shadows = shadows
+        self.feature_extractor = primary.feature_extractor
+
+    def compile(self) -> "ShadowedModel":
+        """
+        Compile the primary and all shadow models (see DecisionTreeModel.compile).
+        :return:
+        """
+        for model in [self.primary, *self.shadows.values()]:
+            model.compile()
+        return self
+
+    def save(self, file_path: Union[Path, str]):
+        """
+        A ShadowedModel is a serving time combination and is not stored as a whole: save the primary and the shadow
+        models (as model artifacts, see DecisionTreeModel.save) and combine them again after loading.
+        """
+        raise UnsavableModelError(f"{self.__class__.__name__} cannot be saved, save the primary and the shadow models "
+                                  f"separately.")
+
+    def predict(self, data: PairsDataFrame) -> MultiModelOutput:
+        return self.predict_features(self.feature_extractor.transform(data))
+
+    def predict_pair(self, talent: dict, job: dict) -> MultiModelOutput:
+        return self.predict_features(self.feature_extractor.transform_pair(talent, job))
+
+    def predict_encoded(self, jobs: EncodedJobs, talents: EncodedTalents) -> MultiModelOutput:
+        return self.predict_features(self.feature_extractor.compute_pair_features(jobs, talents))
+
+    def predict_features(self, features: Union[np.ndarray, "csr_matrix"]) -> MultiModelOutput:
+        """
+        :param features: the features of the shared feature extractor
+        :return:
+        """
+        return MultiModelOutput(self.primary.predict_features(features),
+                                {name: shadow.predict_features(features) for name, shadow in self.shadows.items()})
+
+    def label_assignment(self, similarity_scores: np.ndarray) -> List[bool]:
+        return self.primary.label_assignment(similarity_scores)
+
+    def compute_similarity_score(self, scores: np.ndarray) -> np.ndarray:
+        return self.primary.compute_similarity_score(scores)
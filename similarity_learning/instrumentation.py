@@ -0,0 +1,172 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Union, Iterator
+
+# upper bounds (in seconds) of the duration histogram buckets, the last bucket is unbounded
+DEFAULT_DURATION_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                            1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1., 2.5, 5., 10.)
+
+
+class StageHistogram:
+    """
+    Histogram of the durations of one pipeline stage, with the number of calls and of processed rows.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_DURATION_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.calls = 0
+        self.rows = 0
+        self.total_seconds = 0.
+        self.max_seconds = 0.
+
+    def observe(self, seconds: float, n_rows: int):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.calls += 1
+        self.rows += n_rows
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls,
+                "rows": self.rows,
+                "total_seconds": self.total_seconds,
+                "mean_seconds": self.total_seconds / self.calls if self.calls else 0.,
+                "max_seconds": self.max_seconds,
+                "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.bucket_counts)}}
+
+
+class PipelineMetrics:
+    """
+    Thread safe per stage duration histograms of the inference pipeline (see stage for the recorded stages). The
+    metrics can be dumped as JSON or exported in the Prometheus text format.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_DURATION_BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage_name: str, seconds: float, n_rows: int):
+        with self._lock:
+            histogram = self.histograms.get(stage_name)
+            if histogram is None:
+                histogram = self.histograms[stage_name] = StageHistogram(self.buckets)
+            histogram.observe(seconds, n_rows)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {stage_name: histogram.as_dict() for stage_name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, file_path: Union[Path, str]):
+        with open(file_path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def to_prometheus(self, prefix: str = "similarity_learning") -> str:
+        """
+        :param prefix: prefix of the metric names
+        :return: the histograms in the Prometheus text exposition format, labeled with the stage and the process id
+        """
+        histograms = self.as_dict()
+        pid = os.getpid()
+        lines = [f"# TYPE {prefix}_stage_duration_seconds histogram"]
+        for stage_name, histogram in histograms.items():
+            labels = f'stage="{stage_name}",pid="{pid}"'
+            cumulative_count = 0
+            for bound, count in histogram["buckets"].items():
+                cumulative_count += count
+                lines.append(f'{prefix}_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative_count}')
+            lines.append(f"{prefix}_stage_duration_seconds_sum{{{labels}}} {histogram['total_seconds']}")
+            lines.append(f"{prefix}_stage_duration_seconds_count{{{labels}}} {histogram['calls']}")
+        lines.append(f"# TYPE {prefix}_stage_rows_total counter")
+        for stage_name, histogram in histograms.items():
+            lines.append(f'{prefix}_stage_rows_total{{stage="{stage_name}",pid="{pid}"}} {histogram["rows"]}')
+        return "\n".join(lines) + "\n"
+
+
+class _TimedStage:
+    __slots__ = ("metrics", "stage_name", "n_rows", "start")
+
+    def __init__(self, metrics: PipelineMetrics, stage_name: str, n_rows: int):
+        self.metrics = metrics
+        self.stage_name = stage_name
+        self.n_rows = n_rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.record(self.stage_name, time.perf_counter() - self.start, self.n_rows)
+        return False
+
+
+class _DisabledStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_DISABLED_STAGE = _DisabledStage()
+# the metrics which the stages of the whole process are recorded into, None while disabled
+_active_metrics: Optional[PipelineMetrics] = None
+
+
+def stage(stage_name: str, n_rows: int = 0):
+    """
+    Context manager timing a stage of the pipeline, e.g. with stage("featurize.role", len(features)): ...
+    While the instrumentation is disabled (the default) a shared no-op context manager is returned.
+    :param stage_name:
+    :param n_rows: number of rows (items or pairs) processed by the stage
+    :return:
+    """
+    if _active_metrics is None:
+        return _DISABLED_STAGE
+    return _TimedStage(_active_metrics, stage_name, n_rows)
+
+
+def enable_pipeline_metrics(metrics: Optional[PipelineMetrics] = None) -> PipelineMetrics:
+    """
+    Record the stages of the pipeline (of all threads of the process) into metrics, or new metrics if none are given.
+    :param metrics:
+    :return: the metrics which are recorded into
+    """
+    global _active_metrics
+    _active_metrics = metrics if metrics is not None else PipelineMetrics()
+    return _active_metrics
+
+
+def disable_pipeline_metrics():
+    global _active_metrics
+    _active_metrics = None
+
+
+def get_pipeline_metrics() -> Optional[PipelineMetrics]:
+    return _active_metrics
+
+
+@contextmanager
+def collect_pipeline_metrics(metrics: Optional[PipelineMetrics] = None) -> Iterator[PipelineMetrics]:
+    """
+    Record the stages of the pipeline within the with block, e.g.
+    with collect_pipeline_metrics() as metrics:
+        search.match_bulk(talents, jobs)
+    print(metrics.as_dict())
+    """
+    global _active_metrics
+    previous_metrics = _active_metrics
+    try:
+        yield enable_pipeline_metrics(metrics)
+    finally:
+        _active_metrics = previous_metrics
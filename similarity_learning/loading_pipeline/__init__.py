@@ -1,3 +1,4 @@
 from .data_model.pairs_dataframe import PairsDataFrame
 from .data_model.labeled_pairs_dataframe import LabeledPairsDataFrame
-from .data_model.unlabeled_pairs_dataframe import UnlabeledPairsDataFrame
\ No newline at end of file
+from .data_model.unlabeled_pairs_dataframe import UnlabeledPairsDataFrame
+from .data_model.normalized_pairs_dataframe import NormalizedPairsDataFrame
\ No newline at end of file
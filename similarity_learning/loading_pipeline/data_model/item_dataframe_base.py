@@ -4,10 +4,12 @@ from ..preprocessing.elementwise_sorting import element_wise_sorting, ElementWis
 from ..preprocessing.retrieve_class_properties import retrieve_class_properties
 from similarity_learning.exceptions import DataLoadingError
 from ..preprocessing.node_id_generation import generate_node_ids
-from typing import Union, List, Dict, Any
+from ..preprocessing.node_id_registry import NodeIdRegistry
+from typing import Union, List, Dict, Any, Optional
 from abc import ABC, abstractmethod
 from ..preprocessing.expand_raw_categorical_features import add_language_suffix
 from similarity_learning.exceptions import DoubleUsageError
+from similarity_learning.instrumentation import stage
 
 class ItemDataFrameBase(ABC):
     def __init__(self, data: pd.DataFrame, add_language_suffix=False):
@@ -54,14 +56,19 @@ class ItemDataFrameBase(ABC):
     @classmethod
     def from_full_json(cls,
                        data: Union[pd.Series, Dict[str, Any], List[Dict[str, Any]]],
-                       add_language_suffix=False)->"ItemDataFrameBase":
-        data: pd.DataFrame = pd.json_normalize(data)
-        data.languages = element_wise_sorting(data.languages, ElementWiseSortingDType.DICT)
-        data, unpacked_column_names = unpack_list_of_dicts_column(data, 'languages',
-                                                                  suffix='languages',
-                                                                  return_unpacked_column_names=True)
-        data = data.drop(columns=["languages"])
-        data.loc[:, "node_id"] = generate_node_ids(data)
+                       add_language_suffix=False,
+                       node_id_registry: Optional[NodeIdRegistry] = None)->"ItemDataFrameBase":
+        n_rows = 1 if isinstance(data, dict) else len(data)
+        with stage("load.json_normalize", n_rows):
+            data: pd.DataFrame = pd.json_normalize(data)
+        with stage("load.language_unpack", n_rows):
+            data.languages = element_wise_sorting(data.languages, ElementWiseSortingDType.DICT)
+            data, unpacked_column_names = unpack_list_of_dicts_column(data, 'languages',
+                                                                      suffix='languages',
+                                                                      return_unpacked_column_names=True)
+            data = data.drop(columns=["languages"])
+        with stage("load.node_ids", n_rows):
+            data.loc[:, "node_id"] = generate_node_ids(data, registry=node_id_registry)
 
         return cls(data, add_language_suffix)
 
@@ -83,9 +90,10 @@ class ItemDataFrameBase(ABC):
     def add_language_suffix_to_raw_language_features(self):
         if self.__is_add_language_suffix_applied:
             raise DoubleUsageError("This operation has already been applied!")
-        self.data = add_language_suffix(self.data,
-                                        ["rating_languages", "must_have_languages"],
-                                        language_title_column_name="title_languages")
+        with stage("load.language_suffix", len(self.data)):
+            self.data = add_language_suffix(self.data,
+                                            ["rating_languages", "must_have_languages"],
+                                            language_title_column_name="title_languages")
         self.__is_add_language_suffix_applied = True
 
 
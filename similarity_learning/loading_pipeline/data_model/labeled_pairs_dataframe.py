@@ -1,7 +1,8 @@
 import pandas as pd
 from pathlib import Path
-from typing import Union, List
+from typing import Union, List, Iterator, Dict, Optional
 from ..preprocessing import JsonLoadingPipeLine
+from ..preprocessing.node_id_registry import NodeIdRegistry
 from .jobs_dataframe import JobsDataFrame
 from .talents_dataframe import TalentsDataFrame
 from similarity_learning.exceptions import DataLoadingError, NotSetAttributeError
@@ -44,17 +45,66 @@ class LabeledPairsDataFrame(PairsDataFrame):
                 raise KeyError("Item was not found in any of the two datasets (neither in jobs nor in talents).")
 
     @classmethod
-    def from_full_json(cls, file_path: Union[Path, str], add_language_suffix=False)-> "LabeledPairsDataFrame":
+    def from_full_json(cls,
+                       file_path: Union[Path, str],
+                       add_language_suffix=False,
+                       job_id_registry: Optional[NodeIdRegistry] = None,
+                       talent_id_registry: Optional[NodeIdRegistry] = None)-> "LabeledPairsDataFrame":
         loader = JsonLoadingPipeLine()
         raw_job, raw_talent, labels = loader(file_path)
+        return cls._from_raw_series(raw_job, raw_talent, labels, add_language_suffix, job_id_registry, talent_id_registry)
 
+    @classmethod
+    def iter_from_full_json(cls,
+                            file_path: Union[Path, str],
+                            chunk_size: int = 10000,
+                            add_language_suffix=False,
+                            job_id_registry: Optional[NodeIdRegistry] = None,
+                            talent_id_registry: Optional[NodeIdRegistry] = None) -> Iterator["LabeledPairsDataFrame"]:
+        """
+        Stream the data of a (possibly larger than memory) JSON array or NDJSON file as LabeledPairsDataFrame chunks
+        of at most chunk_size pairs each. Every chunk is indexed from 0. Its node ids are local to the chunk, unless
+        registries are given, which assign the same global ids in all chunks.
+        :param file_path:
+        :param chunk_size:
+        :param add_language_suffix:
+        :param job_id_registry:
+        :param talent_id_registry:
+        :return:
+        """
+        loader = JsonLoadingPipeLine()
+        for raw_job, raw_talent, labels in loader.iter_chunks(file_path, chunk_size):
+            yield cls._from_raw_series(raw_job, raw_talent, labels, add_language_suffix,
+                                       job_id_registry, talent_id_registry)
+
+    @classmethod
+    def _from_raw_series(cls,
+                         raw_job: pd.Series,
+                         raw_talent: pd.Series,
+                         labels: pd.Series,
+                         add_language_suffix: bool,
+                         job_id_registry: Optional[NodeIdRegistry] = None,
+                         talent_id_registry: Optional[NodeIdRegistry] = None) -> "LabeledPairsDataFrame":
         if (list(raw_job.index) != list(raw_talent.index)) or (list(raw_job.index)!=list(labels.index)):
             raise DataLoadingError("Loaded objects for jobs, talents and labels do not have the same index!")
 
-        jobs = JobsDataFrame.from_full_json(raw_job, add_language_suffix)
-        talents = TalentsDataFrame.from_full_json(raw_talent, add_language_suffix)
+        jobs = JobsDataFrame.from_full_json(raw_job, add_language_suffix, job_id_registry)
+        talents = TalentsDataFrame.from_full_json(raw_talent, add_language_suffix, talent_id_registry)
         return cls(jobs, talents, labels, add_language_suffix)
 
+    def _columnar_tables(self) -> Dict[str, pd.DataFrame]:
+        return {**super()._columnar_tables(), "labels": self.labels.to_frame()}
+
+    @classmethod
+    def _from_columnar_tables(cls,
+                              tables: Dict[str, pd.DataFrame],
+                              add_language_feature_suffix_flag: bool) -> "LabeledPairsDataFrame":
+        if "labels" not in tables:
+            raise DataLoadingError("The loaded data has no labels.")
+        labels = tables["labels"].iloc[:, 0]
+        return cls(JobsDataFrame(tables["jobs"]), TalentsDataFrame(tables["talents"]), labels,
+                   add_language_feature_suffix_flag)
+
     def as_dataframe(self, jobs_suffix="jobs", talents_suffix="talents")->pd.DataFrame:
         return pd.concat((self._jobs.data.rename(lambda x: x + "_" + jobs_suffix, axis='columns'),
                           self._talents.data.rename(lambda x: x + "_" + talents_suffix, axis='columns'),
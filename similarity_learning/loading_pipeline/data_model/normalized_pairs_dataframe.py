@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+from typing import Union, List, Dict, Any, Optional
+from .jobs_dataframe import JobsDataFrame
+from .talents_dataframe import TalentsDataFrame
+from .item_dataframe_base import ItemDataFrameBase
+from .pairs_dataframe import PairsDataFrame, IlocBase
+from .unlabeled_pairs_dataframe import UnlabeledPairsDataFrame
+from ..preprocessing.node_id_registry import NodeIdRegistry
+from ..preprocessing.node_id_generation import compute_content_hashes
+
+
+class NormalizedPairsDataFrame(PairsDataFrame):
+    """
+    Unlabeled pairs stored as the tables of the unique jobs and talents, plus the int32 arrays job_idx and talent_idx
+    of the rows of the pairs in these tables. Memory grows with 8 bytes per pair instead of two full rows per pair,
+    which matters for cross products of many jobs and talents. The jobs and talents properties materialize the
+    per pair rows (as in UnlabeledPairsDataFrame), consumers that know this class use unique_jobs and unique_talents.
+    """
+    def __init__(self,
+                 unique_jobs: JobsDataFrame,
+                 unique_talents: TalentsDataFrame,
+                 job_idx: np.ndarray,
+                 talent_idx: np.ndarray,
+                 add_language_feature_suffix_flag: bool,
+                 index: Optional[pd.Index] = None):
+        super().__init__(None, None, add_language_feature_suffix_flag)
+        if len(job_idx) != len(talent_idx):
+            raise ValueError(f"job_idx and talent_idx must be of the same length, but are: "
+                             f"{len(job_idx)} and {len(talent_idx)} respectively.")
+        self._unique_jobs = unique_jobs
+        self._unique_talents = unique_talents
+        self.job_idx = np.asarray(job_idx, dtype=np.int32)
+        self.talent_idx = np.asarray(talent_idx, dtype=np.int32)
+        self._index = pd.RangeIndex(len(self.job_idx)) if index is None else index
+        self._iloc = Iloc(self)
+
+    @classmethod
+    def from_pairs(cls, data: PairsDataFrame) -> "NormalizedPairsDataFrame":
+        """
+        Normalize pairs by the content of their jobs and talents: rows are only shared if they are identical, including
+        the order of the list values (node ids ignore the order of e.g. the job roles).
+        :param data:
+        :return:
+        """
+        unique_jobs, job_idx = cls._normalize_items(data.jobs)
+        unique_talents, talent_idx = cls._normalize_items(data.talents)
+        return cls(unique_jobs, unique_talents, job_idx, talent_idx, data.add_language_feature_suffix_flag, data.index)
+
+    @classmethod
+    def cross_product(cls,
+                      jobs: JobsDataFrame,
+                      talents: TalentsDataFrame,
+                      add_language_feature_suffix_flag: bool) -> "NormalizedPairsDataFrame":
+        """
+        All pairs of the given jobs and talents, job major (the talents vary fastest).
+        :param jobs:
+        :param talents:
+        :param add_language_feature_suffix_flag:
+        :return:
+        """
+        job_idx = np.repeat(np.arange(len(jobs), dtype=np.int32), len(talents))
+        talent_idx = np.tile(np.arange(len(talents), dtype=np.int32), len(jobs))
+        return cls(jobs, talents, job_idx, talent_idx, add_language_feature_suffix_flag)
+
+    @classmethod
+    def from_full_json(cls,
+                       raw_job: Union[pd.Series, Dict[str, Any], List[Dict[str, Any]]],
+                       raw_talent: Union[pd.Series, Dict[str, Any], List[Dict[str, Any]]],
+                       add_language_suffix=False,
+                       job_id_registry: Optional[NodeIdRegistry] = None,
+                       talent_id_registry: Optional[NodeIdRegistry] = None) -> "NormalizedPairsDataFrame":
+        return cls.from_pairs(UnlabeledPairsDataFrame.from_full_json(raw_job, raw_talent, add_language_suffix,
+                                                                     job_id_registry, talent_id_registry))
+
+    @staticmethod
+    def _normalize_items(items: ItemDataFrameBase):
+        # the materialized rows have to equal the original ones, so the rows are compared with their list order
+        row_hashes = compute_content_hashes(items.data, unordered_columns=())
+        item_idx, _ = pd.factorize(row_hashes.values)
+        _, first_positions = np.unique(item_idx, return_index=True)
+        unique_items = items.data.iloc[first_positions].reset_index(drop=True)
+        return items.__class__(unique_items), item_idx
+
+    @property
+    def iloc(self) -> "Iloc":
+        return self._iloc
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def unique_jobs(self) -> JobsDataFrame:
+        return self._unique_jobs
+
+    @property
+    def unique_talents(self) -> TalentsDataFrame:
+        return self._unique_talents
+
+    @property
+    def jobs(self) -> JobsDataFrame:
+        return self._materialize(self._unique_jobs, self.job_idx)
+
+    @property
+    def talents(self) -> TalentsDataFrame:
+        return self._materialize(self._unique_talents, self.talent_idx)
+
+    def _materialize(self, unique_items: ItemDataFrameBase, item_idx: np.ndarray) -> ItemDataFrameBase:
+        data = unique_items.data.iloc[item_idx]
+        data.index = self._index
+        return unique_items.__class__(data)
+
+    def reset_index(self, inplace: bool, drop: bool):
+        if not drop:
+            raise ValueError(f"{self.__class__.__name__} only supports reset_index with drop=True.")
+        if inplace:
+            self._index = pd.RangeIndex(len(self))
+        else:
+            return self.__class__(self._unique_jobs, self._unique_talents, self.job_idx, self.talent_idx,
+                                  self.add_language_feature_suffix_flag)
+
+    def __getitem__(self, item: str) -> pd.Series:
+        if not isinstance(item, str):
+            raise TypeError(f"{self.__class__} indices must be strings!")
+        if item in self._unique_jobs.columns:
+            return self.jobs[item]
+        if item in self._unique_talents.columns:
+            return self.talents[item]
+        raise KeyError("Item was not found in any of the two datasets (neither in jobs nor in talents).")
+
+    def add_language_feature_suffix(self):
+        if not self.add_language_feature_suffix_flag:
+            self._unique_jobs.add_language_suffix_to_raw_language_features()
+            self._unique_talents.add_language_suffix_to_raw_language_features()
+            self.add_language_feature_suffix_flag = True
+
+    @classmethod
+    def _from_columnar_tables(cls,
+                              tables: Dict[str, pd.DataFrame],
+                              add_language_feature_suffix_flag: bool) -> "NormalizedPairsDataFrame":
+        return cls.from_pairs(UnlabeledPairsDataFrame._from_columnar_tables(tables, add_language_feature_suffix_flag))
+
+    def as_dataframe(self, jobs_suffix="jobs", talents_suffix="talents") -> pd.DataFrame:
+        return pd.concat((self.jobs.data.rename(lambda x: x + "_" + jobs_suffix, axis='columns'),
+                          self.talents.data.rename(lambda x: x + "_" + talents_suffix, axis='columns')), axis=1)
+
+    def __repr__(self):
+        return f"{self.__class__} object with {len(self)} elements, {len(self._unique_jobs)} unique jobs and " \
+               f"{len(self._unique_talents)} unique talents. \nJobs: {self._unique_jobs.columns}, " \
+               f"\nTalents: {self._unique_talents.columns}."
+
+    def __len__(self):
+        return len(self.job_idx)
+
+
+class Iloc(IlocBase):
+
+    def __getitem__(self, item: Union[int, List[int], slice]) -> NormalizedPairsDataFrame:
+        if isinstance(item, (int, np.integer)):
+            item = [item]
+        unique_jobs, job_idx = self._compact(self.data.unique_jobs, self.data.job_idx[item])
+        unique_talents, talent_idx = self._compact(self.data.unique_talents, self.data.talent_idx[item])
+        return NormalizedPairsDataFrame(unique_jobs, unique_talents, job_idx, talent_idx,
+                                        self.data.add_language_feature_suffix_flag, self.data.index[item])
+
+    @staticmethod
+    def _compact(unique_items: ItemDataFrameBase, item_idx: np.ndarray):
+        # only the rows referenced by the selected pairs are kept, so that e.g. the chunks of a parallel transform
+        # encode and pickle their own items and not the ones of the whole batch
+        referenced, item_idx = np.unique(item_idx, return_inverse=True)
+        items = unique_items.data.iloc[referenced].reset_index(drop=True)
+        return unique_items.__class__(items), item_idx
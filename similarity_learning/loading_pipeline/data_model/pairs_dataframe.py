@@ -2,10 +2,11 @@ from abc import ABC, abstractmethod
 import pandas as pd
 from .jobs_dataframe import JobsDataFrame
 from .talents_dataframe import TalentsDataFrame
-from typing import Union, List
+from typing import Union, List, Dict, Optional
 import pickle
 from pathlib import Path
 from copy import deepcopy
+from ..preprocessing.columnar_storage import write_columnar_tables, read_columnar_tables, Rows
 
 
 class PairsDataFrame(ABC):
@@ -67,6 +68,42 @@ class PairsDataFrame(ABC):
             raise TypeError(f"Loaded data is not of type {cls}")
         return data
 
+    def to_columnar(self, file_path: Union[Path, str], compress: bool = False):
+        """
+        Save the data in the columnar .npz format (see write_columnar_tables), which loads much faster than the pickle
+        and can be read partially, with from_columnar or read_columnar_table.
+        :param file_path:
+        :param compress:
+        :return:
+        """
+        write_columnar_tables(file_path, self._columnar_tables(),
+                              metadata={"add_language_feature_suffix_flag": self.add_language_feature_suffix_flag},
+                              compress=compress)
+
+    @classmethod
+    def from_columnar(cls, file_path: Union[Path, str], rows: Optional[Rows] = None):
+        """
+        Load data saved by to_columnar.
+        :param file_path:
+        :param rows: positions (as for iloc) of the pairs to load, by default all pairs
+        :return:
+        """
+        tables, metadata = read_columnar_tables(file_path, rows=rows)
+        return cls._from_columnar_tables(tables, metadata["add_language_feature_suffix_flag"])
+
+    def _columnar_tables(self) -> Dict[str, pd.DataFrame]:
+        return {"jobs": self.jobs.data, "talents": self.talents.data}
+
+    @classmethod
+    @abstractmethod
+    def _from_columnar_tables(cls, tables: Dict[str, pd.DataFrame], add_language_feature_suffix_flag: bool):
+        """
+        Build the object from the tables stored by to_columnar.
+        :param tables:
+        :param add_language_feature_suffix_flag:
+        :return:
+        """
+
     def add_language_feature_suffix(self):
         if not self.add_language_feature_suffix_flag:
             self._jobs.add_language_suffix_to_raw_language_features()
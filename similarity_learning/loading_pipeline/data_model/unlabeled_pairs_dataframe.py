@@ -1,8 +1,9 @@
 import pandas as pd
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Optional
 from .jobs_dataframe import JobsDataFrame
 from .talents_dataframe import TalentsDataFrame
 from similarity_learning.exceptions import DataLoadingError
+from ..preprocessing.node_id_registry import NodeIdRegistry
 from .pairs_dataframe import PairsDataFrame, IlocBase
 
 
@@ -39,15 +40,23 @@ class UnlabeledPairsDataFrame(PairsDataFrame):
     def from_full_json(cls,
                        raw_job: Union[pd.Series, Dict[str, Any], List[Dict[str, Any]]],
                        raw_talent: Union[pd.Series, Dict[str, Any], List[Dict[str, Any]]],
-                       add_language_suffix=False) -> "UnlabeledPairsDataFrame":
-        jobs = JobsDataFrame.from_full_json(raw_job, add_language_suffix)
-        talents = TalentsDataFrame.from_full_json(raw_talent, add_language_suffix)
+                       add_language_suffix=False,
+                       job_id_registry: Optional[NodeIdRegistry] = None,
+                       talent_id_registry: Optional[NodeIdRegistry] = None) -> "UnlabeledPairsDataFrame":
+        jobs = JobsDataFrame.from_full_json(raw_job, add_language_suffix, job_id_registry)
+        talents = TalentsDataFrame.from_full_json(raw_talent, add_language_suffix, talent_id_registry)
 
         if list(jobs.index) != list(talents.index):
             raise DataLoadingError("Loaded objects for jobs and talents do not have the same index!")
 
         return cls(jobs, talents, add_language_suffix)
 
+    @classmethod
+    def _from_columnar_tables(cls,
+                              tables: Dict[str, pd.DataFrame],
+                              add_language_feature_suffix_flag: bool) -> "UnlabeledPairsDataFrame":
+        return cls(JobsDataFrame(tables["jobs"]), TalentsDataFrame(tables["talents"]), add_language_feature_suffix_flag)
+
     def as_dataframe(self, jobs_suffix="jobs", talents_suffix="talents") -> pd.DataFrame:
         return pd.concat((self._jobs.data.rename(lambda x: x + "_" + jobs_suffix, axis='columns'),
                           self._talents.data.rename(lambda x: x + "_" + talents_suffix, axis='columns')), axis=1)
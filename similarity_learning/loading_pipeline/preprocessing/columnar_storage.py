@@ -0,0 +1,194 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Union, Dict, List, Any, Optional, Tuple
+from similarity_learning.exceptions import DataLoadingError
+
+COLUMNAR_FORMAT_VERSION = 2
+# version 1 files have no missing masks, they are read as files without missing values
+_READABLE_COLUMNAR_FORMAT_VERSIONS = (1, 2)
+_METADATA_KEY = "metadata"
+
+# kinds of stored columns
+NUMERIC = "numeric"
+CATEGORICAL = "categorical"
+LIST = "list"
+
+Rows = Union[slice, List[int], np.ndarray]
+
+
+def write_columnar_tables(file_path: Union[Path, str],
+                          tables: Dict[str, pd.DataFrame],
+                          metadata: Optional[Dict[str, Any]] = None,
+                          compress: bool = False):
+    """
+    Store dataframes column by column in a single .npz file. Every column is stored as plain arrays (no pickles):
+    numeric columns as they are, string columns as categories + codes, and list columns as the flattened values
+    (themselves numeric or categories + codes) and the offsets of the lists. Missing values (None or NaN) of string
+    and list columns are stored as a mask next to the values and are read as NaN.
+    :param file_path:
+    :param tables: name -> dataframe, names must not contain "/"
+    :param metadata: additional JSON serializable information stored with the tables
+    :param compress: whether to compress the members of the file (slower to write and read, but smaller)
+    :return:
+    """
+    arrays = {}
+    layout = {}
+    for table_name, table in tables.items():
+        index = np.asarray(table.index)
+        if index.dtype.kind not in "iu":
+            raise ValueError(f"Only integer indices can be stored, the index of {table_name} is of type {index.dtype}.")
+        arrays[f"{table_name}/index"] = index
+
+        columns = []
+        for column_name, column in table.items():
+            kind, column_arrays = _encode_column(column)
+            columns.append({"name": column_name, "kind": kind})
+            arrays.update({f"{table_name}/{column_name}/{part}": array for part, array in column_arrays.items()})
+        layout[table_name] = columns
+
+    arrays[_METADATA_KEY] = np.array(json.dumps({"format_version": COLUMNAR_FORMAT_VERSION,
+                                                 "tables": layout,
+                                                 "metadata": metadata or {}}))
+    with open(file_path, "wb") as f:
+        (np.savez_compressed if compress else np.savez)(f, **arrays)
+
+
+def read_columnar_tables(file_path: Union[Path, str],
+                         columns: Optional[Dict[str, List[str]]] = None,
+                         rows: Optional[Rows] = None) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+    """
+    Read the tables stored by write_columnar_tables. Only the arrays of the requested columns are read from the file,
+    and the requested rows are selected before any python objects (strings, lists) are built.
+    :param file_path:
+    :param columns: table name -> column names to read, by default all tables with all their columns
+    :param rows: positions (as for iloc) of the rows to read from every table, by default all rows
+    :return: tables, metadata
+    """
+    with np.load(file_path, allow_pickle=False) as stored:
+        file_metadata = json.loads(str(stored[_METADATA_KEY]))
+        if file_metadata["format_version"] not in _READABLE_COLUMNAR_FORMAT_VERSIONS:
+            raise DataLoadingError(f"Unsupported columnar format version: {file_metadata['format_version']}.")
+        layout = file_metadata["tables"]
+
+        if columns is None:
+            columns = {table_name: [column["name"] for column in table] for table_name, table in layout.items()}
+
+        tables = {}
+        for table_name, column_names in columns.items():
+            if table_name not in layout:
+                raise KeyError(f"No {table_name} table in {file_path}.")
+            kinds = {column["name"]: column["kind"] for column in layout[table_name]}
+            index = stored[f"{table_name}/index"]
+            if rows is not None:
+                index = index[rows]
+
+            data = {}
+            for column_name in column_names:
+                if column_name not in kinds:
+                    raise KeyError(f"No {column_name} column in the {table_name} table.")
+                data[column_name] = _decode_column(stored, f"{table_name}/{column_name}", kinds[column_name], rows)
+            table = pd.DataFrame(data, index=pd.RangeIndex(len(index)))
+            table.index = pd.Index(index)
+            tables[table_name] = table
+
+    return tables, file_metadata["metadata"]
+
+
+def read_columnar_table(file_path: Union[Path, str],
+                        table_name: str,
+                        columns: Optional[List[str]] = None,
+                        rows: Optional[Rows] = None) -> pd.DataFrame:
+    """
+    Read a single table (or some of its columns) stored by write_columnar_tables.
+    :param file_path:
+    :param table_name:
+    :param columns: by default all columns
+    :param rows: by default all rows
+    :return:
+    """
+    if columns is None:
+        with np.load(file_path, allow_pickle=False) as stored:
+            layout = json.loads(str(stored[_METADATA_KEY]))["tables"]
+        if table_name not in layout:
+            raise KeyError(f"No {table_name} table in {file_path}.")
+        columns = [column["name"] for column in layout[table_name]]
+    tables, _ = read_columnar_tables(file_path, {table_name: columns}, rows)
+    return tables[table_name]
+
+
+def _encode_column(column: pd.Series) -> Tuple[str, Dict[str, np.ndarray]]:
+    if column.dtype != object:
+        return NUMERIC, {"values": column.values}
+
+    is_list = column.map(lambda value: isinstance(value, list))
+    if is_list.any():
+        if not is_list.all():
+            raise ValueError(f"The {column.name} column mixes lists with other values ({(~is_list).sum()} rows are not "
+                             f"lists), only columns of lists can be stored as list columns.")
+        lengths = np.fromiter(map(len, column), dtype=np.int64, count=len(column))
+        offsets = np.zeros(len(column) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = [value for values in column for value in values]
+        return LIST, {"offsets": offsets, **_encode_values(values, column.name)}
+
+    return CATEGORICAL, _encode_values(list(column), column.name)
+
+
+def _encode_values(values: List[Any], column_name: str) -> Dict[str, np.ndarray]:
+    """
+    :param values:
+    :param column_name:
+    :return: categories + codes of string values or the numeric values, with the missing mask if any value is missing
+    (the codes of missing values are -1, their numeric values are 0)
+    """
+    # missing values have to be removed before the conversion, which would turn NaN into the string "nan"
+    missing = np.asarray(pd.isna(np.asarray(values, dtype=object)), dtype=bool).reshape(-1)
+    array = np.asarray([value for value, is_missing in zip(values, missing) if not is_missing])
+    if array.dtype.kind == "U":
+        categories, codes = np.unique(array, return_inverse=True)
+        encoded = {"categories": categories, "codes": np.full(len(values), -1, dtype=np.int32)}
+        encoded["codes"][~missing] = codes
+    elif array.dtype.kind == "O":
+        raise ValueError(f"The values of the {column_name} column cannot be stored in a columnar format.")
+    else:
+        encoded = {"values": np.zeros(len(values), dtype=array.dtype)}
+        encoded["values"][~missing] = array
+    if missing.any():
+        encoded["missing"] = missing
+    return encoded
+
+
+def _decode_column(stored: Any, key: str, kind: str, rows: Optional[Rows]) -> pd.Series:
+    if kind == NUMERIC:
+        values = stored[f"{key}/values"]
+        return pd.Series(values if rows is None else values[rows])
+
+    if kind == CATEGORICAL:
+        return pd.Series(_decode_values(stored, key, slice(None) if rows is None else rows), dtype=object)
+
+    offsets = stored[f"{key}/offsets"]
+    starts, stops = offsets[:-1], offsets[1:]
+    if rows is not None:
+        starts, stops = starts[rows], stops[rows]
+    lengths = stops - starts
+    new_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    # position of each selected value among the stored values
+    positions = np.arange(new_offsets[-1]) + np.repeat(starts - new_offsets[:-1], lengths)
+
+    values = _decode_values(stored, key, positions)
+    bounds = new_offsets.tolist()
+    return pd.Series([values[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])], dtype=object)
+
+
+def _decode_values(stored: Any, key: str, positions: Rows) -> List[Any]:
+    if f"{key}/categories" in stored:
+        values = stored[f"{key}/categories"][stored[f"{key}/codes"][positions]].tolist()
+    else:
+        values = stored[f"{key}/values"][positions].tolist()
+    if f"{key}/missing" in stored:
+        for i in np.flatnonzero(stored[f"{key}/missing"][positions]):
+            values[i] = np.nan
+    return values
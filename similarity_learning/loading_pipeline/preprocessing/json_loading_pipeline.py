@@ -1,9 +1,9 @@
 import pandas as pd
 from pathlib import Path
-from typing import Union, List, Tuple
+from typing import Union, List, Tuple, Iterator, Dict, Any
 from similarity_learning.globals import JSON_FORMAT_FIELDS
 from similarity_learning.exceptions import UnexpectedJsonFormatException
-
+from .json_streaming import iter_json_records
 
 
 class JsonLoadingPipeLine:
@@ -17,6 +17,29 @@ class JsonLoadingPipeLine:
         raw_data = self._load_full_json(file_path)
         return self._split_into_constituent_dataframes(raw_data)
 
+    def iter_chunks(self, file_path: Union[Path, str], chunk_size: int) -> Iterator[Tuple[pd.Series, ...]]:
+        """
+        Streaming version of __call__ for files that do not fit in memory: the file (a JSON array or NDJSON) is
+        parsed incrementally and split into chunks of at most chunk_size records. The series of each chunk are indexed
+        from 0, like the ones of a file holding only the records of the chunk.
+        :param file_path:
+        :param chunk_size:
+        :return:
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+        records = []
+        for record in iter_json_records(file_path):
+            if set(record.keys()) != set(self.high_level_keys):
+                raise UnexpectedJsonFormatException(f"loaded record from json file does not have the expected "
+                                                    f"keys: {self.high_level_keys}, and has {list(record.keys())} instead.")
+            records.append(record)
+            if len(records) == chunk_size:
+                yield self._split_records_into_constituent_series(records)
+                records = []
+        if records:
+            yield self._split_records_into_constituent_series(records)
+
     def _load_full_json(self, file_path: Union[Path, str])->pd.DataFrame:
         raw_data = pd.read_json(file_path)
         if set(raw_data.columns) != set(self.high_level_keys):
@@ -27,3 +50,6 @@ class JsonLoadingPipeLine:
 
     def _split_into_constituent_dataframes(self, raw_data: pd.DataFrame) -> Tuple[pd.Series,...]:
         return tuple([raw_data[key] for key in self.high_level_keys])
+
+    def _split_records_into_constituent_series(self, records: List[Dict[str, Any]]) -> Tuple[pd.Series, ...]:
+        return tuple([pd.Series([record[key] for record in records], name=key) for key in self.high_level_keys])
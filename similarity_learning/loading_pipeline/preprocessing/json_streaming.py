@@ -0,0 +1,147 @@
+import json
+from pathlib import Path
+from typing import Union, Iterator, Dict, Any
+from similarity_learning.exceptions import UnexpectedJsonFormatException
+
+JSON_STREAMING_BUFFER_SIZE = 1 << 20
+# records (or malformed data) of more characters raise instead of being buffered further
+JSON_STREAMING_MAX_RECORD_SIZE = 16 * JSON_STREAMING_BUFFER_SIZE
+# a decoding error this close to the end of the buffer may be caused by a record (e.g. a literal) cut by the buffer
+_MAX_CUT_TOKEN_LENGTH = 16
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_records(file_path: Union[Path, str],
+                      buffer_size: int = JSON_STREAMING_BUFFER_SIZE,
+                      max_record_size: int = JSON_STREAMING_MAX_RECORD_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse the objects of a file which holds either a single JSON array of objects, or one object per line
+    (NDJSON). Only a buffer of roughly buffer_size characters (or one record, if it is larger) is held in memory.
+    NDJSON is decoded line by line, so that a malformed line raises right away.
+    :param file_path:
+    :param buffer_size: number of characters read from the file at once
+    :param max_record_size: records of more characters raise an UnexpectedJsonFormatException, which bounds the
+    buffer also for malformed data
+    :return:
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf8") as f:
+        reader = _BufferedReader(f, buffer_size, max_record_size)
+        is_array = reader.skip_whitespace() and reader.peek() == "["
+        if is_array:
+            reader.position += 1
+
+        expect_separator = False
+        while reader.skip_whitespace():
+            if is_array and reader.peek() == "]":
+                reader.position += 1
+                if reader.skip_whitespace():
+                    raise UnexpectedJsonFormatException("Unexpected data after the end of the JSON array.")
+                return
+            if is_array and expect_separator:
+                if reader.peek() != ",":
+                    raise UnexpectedJsonFormatException(f"Expected ',' between the elements of the JSON array, "
+                                                        f"got {reader.peek()!r}.")
+                reader.position += 1
+                expect_separator = False
+                continue
+
+            record = reader.decode(decoder) if is_array else reader.decode_line(decoder)
+            if not isinstance(record, dict):
+                raise UnexpectedJsonFormatException(f"Expected JSON objects as records, got {type(record)}.")
+            expect_separator = True
+            yield record
+
+        if is_array:
+            raise UnexpectedJsonFormatException("The JSON array is not terminated.")
+
+
+class _BufferedReader:
+    def __init__(self, file, buffer_size: int, max_record_size: int):
+        self.file = file
+        self.buffer_size = buffer_size
+        self.max_record_size = max_record_size
+        self.buffer = ""
+        self.position = 0
+        self.is_exhausted = False
+
+    def peek(self) -> str:
+        return self.buffer[self.position]
+
+    def read_more(self) -> bool:
+        """
+        Drop the consumed part of the buffer and append the next chunk of the file.
+        :return: whether anything was read
+        """
+        chunk = self.file.read(self.buffer_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.is_exhausted = not chunk
+        return bool(chunk)
+
+    def skip_whitespace(self) -> bool:
+        """
+        :return: whether there is any non whitespace data left
+        """
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return True
+            if not self.read_more():
+                return False
+
+    def read_more_of_record(self) -> bool:
+        """
+        read_more while decoding a record, which starts at the position.
+        :return: whether anything was read
+        """
+        if len(self.buffer) - self.position > self.max_record_size:
+            raise UnexpectedJsonFormatException(f"A JSON record is longer than {self.max_record_size} characters, "
+                                                f"or the data is malformed.")
+        return self.read_more()
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as e:
+                # the record may be cut at the end of the buffer, then the error is found at its end (or is caused by a
+                # string which is cut), other errors are in the data
+                is_cut = e.pos >= len(self.buffer) - _MAX_CUT_TOKEN_LENGTH or e.msg.startswith("Unterminated string")
+                if is_cut and self.read_more_of_record():
+                    continue
+                raise UnexpectedJsonFormatException(f"Could not decode JSON record: {e}") from e
+            # a number or literal at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.is_exhausted and not isinstance(value, (dict, list, str)):
+                if self.read_more_of_record():
+                    continue
+            self.position = end
+            return value
+
+    def decode_line(self, decoder: json.JSONDecoder) -> Any:
+        """
+        Decode the NDJSON record at the position, which ends at the next line break (or the end of the file).
+        :param decoder:
+        :return:
+        """
+        search_start = self.position
+        while True:
+            end = self.buffer.find("\n", search_start)
+            if end >= 0:
+                break
+            searched_length = len(self.buffer) - self.position
+            if not self.read_more_of_record():
+                end = len(self.buffer)
+                break
+            search_start = searched_length
+
+        line = self.buffer[self.position:end]
+        try:
+            value, value_end = decoder.raw_decode(line)
+        except json.JSONDecodeError as e:
+            raise UnexpectedJsonFormatException(f"Could not decode JSON record: {e}") from e
+        if line[value_end:].strip(_WHITESPACE):
+            raise UnexpectedJsonFormatException(f"Unexpected data after the JSON record: {line[value_end:][:50]!r}.")
+        self.position = end
+        return value
@@ -1,28 +1,70 @@
 import pandas as pd
-from typing import Dict
+import numpy as np
+import json
+from typing import List, Any, Optional, Iterable
+from .node_id_registry import NodeIdRegistry
 
+# multi valued features whose order carries no information, they are sorted before hashing
+UNORDERED_LIST_COLUMNS = ("job_roles", "seniorities")
 
-def generate_node_ids(dataframe: pd.DataFrame, new_column_name = "node_id") -> pd.Series:
-    quasi_hash = compute_quasi_hash(dataframe)
-    hash_map = generate_hash_map(quasi_hash)
-    ids = compute_ids(quasi_hash, hash_map)
-    return ids
 
-def compute_quasi_hash(dataframe : pd.DataFrame) -> pd.Series:
+def generate_node_ids(dataframe: pd.DataFrame,
+                      new_column_name = "node_id",
+                      registry: Optional[NodeIdRegistry] = None) -> pd.Series:
     """
-    To generate node ids (job or talent) we need to find the unique sets of feature_engineering. However, a pd.Series (i.e. in this
-    case a row of the pd.DataFrame) cannot be hashed, and one cannot call unique on a dataframe. To this end we encode
-    the row as a concatenation of all its values as string, in order to then be able to call unique.
+    Identify the unique jobs (or talents) by the content hash of their rows. Without a registry the ids are dense and
+    local to the dataframe (in the order of first appearance), with a registry they are the global ids assigned by it.
     :param dataframe:
+    :param new_column_name:
+    :param registry:
     :return:
     """
-    quasi_hash = dataframe.apply(lambda x: ''.join([str(i) for i in x]), axis=1)
-    return quasi_hash
+    content_hashes = compute_content_hashes(dataframe, exclude_columns=(new_column_name,))
+    if registry is not None:
+        ids = registry.get_or_assign(content_hashes.values)
+    else:
+        ids, _ = pd.factorize(content_hashes.values)
+    return pd.Series(ids.astype(np.int64), index=dataframe.index)
 
-def generate_hash_map(quasy_hash: pd.Series) -> Dict[str, int]:
-    job_hash_map = {hash_: i for i, hash_ in enumerate(quasy_hash.unique())}
-    return job_hash_map
+def compute_content_hashes(dataframe: pd.DataFrame,
+                           exclude_columns: Iterable[str] = ("node_id",),
+                           unordered_columns: Iterable[str] = UNORDERED_LIST_COLUMNS) -> pd.Series:
+    """
+    Stable (across processes and runs) 64-bit hash of the content of each row. Unlike local node ids, which are only
+    valid within one batch, the content hash identifies the same job or talent in any batch, so it can be used as a
+    cache key. The rows are hashed column by column with the (vectorized, fixed key) pandas hashing, after
+    canonicalization: the columns are taken in sorted order and list values are serialized as JSON (sorted for the
+    unordered columns), so adjacent values cannot run into each other as in a plain string concatenation.
+    :param dataframe:
+    :param exclude_columns: columns which do not describe the content of the item
+    :param unordered_columns: list columns whose order is irrelevant
+    :return: uint64 hashes
+    """
+    columns = sorted(column for column in dataframe.columns if column not in exclude_columns)
+    if not columns:
+        return pd.Series(np.zeros(len(dataframe), dtype=np.uint64), index=dataframe.index)
+    canonical = pd.DataFrame({column: canonicalize_column(dataframe[column], column in unordered_columns)
+                              for column in columns}, index=dataframe.index)
+    return pd.util.hash_pandas_object(canonical, index=False)
+
+def canonicalize_column(column: pd.Series, is_unordered: bool = False) -> pd.Series:
+    """
+    Map a column to values which pandas can hash: list values to their JSON serialization, other values unchanged.
+    :param column:
+    :param is_unordered: whether to sort the list values
+    :return:
+    """
+    if column.dtype != object:
+        return column
+    values = column.values.tolist()
+    if not any(isinstance(value, list) for value in values):
+        return column
+    if is_unordered:
+        return pd.Series([json.dumps(sorted(value, key=str), default=_to_builtin) for value in values],
+                         index=column.index, dtype=object)
+    return pd.Series([json.dumps(value, default=_to_builtin) for value in values], index=column.index, dtype=object)
 
-def compute_ids(quasi_hash: pd.Series, hash_map: Dict[str, int]) -> pd.Series:
-    ids = quasi_hash.apply(lambda x: hash_map[x])
-    return ids
\ No newline at end of file
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    return str(value)
@@ -0,0 +1,78 @@
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Union, Optional
+
+
+class NodeIdRegistry:
+    """
+    Maps the content hashes of jobs (or talents) to dense global node ids: the first hash ever seen gets id 0, the next
+    new one id 1 etc. If a file path is given, the registry is loaded from and saved to it (as the .npy array of the
+    hashes in the order of their ids), so the ids stay the same across batches and process restarts. Use a separate
+    registry for jobs and for talents.
+    """
+    def __init__(self, file_path: Optional[Union[Path, str]] = None):
+        self.file_path = Path(file_path) if file_path is not None else None
+        if self.file_path is not None and self.file_path.exists():
+            hashes = np.load(self.file_path)
+        else:
+            hashes = np.empty(0, dtype=np.uint64)
+        self._set_hashes(hashes.astype(np.uint64))
+
+    def _set_hashes(self, hashes: np.ndarray):
+        # id -> hash, and the hashes in sorted order (with their ids) for vectorized lookups
+        self._hashes = hashes
+        self._sorting_ids = np.argsort(hashes, kind="stable")
+        self._sorted_hashes = hashes[self._sorting_ids]
+
+    def lookup(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        :param hashes:
+        :return: the ids of the hashes, -1 for hashes which are not registered
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(self._hashes):
+            return np.full(len(hashes), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._sorted_hashes, hashes), len(self._hashes) - 1)
+        is_registered = self._sorted_hashes[positions] == hashes
+        return np.where(is_registered, self._sorting_ids[positions], -1).astype(np.int64)
+
+    def get_or_assign(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Ids of the hashes, new hashes are registered (in the order of their first appearance) and, if the registry has
+        a file, saved.
+        :param hashes:
+        :return:
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        ids = self.lookup(hashes)
+        is_new = ids < 0
+        if is_new.any():
+            new_hashes = pd.unique(hashes[is_new])
+            self._set_hashes(np.concatenate((self._hashes, new_hashes)))
+            ids[is_new] = self.lookup(hashes[is_new])
+            if self.file_path is not None:
+                self.save()
+        return ids
+
+    def save(self, file_path: Optional[Union[Path, str]] = None):
+        """
+        Atomically (write and rename) save the registry.
+        :param file_path: by default the file of the registry
+        :return:
+        """
+        file_path = Path(file_path) if file_path is not None else self.file_path
+        if file_path is None:
+            raise ValueError("The registry has no file path to save to.")
+        temporary_file_path = file_path.with_name(file_path.name + ".tmp")
+        with open(temporary_file_path, "wb") as f:
+            np.save(f, self._hashes)
+        os.replace(temporary_file_path, file_path)
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} with {len(self)} ids" + \
+               (f", stored in {self.file_path}." if self.file_path is not None else ".")
@@ -1,11 +1,61 @@
 from similarity_learning.inference import Model
 from similarity_learning.inference.model_output import ModelOutput
+from similarity_learning.inference.shadowed_model import MultiModelOutput, ShadowedModel
 from similarity_learning.loading_pipeline import UnlabeledPairsDataFrame
-from typing import List, Dict, Any
+from similarity_learning.index import JobIndex, TalentIndex, JobBlockingIndex, BlockingRules
+from similarity_learning.index.top_k import top_k_indices
+from similarity_learning.serving.micro_batcher import MicroBatcher, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_DELAY_MS
+from similarity_learning.serving.result_cache import ResultCache, pair_cache_key
+from similarity_learning.exceptions import NotSetAttributeError
+from similarity_learning.instrumentation import stage
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import numpy as np
+
+# number of corpus items scored at once by top_k_jobs/top_k_talents, bounds the size of the pair feature matrix
+TOP_K_SCORING_BATCH_SIZE = 65536
+
 
 class Search:
-    def __init__(self, model: Model) -> None:
+    def __init__(self,
+                 model: Model,
+                 job_index: Optional[JobIndex] = None,
+                 talent_index: Optional[TalentIndex] = None,
+                 max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_batch_delay_ms: float = MICRO_BATCH_MAX_DELAY_MS,
+                 result_cache_size: int = 0,
+                 result_cache_ttl: Optional[float] = None,
+                 model_version: Optional[str] = None) -> None:
+        """
+        :param result_cache_size: number of pair results kept by match/match_bulk, 0 disables the result cache
+        :param result_cache_ttl: seconds after which a cached result expires, None for never
+        :param model_version: part of the result cache keys, by default the identity of the model object
+        """
         self.model = model
+        self.job_index = job_index
+        self.talent_index = talent_index
+        # prunes the job corpus before scoring in top_k_jobs, see index_jobs
+        self.job_blocking_index: Optional[JobBlockingIndex] = None
+        # concurrent amatch/amatch_bulk requests are predicted together in batches
+        self.micro_batcher = MicroBatcher(self._match_batch, max_batch_size, max_batch_delay_ms)
+        self.result_cache = ResultCache(result_cache_size, result_cache_ttl) if result_cache_size > 0 else None
+        self.model_version = model_version
+
+    def index_jobs(self, jobs: List[dict], blocking_rules: Optional[BlockingRules] = None) -> JobIndex:
+        """
+        Load and encode the job corpus once, to be queried by top_k_jobs. With blocking_rules, top_k_jobs only scores
+        the jobs which satisfy the rules (see JobBlockingIndex), the others are never returned.
+        """
+        self.job_index = JobIndex.from_full_json(jobs, self.model.feature_extractor)
+        self.job_blocking_index = None if blocking_rules is None else JobBlockingIndex(self.job_index.items,
+                                                                                        blocking_rules)
+        return self.job_index
+
+    def index_talents(self, talents: List[dict]) -> TalentIndex:
+        """
+        Load and encode the talent corpus once, to be queried by top_k_talents.
+        """
+        self.talent_index = TalentIndex.from_full_json(talents, self.model.feature_extractor)
+        return self.talent_index
 
     def match(self, talent: dict, job: dict) -> dict:
         """
@@ -21,9 +71,22 @@ class Search:
                   "score": ...
                 }
         """
-        data = UnlabeledPairsDataFrame.from_full_json(job, talent, add_language_suffix=True)
-        output: ModelOutput = self.model.predict(data)
-        return {"talent": talent, "job": job, "label": output.labels[0], "score": output.similarity_scores[0]}
+        if self.result_cache is not None:
+            key = self._cache_key(talent, job)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                result = {"talent": talent, "job": job, "label": cached[0], "score": cached[1]}
+                if len(cached) == 3:
+                    result["shadow_scores"] = cached[2]
+                return result
+
+        output: ModelOutput = self.model.predict_pair(talent, job)
+        if self.result_cache is not None:
+            self.result_cache.put(key, self._cache_entries(output)[0])
+        result = {"talent": talent, "job": job, "label": output.labels[0], "score": output.similarity_scores[0]}
+        if isinstance(output, MultiModelOutput):
+            result["shadow_scores"] = output.shadow_scores(0)
+        return result
 
     def match_bulk(self, talents: list[dict], jobs: list[dict]) -> list[dict]:
         """
@@ -49,17 +112,168 @@ class Search:
           ...
         ]
         """
+        if self.result_cache is None:
+            return self.format_batch_output(talents, jobs, self._predict_bulk(talents, jobs))
+
+        # only the distinct pairs which are not cached are predicted
+        keys = [self._cache_key(talent, job) for talent, job in zip(talents, jobs)]
+        results = {}
+        missing = {}
+        for i, key in enumerate(keys):
+            if key in results or key in missing:
+                continue
+            cached = self.result_cache.get(key)
+            if cached is None:
+                missing[key] = i
+            else:
+                results[key] = cached
+        if missing:
+            missing_positions = list(missing.values())
+            output = self._predict_bulk([talents[i] for i in missing_positions], [jobs[i] for i in missing_positions])
+            for key, result in zip(missing.keys(), self._cache_entries(output)):
+                results[key] = result
+                self.result_cache.put(key, result)
+
+        return self.format_batch_output(talents, jobs, self._output_from_cache_entries([results[key] for key in keys]))
+
+    @staticmethod
+    def _cache_entries(output: ModelOutput) -> List[tuple]:
+        """
+        :return: the result cache entry of every pair: (label, score), and the shadow scores for MultiModelOutputs
+        """
+        if isinstance(output, MultiModelOutput):
+            return [(label, score, output.shadow_scores(i)) for i, (label, score) in enumerate(output)]
+        return list(output)
+
+    def _output_from_cache_entries(self, entries: List[tuple]) -> ModelOutput:
+        output = ModelOutput([entry[0] for entry in entries], np.array([entry[1] for entry in entries], dtype=np.float64))
+        if not entries or len(entries[0]) == 2:
+            return output
+        shadow_outputs = {}
+        for name in entries[0][2]:
+            shadow_scores = np.array([entry[2][name] for entry in entries], dtype=np.float64)
+            shadow_outputs[name] = ModelOutput(self.model.shadows[name].label_assignment(shadow_scores), shadow_scores)
+        return MultiModelOutput(output, shadow_outputs)
+
+    def _predict_bulk(self, talents: List[dict], jobs: List[dict]) -> ModelOutput:
         data = UnlabeledPairsDataFrame.from_full_json(jobs, talents, add_language_suffix=True)
-        output: ModelOutput = self.model.predict(data)
-        return self.format_batch_output(talents, jobs, output)
+        return self.model.predict(data)
+
+    def _cache_key(self, talent: dict, job: dict) -> str:
+        model_version = self.model_version if self.model_version is not None else f"{type(self.model).__name__}@{id(self.model)}"
+        return pair_cache_key(talent, job, model_version)
+
+    async def amatch(self, talent: dict, job: dict) -> dict:
+        """
+        Coroutine version of match. Concurrent requests are collected by the micro batcher and predicted together,
+        with a single model.predict call per batch.
+        """
+        return await self.micro_batcher.submit((talent, job))
+
+    async def amatch_bulk(self, talents: list[dict], jobs: list[dict]) -> list[dict]:
+        """
+        Coroutine version of match_bulk, whose pairs are micro batched as in amatch.
+        """
+        if len(talents) != len(jobs):
+            raise ValueError(f"talents and jobs must be of the same length, but are: "
+                             f"{len(talents)} and {len(jobs)} respectively.")
+        return await self.micro_batcher.submit_many(list(zip(talents, jobs)))
+
+    async def aclose(self):
+        """
+        Finish the pending amatch/amatch_bulk requests and release the micro batcher.
+        """
+        await self.micro_batcher.close()
+
+    def _match_batch(self, pairs: List[Tuple[dict, dict]]) -> List[dict]:
+        talents = [talent for talent, _ in pairs]
+        jobs = [job for _, job in pairs]
+        return self.match_bulk(talents, jobs)
+
+    def top_k_jobs(self, talent: dict, k: int) -> list[dict]:
+        """
+        ==> Method description <==
+        This method scores a single talent against the whole indexed job corpus (see index_jobs) and returns
+        the k best matching jobs, in the schema of match_bulk (sorted descending by score). If the corpus was
+        indexed with blocking rules, only the jobs which satisfy them are scored and returned. The corpus is ranked
+        by the primary model of a ShadowedModel only, the results hold no shadow scores.
+        """
+        if self.job_index is None:
+            raise NotSetAttributeError("No job index has been set, call index_jobs first.")
+        encoded_talent = TalentIndex.encode_items([talent], self.model.feature_extractor)
+        ranking_model = self._ranking_model()
+
+        if self.job_blocking_index is None:
+            scores = self._score_index(len(self.job_index),
+                                       lambda batch: ranking_model.predict_encoded(self.job_index.encoded.take(batch),
+                                                                                   encoded_talent))
+            top_k = top_k_indices(scores, k)
+            top_k_positions = top_k
+        else:
+            # only the candidates which pass the blocking rules are scored
+            with stage("blocking.jobs", len(self.job_blocking_index)):
+                candidates = self.job_blocking_index.candidates(talent).candidates
+            scores = self._score_index(len(candidates),
+                                       lambda batch: ranking_model.predict_encoded(
+                                           self.job_index.encoded.take(candidates[batch]), encoded_talent))
+            top_k = top_k_indices(scores, k)
+            top_k_positions = candidates[top_k]
+        jobs = [self.job_index[i] for i in top_k_positions]
+        return self.format_batch_output([talent] * len(jobs), jobs, self._top_k_output(scores[top_k]))
+
+    def top_k_talents(self, job: dict, k: int) -> list[dict]:
+        """
+        ==> Method description <==
+        This method scores a single job against the whole indexed talent corpus (see index_talents) and returns
+        the k best matching talents, in the schema of match_bulk (sorted descending by score). As in top_k_jobs,
+        only the primary model of a ShadowedModel ranks the corpus.
+        """
+        if self.talent_index is None:
+            raise NotSetAttributeError("No talent index has been set, call index_talents first.")
+        encoded_job = JobIndex.encode_items([job], self.model.feature_extractor)
+        ranking_model = self._ranking_model()
+
+        scores = self._score_index(len(self.talent_index),
+                                   lambda batch: ranking_model.predict_encoded(encoded_job,
+                                                                               self.talent_index.encoded.take(batch)))
+        top_k = top_k_indices(scores, k)
+        talents = [self.talent_index[i] for i in top_k]
+        return self.format_batch_output(talents, [job] * len(talents), self._top_k_output(scores[top_k]))
+
+    def _ranking_model(self) -> Model:
+        """
+        :return: the model scoring the indexed corpora: the shadow models of a ShadowedModel would score the whole
+        corpus for scores which are not returned, thus only its primary model is used
+        """
+        if isinstance(self.model, ShadowedModel):
+            return self.model.primary
+        return self.model
+
+    def _score_index(self, index_length: int, predict_batch: Callable[[slice], ModelOutput]) -> np.ndarray:
+        scores = np.empty(index_length, dtype=np.float64)
+        for start in range(0, index_length, TOP_K_SCORING_BATCH_SIZE):
+            batch = slice(start, min(start + TOP_K_SCORING_BATCH_SIZE, index_length))
+            scores[batch] = predict_batch(batch).similarity_scores
+        return scores
+
+    def _top_k_output(self, similarity_scores: np.ndarray) -> ModelOutput:
+        return ModelOutput(self.model.label_assignment(similarity_scores), similarity_scores)
 
     def format_batch_output(self,
                             talents: List[Dict[str, Any]],
                             jobs: List[Dict[str, Any]],
                             model_output: ModelOutput)->List[Dict[str, Any]]:
+        """
+        Results in the schema of match_bulk. The outputs of a ShadowedModel add the scores of the shadow models to each
+        result as "shadow_scores": {name: score}.
+        """
         outputs = []
 
-        for talent, job, (label, score) in zip(talents, jobs, model_output):
-            outputs.append({"talent": talent, "job": job, "label": label, "score": score})
+        with stage("output.format", len(talents)):
+            for talent, job, (label, score) in zip(talents, jobs, model_output):
+                outputs.append({"talent": talent, "job": job, "label": label, "score": score})
+            if isinstance(model_output, MultiModelOutput):
+                for i, output in enumerate(outputs):
+                    output["shadow_scores"] = model_output.shadow_scores(i)
 
         return outputs
\ No newline at end of file
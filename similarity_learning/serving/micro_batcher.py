@@ -0,0 +1,124 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Any, Optional, Tuple, Set
+
+# maximal number of requests processed in one batch
+MICRO_BATCH_MAX_SIZE = 256
+# maximal time the first request of a batch waits for further requests
+MICRO_BATCH_MAX_DELAY_MS = 2.0
+
+
+class MicroBatcher:
+    """
+    Collects the items submitted concurrently from an asyncio event loop, and processes them in batches of up to
+    max_batch_size items, each started at the latest max_delay_ms after its first item arrived. The batches run in
+    an executor, by default a single worker thread, so the batch function never runs concurrently with itself and
+    further items accumulate while a batch is processed.
+    If a batch fails, its items are processed one by one, so that only the callers of the failing items get the
+    exception.
+    """
+    def __init__(self,
+                 process_batch: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_delay_ms: float = MICRO_BATCH_MAX_DELAY_MS,
+                 executor: Optional[Executor] = None):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}.")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay_ms = max_delay_ms
+
+        self._owns_executor = executor is None
+        self._executor = ThreadPoolExecutor(max_workers=1) if executor is None else executor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running_batches: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        :param item:
+        :return: the result of the item, as returned by process_batch
+        """
+        loop = self._bind_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay_ms / 1000, self._flush)
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """
+        Submit several items at once, they may be batched together with the items of other callers.
+        :param items:
+        :return: the results, in the order of the items
+        """
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    async def close(self):
+        """
+        Process the pending items, wait for the running batches and shut down the executor (if it was created by the
+        batcher).
+        :return:
+        """
+        if self._pending:
+            self._flush()
+        if self._running_batches:
+            await asyncio.gather(*self._running_batches)
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._pending or self._running_batches:
+                raise RuntimeError(f"{self.__class__.__name__} is in use by another event loop.")
+            self._loop = loop
+        return loop
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run_batch(batch))
+            self._running_batches.add(task)
+            task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            outcomes = await self._loop.run_in_executor(self._executor, self._process_isolating_failures, items)
+        except BaseException as e:
+            outcomes = [(False, e)] * len(batch)
+
+        for (_, future), (is_success, value) in zip(batch, outcomes):
+            if future.done():
+                # the caller was cancelled
+                continue
+            if is_success:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _process_isolating_failures(self, items: List[Any]) -> List[Tuple[bool, Any]]:
+        try:
+            results = self.process_batch(items)
+            if len(results) != len(items):
+                raise ValueError(f"process_batch returned {len(results)} results for {len(items)} items.")
+            return [(True, result) for result in results]
+        except Exception as e:
+            if len(items) == 1:
+                return [(False, e)]
+
+        outcomes = []
+        for item in items:
+            outcomes.extend(self._process_isolating_failures([item]))
+        return outcomes
+
+    def __repr__(self):
+        return f"{self.__class__.__name__} with max_batch_size={self.max_batch_size}, " \
+               f"max_delay_ms={self.max_delay_ms} and {len(self._pending)} pending items."
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Hashable, Tuple, Any, Callable, Dict
+from similarity_learning.loading_pipeline.preprocessing.node_id_generation import UNORDERED_LIST_COLUMNS
+
+
+class ResultCache:
+    """
+    Bounded, thread safe LRU cache of (label, score) results (with the shadow scores of a ShadowedModel as a third
+    element), whose entries optionally expire ttl seconds after they were stored. A maxsize of 0 disables the cache.
+    """
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._results: "OrderedDict[Hashable, Tuple[float, Tuple[Any, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, ...]]:
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is not None and self.ttl is not None and entry[0] <= self.clock():
+                del self._results[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, result: Tuple[Any, ...]):
+        if self.maxsize <= 0:
+            return
+        expiry = self.clock() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._results[key] = (expiry, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(maxsize={self.maxsize}, ttl={self.ttl}, size={len(self)}, " \
+               f"hits={self.hits}, misses={self.misses})"
+
+
+def pair_cache_key(talent: Dict[str, Any], job: Dict[str, Any], model_version: str) -> str:
+    """
+    Hash of the canonical form of a pair and the version of the model which scores it. As in the loading pipeline,
+    the languages are ordered by their title (see element_wise_sorting), and the lists whose order carries no
+    information (see UNORDERED_LIST_COLUMNS) are sorted.
+    :param talent:
+    :param job:
+    :param model_version:
+    :return:
+    """
+    canonical_pair = json.dumps({"talent": _canonicalize_item(talent),
+                                 "job": _canonicalize_item(job),
+                                 "model_version": model_version}, sort_keys=True, default=str)
+    return hashlib.blake2b(canonical_pair.encode("utf8"), digest_size=16).hexdigest()
+
+
+def _canonicalize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    item = dict(item)
+    if isinstance(item.get("languages"), list):
+        item["languages"] = sorted(item["languages"], key=lambda language: str(language.get("title")))
+    for column in UNORDERED_LIST_COLUMNS:
+        if isinstance(item.get(column), list):
+            item[column] = sorted(item[column], key=str)
+    return item
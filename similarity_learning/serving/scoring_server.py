@@ -0,0 +1,276 @@
+import argparse
+import gc
+import json
+import os
+import signal
+import socketserver
+from http import HTTPStatus
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Union, Optional, Any, Dict, List
+import numpy as np
+from similarity_learning.search import Search
+from similarity_learning.inference import Model, DecisionTreeModel, ShadowedModel
+from similarity_learning.instrumentation import enable_pipeline_metrics, get_pipeline_metrics
+import logging
+logger = logging.getLogger("similarity_learning")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+# maximal accepted size of a request body
+MAX_REQUEST_BODY_SIZE = 64 * 1024 * 1024
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP interface of Search:
+    - POST /match with {"talent": ..., "job": ...} returns the output of Search.match
+    - POST /match_bulk with {"talents": [...], "jobs": [...]} returns the output of Search.match_bulk
+    - GET /health returns {"status": "ok"}
+    - GET /metrics returns the stage histograms of the answering worker in the Prometheus text format, if the pipeline
+      metrics are enabled (see similarity_learning.instrumentation)
+    """
+    # HTTP/1.0: connections are closed after each response, a kept alive connection would block a worker
+    server_version = "SimilarityLearningScoring/1.0"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(HTTPStatus.OK, {"status": "ok", "pid": os.getpid()})
+        elif self.path == "/metrics":
+            metrics = get_pipeline_metrics()
+            if metrics is None:
+                self.send_json(HTTPStatus.NOT_FOUND, {"error": "The pipeline metrics are not enabled."})
+            else:
+                self.send_body(HTTPStatus.OK, metrics.to_prometheus().encode("utf8"), "text/plain; version=0.0.4")
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}."})
+
+    def do_POST(self):
+        if self.path not in ("/match", "/match_bulk"):
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}."})
+            return
+        try:
+            body = self.read_json_body()
+            if self.path == "/match":
+                output = self.server.search.match(talent=body["talent"], job=body["job"])
+            else:
+                output = self.server.search.match_bulk(talents=body["talents"], jobs=body["jobs"])
+        except (ValueError, KeyError, TypeError) as e:
+            # malformed requests: invalid JSON, missing fields or values unknown to the encoders
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": f"{e.__class__.__name__}: {e}"})
+            return
+        except Exception as e:
+            logger.exception("Scoring request failed.")
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{e.__class__.__name__}: {e}"})
+            return
+        self.send_json(HTTPStatus.OK, output)
+
+    def read_json_body(self) -> Dict[str, Any]:
+        content_length = int(self.headers.get("Content-Length", 0))
+        if content_length > MAX_REQUEST_BODY_SIZE:
+            raise ValueError(f"The request body exceeds {MAX_REQUEST_BODY_SIZE} bytes.")
+        body = json.loads(self.rfile.read(content_length))
+        if not isinstance(body, dict):
+            raise ValueError("The request body must be a JSON object.")
+        return body
+
+    def send_json(self, status: HTTPStatus, content: Union[Dict[str, Any], List[Any]]):
+        self.send_body(status, json.dumps(content, default=_to_builtin).encode("utf8"), "application/json")
+
+    def send_body(self, status: HTTPStatus, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # unix socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class ScoringHTTPServer(HTTPServer):
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, server_address, search: Search):
+        self.search = search
+        super().__init__(server_address, ScoringRequestHandler)
+
+
+class UnixScoringHTTPServer(socketserver.UnixStreamServer):
+    request_queue_size = 128
+
+    def __init__(self, socket_path: Union[Path, str], search: Search):
+        self.search = search
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(str(socket_path), ScoringRequestHandler)
+
+
+def load_search(model_path: Union[Path, str],
+                compile_model: bool = True,
+                shadow_model_paths: Optional[Dict[str, Union[Path, str]]] = None,
+                **search_kwargs) -> Search:
+    """
+    Load the model (and with it the fitted encoders) and prepare it for serving.
+    :param model_path:
+    :param compile_model: whether to compile decision trees (see DecisionTreeModel.compile)
+    :param shadow_model_paths: paths of shadow models by name, scored on the features of the model (see ShadowedModel)
+    :param search_kwargs: further arguments of Search, e.g. the result cache configuration
+    :return:
+    """
+    model = Model.load(model_path)
+    if shadow_model_paths:
+        model = ShadowedModel(model, {name: DecisionTreeModel.load(path) for name, path in shadow_model_paths.items()})
+    if compile_model and isinstance(model, (DecisionTreeModel, ShadowedModel)):
+        model.compile()
+    return Search(model, **search_kwargs)
+
+
+def create_server(search: Search,
+                  host: str = DEFAULT_HOST,
+                  port: int = DEFAULT_PORT,
+                  unix_socket_path: Optional[Union[Path, str]] = None) -> socketserver.BaseServer:
+    """
+    Bind the listening socket, on a unix socket if unix_socket_path is given, otherwise on host:port.
+    :param search:
+    :param host:
+    :param port:
+    :param unix_socket_path:
+    :return:
+    """
+    if unix_socket_path is not None:
+        return UnixScoringHTTPServer(unix_socket_path, search)
+    return ScoringHTTPServer((host, port), search)
+
+
+def run_prefork(server: socketserver.BaseServer, n_workers: int):
+    """
+    Serve with n_workers processes forked from the current one, which all accept connections on the listening socket
+    of the server. The loaded model is shared copy on write, for which the objects allocated so far are excluded from
+    the garbage collection (it would otherwise touch, and thereby copy, their pages). Workers which die are replaced,
+    the workers are terminated when the parent process is interrupted or terminated.
+    :param server:
+    :param n_workers:
+    :return:
+    """
+    if n_workers <= 1 or not hasattr(os, "fork"):
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        return
+
+    gc.collect()
+    gc.freeze()
+    workers = set()
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    previous_handler = signal.signal(signal.SIGTERM, stop)
+    try:
+        while True:
+            while len(workers) < n_workers:
+                workers.add(_fork_worker(server))
+            pid, status = os.wait()
+            if pid in workers:
+                workers.discard(pid)
+                logger.warning(f"Scoring worker {pid} exited with status {status}, starting a new one.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in workers:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        server.server_close()
+        gc.unfreeze()
+
+
+def _fork_worker(server: socketserver.BaseServer) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # worker process
+    exit_code = 0
+    try:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        server.serve_forever()
+    except BaseException:
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+
+def serve(model_path: Union[Path, str],
+          host: str = DEFAULT_HOST,
+          port: int = DEFAULT_PORT,
+          unix_socket_path: Optional[Union[Path, str]] = None,
+          n_workers: Optional[int] = None,
+          compile_model: bool = True,
+          collect_metrics: bool = False,
+          shadow_model_paths: Optional[Dict[str, Union[Path, str]]] = None,
+          **search_kwargs):
+    """
+    Load the model once, then serve it with n_workers (by default one per cpu) pre-forked worker processes.
+    :param model_path:
+    :param host:
+    :param port:
+    :param unix_socket_path:
+    :param n_workers:
+    :param compile_model:
+    :param collect_metrics: whether to record the pipeline stages, served on GET /metrics
+    :param shadow_model_paths: paths of shadow models by name, whose scores are added to the results
+    :param search_kwargs: further arguments of Search
+    :return:
+    """
+    if collect_metrics:
+        enable_pipeline_metrics()
+    search = load_search(model_path, compile_model, shadow_model_paths, **search_kwargs)
+    server = create_server(search, host, port, unix_socket_path)
+    n_workers = (os.cpu_count() or 1) if n_workers is None else n_workers
+    logger.info(f"Serving {model_path} on {unix_socket_path or f'{host}:{server.server_address[1]}'} "
+                f"with {n_workers} workers.")
+    run_prefork(server, n_workers)
+
+
+def _to_builtin(value: Any) -> Any:
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value)} is not JSON serializable.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a stored model over HTTP with pre-forked workers.")
+    parser.add_argument("--model", required=True, help="path of the model artifact directory (see Model.save) or of a pickled model")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix-socket", default=None, help="serve on this unix socket instead of host:port")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, default: cpu count")
+    parser.add_argument("--no-compile", action="store_true", help="predict with the sklearn estimator")
+    parser.add_argument("--result-cache-size", type=int, default=0, help="pair results cached per worker")
+    parser.add_argument("--result-cache-ttl", type=float, default=None, help="seconds until cached results expire")
+    parser.add_argument("--metrics", action="store_true", help="record the pipeline stages, served on GET /metrics")
+    parser.add_argument("--shadow-model", action="append", default=[], metavar="NAME=PATH",
+                        help="score a shadow model on the same features, its scores are returned as shadow_scores")
+    args = parser.parse_args()
+    shadow_model_paths = dict(shadow_model.split("=", 1) for shadow_model in args.shadow_model)
+    serve(args.model, args.host, args.port, args.unix_socket, args.workers, compile_model=not args.no_compile,
+          collect_metrics=args.metrics, shadow_model_paths=shadow_model_paths, result_cache_size=args.result_cache_size, result_cache_ttl=args.result_cache_ttl)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+from .synthetic_pairs_generator import SyntheticPairsGenerator
@@ -0,0 +1,291 @@
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Union, Sequence
+import numpy as np
+from similarity_learning.globals import SENIORITY_HIERARCHY_MAPPING, DEGREE_HIERARCHY_MAPPING, \
+    LANGUAGE_RATING_HIERARCHY_MAPPING, LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING
+import logging
+logger = logging.getLogger("similarity_learning")
+
+# number of items (or pairs) whose attributes are sampled at once
+SYNTHETIC_CHUNK_SIZE = 100_000
+
+
+class SyntheticPairsGenerator:
+    """
+    Seeded generator of (job, talent, label) records in the format of data/raw_data.json, i.e. the format read by
+    JsonLoadingPipeLine and the one of the arguments of Search.match.
+
+    Seniorities, degrees, language ratings and must have flags are drawn from the vocabularies in globals.py, the job
+    roles and language titles from the ones of the sample records (so that the fitted encoders know them). All values
+    follow their frequencies in the sample records, the number of roles / languages per item and the salaries are
+    resampled from the sample records.
+
+    Skew:
+    - role_skew: the role frequencies are raised to this power: 1 keeps the sample distribution, 0 makes all roles
+      equally likely (long tail), values above 1 concentrate the roles on the most frequent ones
+    - job_popularity_skew / talent_popularity_skew: if the pairs are drawn from a pool of unique jobs (talents), the
+      i-th item of the pool is drawn with a probability proportional to (i + 1) ** -skew, i.e. 0 is uniform and
+      larger values produce a few hot jobs (talents) in most pairs
+    """
+    def __init__(self,
+                 sample_records: List[Dict[str, Any]],
+                 seed: int = 0,
+                 role_skew: float = 1.,
+                 job_popularity_skew: float = 0.,
+                 talent_popularity_skew: float = 0.):
+        if not sample_records:
+            raise ValueError("At least one sample record is needed to estimate the distributions.")
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.role_skew = role_skew
+        self.job_popularity_skew = job_popularity_skew
+        self.talent_popularity_skew = talent_popularity_skew
+
+        jobs = [record["job"] for record in sample_records]
+        talents = [record["talent"] for record in sample_records]
+        job_languages = [language for job in jobs for language in job["languages"]]
+        talent_languages = [language for talent in talents for language in talent["languages"]]
+
+        self.job_roles, self.job_role_probabilities = _skewed(_frequencies(
+            [role for job in jobs for role in job["job_roles"]]), role_skew)
+        self.talent_roles, self.talent_role_probabilities = _skewed(_frequencies(
+            [role for talent in talents for role in talent["job_roles"]]), role_skew)
+        self.job_language_titles, self.job_language_probabilities = _frequencies(
+            [language["title"] for language in job_languages])
+        self.talent_language_titles, self.talent_language_probabilities = _frequencies(
+            [language["title"] for language in talent_languages])
+
+        self.job_n_roles = np.array([len(job["job_roles"]) for job in jobs])
+        self.talent_n_roles = np.array([len(talent["job_roles"]) for talent in talents])
+        self.job_n_languages = np.array([len(job["languages"]) for job in jobs])
+        self.talent_n_languages = np.array([len(talent["languages"]) for talent in talents])
+        self.job_n_seniorities = np.array([len(job["seniorities"]) for job in jobs])
+        self.max_salaries = np.array([job["max_salary"] for job in jobs])
+        self.salary_expectations = np.array([talent["salary_expectation"] for talent in talents])
+
+        self.seniority_probabilities = _vocabulary_frequencies(
+            [talent["seniority"] for talent in talents], SENIORITY_HIERARCHY_MAPPING)
+        self.job_degree_probabilities = _vocabulary_frequencies(
+            [job["min_degree"] for job in jobs], DEGREE_HIERARCHY_MAPPING)
+        self.talent_degree_probabilities = _vocabulary_frequencies(
+            [talent["degree"] for talent in talents], DEGREE_HIERARCHY_MAPPING)
+        self.job_rating_probabilities = _vocabulary_frequencies(
+            [language["rating"] for language in job_languages], LANGUAGE_RATING_HIERARCHY_MAPPING)
+        self.talent_rating_probabilities = _vocabulary_frequencies(
+            [language["rating"] for language in talent_languages], LANGUAGE_RATING_HIERARCHY_MAPPING)
+        self.must_have_probabilities = _vocabulary_frequencies(
+            [str(language["must_have"]) for language in job_languages], LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING)
+        self.positive_rate = float(np.mean([bool(record.get("label", False)) for record in sample_records]))
+
+    @classmethod
+    def from_json(cls, file_path: Union[Path, str], **kwargs) -> "SyntheticPairsGenerator":
+        with open(file_path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def generate_jobs(self, n_jobs: int) -> List[Dict[str, Any]]:
+        """
+        :param n_jobs:
+        :return: job dicts in the format of the "job" field of the raw data
+        """
+        roles = self._sample_sets(self.job_roles, self.job_role_probabilities, self.job_n_roles, n_jobs)
+        titles = self._sample_sets(self.job_language_titles, self.job_language_probabilities,
+                                   self.job_n_languages, n_jobs)
+        n_languages = sum(len(item_titles) for item_titles in titles)
+        ratings = iter(self._sample(LANGUAGE_RATING_HIERARCHY_MAPPING, self.job_rating_probabilities, n_languages))
+        must_haves = iter(self._sample(LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING, self.must_have_probabilities, n_languages))
+
+        # the seniorities of a job are a contiguous range of the hierarchy, as in almost all sample records
+        n_seniorities = np.minimum(self.rng.choice(self.job_n_seniorities, n_jobs), len(SENIORITY_HIERARCHY_MAPPING))
+        first_seniorities = self.rng.integers(0, len(SENIORITY_HIERARCHY_MAPPING) - n_seniorities + 1)
+        max_salaries = self.rng.choice(self.max_salaries, n_jobs).tolist()
+        min_degrees = self._sample(DEGREE_HIERARCHY_MAPPING, self.job_degree_probabilities, n_jobs)
+
+        return [{"languages": [{"title": title, "rating": next(ratings), "must_have": next(must_haves) == "True"}
+                               for title in titles[i]],
+                 "job_roles": roles[i],
+                 "seniorities": SENIORITY_HIERARCHY_MAPPING[first_seniorities[i]:
+                                                            first_seniorities[i] + n_seniorities[i]],
+                 "max_salary": max_salaries[i],
+                 "min_degree": min_degrees[i]} for i in range(n_jobs)]
+
+    def generate_talents(self, n_talents: int) -> List[Dict[str, Any]]:
+        """
+        :param n_talents:
+        :return: talent dicts in the format of the "talent" field of the raw data
+        """
+        roles = self._sample_sets(self.talent_roles, self.talent_role_probabilities, self.talent_n_roles, n_talents)
+        titles = self._sample_sets(self.talent_language_titles, self.talent_language_probabilities,
+                                   self.talent_n_languages, n_talents)
+        n_languages = sum(len(item_titles) for item_titles in titles)
+        ratings = iter(self._sample(LANGUAGE_RATING_HIERARCHY_MAPPING, self.talent_rating_probabilities, n_languages))
+        seniorities = self._sample(SENIORITY_HIERARCHY_MAPPING, self.seniority_probabilities, n_talents)
+        salary_expectations = self.rng.choice(self.salary_expectations, n_talents).tolist()
+        degrees = self._sample(DEGREE_HIERARCHY_MAPPING, self.talent_degree_probabilities, n_talents)
+
+        return [{"languages": [{"rating": next(ratings), "title": title} for title in titles[i]],
+                 "job_roles": roles[i],
+                 "seniority": seniorities[i],
+                 "salary_expectation": salary_expectations[i],
+                 "degree": degrees[i]} for i in range(n_talents)]
+
+    def iter_pairs(self,
+                   n_pairs: int,
+                   n_unique_jobs: Optional[int] = None,
+                   n_unique_talents: Optional[int] = None,
+                   labeled: bool = True,
+                   chunk_size: int = SYNTHETIC_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Generate the pairs in chunks of at most chunk_size records, so that millions of them can be written without
+        holding them in memory.
+        :param n_pairs:
+        :param n_unique_jobs: if given, the jobs are drawn from a pool of this many jobs (see job_popularity_skew),
+        otherwise every pair has its own job
+        :param n_unique_talents: as n_unique_jobs, for the talents
+        :param labeled: whether the records have a (random) label
+        :param chunk_size:
+        :return:
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+        job_pool = _ItemPool(self.generate_jobs, n_unique_jobs, self.job_popularity_skew, self.rng)
+        talent_pool = _ItemPool(self.generate_talents, n_unique_talents, self.talent_popularity_skew, self.rng)
+        for start in range(0, n_pairs, chunk_size):
+            n_chunk_pairs = min(chunk_size, n_pairs - start)
+            jobs = job_pool.draw(n_chunk_pairs)
+            talents = talent_pool.draw(n_chunk_pairs)
+            if labeled:
+                labels = (self.rng.random(n_chunk_pairs) < self.positive_rate).tolist()
+                yield [{"talent": talent, "job": job, "label": label}
+                       for talent, job, label in zip(talents, jobs, labels)]
+            else:
+                yield [{"talent": talent, "job": job} for talent, job in zip(talents, jobs)]
+
+    def generate_pairs(self, n_pairs: int, **kwargs) -> List[Dict[str, Any]]:
+        """
+        In memory version of iter_pairs (pairs drawn from a pool share the item dicts).
+        """
+        return [record for chunk in self.iter_pairs(n_pairs, **kwargs) for record in chunk]
+
+    def write_json(self, file_path: Union[Path, str], n_pairs: int, ndjson: bool = True, **kwargs) -> int:
+        """
+        Write the generated pairs as NDJSON (one record per line) or as a JSON array, like data/raw_data.json.
+        :param file_path:
+        :param n_pairs:
+        :param ndjson:
+        :param kwargs: see iter_pairs
+        :return: the number of written records
+        """
+        n_written = 0
+        with open(file_path, "w", encoding="utf8") as f:
+            if not ndjson:
+                f.write("[")
+            for chunk in self.iter_pairs(n_pairs, **kwargs):
+                lines = [json.dumps(record) for record in chunk]
+                if ndjson:
+                    f.write("\n".join(lines) + "\n")
+                else:
+                    f.write((",\n" if n_written else "\n") + ",\n".join(lines))
+                n_written += len(lines)
+                logger.debug(f"Wrote {n_written} of {n_pairs} synthetic pairs.")
+            if not ndjson:
+                f.write("\n]\n")
+        return n_written
+
+    def _sample(self, vocabulary: Sequence[str], probabilities: np.ndarray, n: int) -> List[str]:
+        return np.asarray(vocabulary, dtype=object)[self.rng.choice(len(vocabulary), n, p=probabilities)].tolist()
+
+    def _sample_sets(self,
+                     vocabulary: np.ndarray,
+                     probabilities: np.ndarray,
+                     sample_sizes: np.ndarray,
+                     n: int) -> List[List[str]]:
+        """
+        Draw n lists of distinct values, whose lengths are resampled from sample_sizes. The values of a list are drawn
+        without replacement with the given probabilities (by keeping the largest Gumbel perturbed log probabilities).
+        """
+        sizes = np.minimum(self.rng.choice(sample_sizes, n), len(vocabulary))
+        max_size = int(sizes.max(initial=0))
+        log_probabilities = np.log(probabilities)
+        values = []
+        for start in range(0, n, SYNTHETIC_CHUNK_SIZE):
+            stop = min(start + SYNTHETIC_CHUNK_SIZE, n)
+            keys = log_probabilities + self.rng.gumbel(size=(stop - start, len(vocabulary)))
+            top = np.argsort(-keys, axis=1)[:, :max_size]
+            chosen = vocabulary[top].tolist()
+            values.extend(chosen[i][:sizes[start + i]] for i in range(stop - start))
+        return values
+
+
+class _ItemPool:
+    """
+    Items of one side of the pairs: either a pool of n_unique generated items drawn with Zipf like popularity, or
+    (n_unique None) a new item per pair.
+    """
+    def __init__(self, generate, n_unique: Optional[int], popularity_skew: float, rng: np.random.Generator):
+        self.generate = generate
+        self.rng = rng
+        self.items = None
+        if n_unique is not None:
+            if n_unique <= 0:
+                raise ValueError(f"The number of unique items must be positive, got {n_unique}.")
+            self.items = generate(n_unique)
+            weights = np.arange(1, n_unique + 1, dtype=np.float64) ** -popularity_skew
+            self.probabilities = weights / weights.sum()
+
+    def draw(self, n: int) -> List[Dict[str, Any]]:
+        if self.items is None:
+            return self.generate(n)
+        return [self.items[i] for i in self.rng.choice(len(self.items), n, p=self.probabilities)]
+
+
+def _frequencies(values: List[str]):
+    counts = Counter(values)
+    vocabulary = np.array(sorted(counts), dtype=object)
+    frequencies = np.array([counts[value] for value in vocabulary], dtype=np.float64)
+    return vocabulary, frequencies / frequencies.sum()
+
+
+def _skewed(vocabulary_and_probabilities, skew: float):
+    vocabulary, probabilities = vocabulary_and_probabilities
+    probabilities = probabilities ** skew
+    return vocabulary, probabilities / probabilities.sum()
+
+
+def _vocabulary_frequencies(values: List[str], vocabulary: Sequence[str]) -> np.ndarray:
+    # add one smoothing: every value of the vocabulary is generated, also the ones missing in the sample
+    counts = Counter(values)
+    frequencies = np.array([counts[value] + 1 for value in vocabulary], dtype=np.float64)
+    return frequencies / frequencies.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic job / talent pairs in the format of the raw data.")
+    parser.add_argument("--sample", required=True, help="JSON file of sample records, e.g. data/raw_data.json")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--n-pairs", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json-array", action="store_true", help="write a JSON array instead of NDJSON")
+    parser.add_argument("--unlabeled", action="store_true", help="write only the talent and the job of the pairs")
+    parser.add_argument("--n-unique-jobs", type=int, default=None)
+    parser.add_argument("--n-unique-talents", type=int, default=None)
+    parser.add_argument("--role-skew", type=float, default=1.)
+    parser.add_argument("--job-popularity-skew", type=float, default=0.)
+    parser.add_argument("--talent-popularity-skew", type=float, default=0.)
+    args = parser.parse_args()
+
+    generator = SyntheticPairsGenerator.from_json(args.sample,
+                                                  seed=args.seed,
+                                                  role_skew=args.role_skew,
+                                                  job_popularity_skew=args.job_popularity_skew,
+                                                  talent_popularity_skew=args.talent_popularity_skew)
+    generator.write_json(args.output, args.n_pairs, ndjson=not args.json_array,
+                         n_unique_jobs=args.n_unique_jobs,
+                         n_unique_talents=args.n_unique_talents,
+                         labeled=not args.unlabeled)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+sys.path.append(str(Path(__file__).parent.parent))
+import numpy as np
+import pandas as pd
+import sklearn
+from similarity_learning import Search
+from similarity_learning.inference import DecisionTreeModel
+from similarity_learning.loading_pipeline import UnlabeledPairsDataFrame
+from similarity_learning.loading_pipeline.preprocessing.node_id_generation import generate_node_ids
+
+root_path = Path(__file__).parent.parent
+raw_data_path = root_path / Path("data") / Path("raw_data.json")
+model_path = root_path / Path("stored_models") / Path("decision_tree_model_object.pkl")
+
+DEFAULT_SIZES = [1, 100, 10000, 1000000]
+# Search.match is timed on at most this many pairs per size, and reported per call
+MATCH_SAMPLE_SIZE = 1000
+
+
+class StageTimer:
+    """
+    Wall clock time and (if tracing memory) peak traced memory of each stage of the pipeline. Memory tracing slows
+    down the stages, it can be disabled to get pure timings.
+    """
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str, n_calls: int = 1):
+        if self.trace_memory:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            result = {"seconds": seconds}
+            if n_calls != 1:
+                result.update({"calls": n_calls, "seconds_per_call": seconds / n_calls})
+            if self.trace_memory:
+                result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.stages[name] = result
+
+
+def sample_pairs(records: List[Dict[str, Any]], n_pairs: int, seed: int) -> List[Dict[str, Any]]:
+    positions = np.random.default_rng(seed).integers(0, len(records), n_pairs)
+    return [records[i] for i in positions]
+
+
+def benchmark_size(search: Search, records: List[Dict[str, Any]], n_pairs: int, seed: int,
+                   trace_memory: bool) -> Dict[str, Any]:
+    """
+    Time the stages on n_pairs pairs sampled from the raw data. As in a serving process, the encoding caches of the
+    feature extractor stay warm across the stages (and sizes).
+    """
+    pairs = sample_pairs(records, n_pairs, seed)
+    talents = [pair["talent"] for pair in pairs]
+    jobs = [pair["job"] for pair in pairs]
+    model = search.model
+    feature_extractor = model.feature_extractor
+    timer = StageTimer(trace_memory)
+
+    # load
+    with timer.stage("UnlabeledPairsDataFrame.from_full_json"):
+        data = UnlabeledPairsDataFrame.from_full_json(jobs, talents)
+    with timer.stage("add_language_suffix"):
+        data.add_language_feature_suffix()
+    with timer.stage("generate_node_ids"):
+        generate_node_ids(data.jobs.data)
+        generate_node_ids(data.talents.data)
+
+    # featurize
+    with timer.stage("BaselineFeatureExtractor.encode_jobs_cached"):
+        encoded_jobs = feature_extractor.encode_jobs_cached(data.jobs)
+    with timer.stage("BaselineFeatureExtractor.encode_talents_cached"):
+        encoded_talents = feature_extractor.encode_talents_cached(data.talents)
+    for group in ["seniority", "salary", "degree", "language", "role"]:
+        with timer.stage(f"BaselineFeatureExtractor.compute_{group}_features"):
+            getattr(feature_extractor, f"compute_{group}_features")(encoded_jobs, encoded_talents)
+    with timer.stage("BaselineFeatureExtractor.transform"):
+        feature_extractor.transform(data)
+
+    # predict
+    with timer.stage("DecisionTreeModel.predict"):
+        output = model.predict(data)
+
+    # format
+    with timer.stage("Search.format_batch_output"):
+        search.format_batch_output(talents, jobs, output)
+
+    # end to end
+    n_match_calls = min(n_pairs, MATCH_SAMPLE_SIZE)
+    with timer.stage("Search.match", n_calls=n_match_calls):
+        for talent, job in zip(talents[:n_match_calls], jobs[:n_match_calls]):
+            search.match(talent, job)
+    with timer.stage("Search.match_bulk"):
+        search.match_bulk(talents, jobs)
+
+    return {"n_pairs": n_pairs, "stages": timer.stages}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    :return: descriptions of the stages which are more than tolerance (relative) slower than in the baseline
+    """
+    baseline_stages = {result["n_pairs"]: result["stages"] for result in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        for stage, timing in result["stages"].items():
+            baseline_timing = baseline_stages.get(result["n_pairs"], {}).get(stage)
+            if baseline_timing is not None and timing["seconds"] > baseline_timing["seconds"] * (1 + tolerance):
+                regressions.append(f"{stage} at {result['n_pairs']} pairs: {timing['seconds']:.4f}s "
+                                   f"vs {baseline_timing['seconds']:.4f}s")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=root_path, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per stage timings and peak memory of the load -> featurize -> "
+                                                 "predict -> format pipeline, as JSON.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="numbers of pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="do not trace the memory (faster, exact timings)")
+    parser.add_argument("--compile", action="store_true", help="compile the decision tree (see DecisionTreeModel.compile)")
+    parser.add_argument("--output", default=None, help="also write the JSON results to this file")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run to compare the timings with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown reported as regression")
+    args = parser.parse_args()
+
+    with open(raw_data_path) as f:
+        records = json.load(f)
+    model = DecisionTreeModel.load(model_path)
+    if args.compile:
+        model.compile()
+    search = Search(model)
+
+    results = {"metadata": {"timestamp": datetime.now(timezone.utc).isoformat(),
+                            "git_commit": git_commit(),
+                            "python": platform.python_version(),
+                            "numpy": np.__version__,
+                            "pandas": pd.__version__,
+                            "sklearn": sklearn.__version__,
+                            "compiled_tree": args.compile,
+                            "trace_memory": not args.no_memory,
+                            "seed": args.seed},
+               "results": [benchmark_size(search, records, n_pairs, args.seed, not args.no_memory)
+                           for n_pairs in args.sizes]}
+
+    print(json.dumps(results, indent=2))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+model_path = root_path / Path("stored_models") / Path("decision_tree_model_object.pkl")
+artifact_path = root_path / Path("stored_models") / Path("decision_tree_model")
+
+# the statements whose cold start (in a fresh interpreter) is measured
+STARTUP_STATEMENTS = {
+    "import_package": "import similarity_learning",
+    "import_search": "from similarity_learning import Search",
+    "load_model": "from similarity_learning import Search\n"
+                  "from similarity_learning.inference import Model\n"
+                  f"Search(Model.load({str(model_path)!r}))",
+    "load_model_artifact": "from similarity_learning import Search\n"
+                           "from similarity_learning.inference import Model\n"
+                           f"Search(Model.load({str(artifact_path)!r}))",
+}
+HEAVY_MODULES = ["torch", "sklearn", "scipy", "pandas", "matplotlib"]
+
+MEASUREMENT = """
+import sys, time, json
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": [m for m in {heavy_modules!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str, repeat: int) -> dict:
+    seconds = []
+    modules = []
+    for _ in range(repeat):
+        code = MEASUREMENT.format(statement=statement, heavy_modules=HEAVY_MODULES)
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=root_path, check=True,
+                                capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        seconds.append(result["seconds"])
+        modules = result["modules"]
+    return {"median_seconds": statistics.median(seconds), "min_seconds": min(seconds), "repeat": repeat,
+            "heavy_modules_imported": modules}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cold start time of the similarity_learning package.")
+    parser.add_argument("--repeat", type=int, default=5, help="number of fresh interpreters per measurement")
+    parser.add_argument("--output", default=None, help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = {name: measure(statement, args.repeat) for name, statement in STARTUP_STATEMENTS.items()}
+    results["python"] = sys.version.split()[0]
+    print(json.dumps(results, indent=2))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+from similarity_learning.synthetic_data.synthetic_pairs_generator import main
+
+# e.g. python src/generate_synthetic_data.py --sample data/raw_data.json --output data/synthetic.ndjson --n-pairs 1000000
+main()
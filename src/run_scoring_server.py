@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+from similarity_learning.serving.scoring_server import main
+
+# e.g. python src/run_scoring_server.py --model stored_models/decision_tree_model_object.pkl --port 8000 --workers 4
+main()
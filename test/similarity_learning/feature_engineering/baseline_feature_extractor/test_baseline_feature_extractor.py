@@ -0,0 +1,109 @@
+from unittest import TestCase
+
+import numpy as np
+from similarity_learning.feature_engineering import BaselineFeatureExtractor
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame
+from similarity_learning.globals import (SENIORITY_HIERARCHY_MAPPING,
+                                         DEGREE_HIERARCHY_MAPPING,
+                                         LANGUAGE_RATING_HIERARCHY_MAPPING,
+                                         LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING)
+from pathlib import Path
+
+
+class TestBaselineFeatureExtractor(TestCase):
+    def setUp(self) -> None:
+        data_path = Path(__file__).parent.parent.parent.parent.parent / Path("data") / Path("pairs_dataframe_object.pkl")
+        pairs_dataframe = LabeledPairsDataFrame.from_pickle(data_path)
+        self.pairs_dataframe = pairs_dataframe.iloc[0:300]
+        self.later_pairs_dataframe = pairs_dataframe.iloc[300:]
+        self.all_pairs_dataframe = pairs_dataframe
+
+    def make_feature_extractor(self, **kwargs) -> BaselineFeatureExtractor:
+        return BaselineFeatureExtractor(seniority_hierarchy_mapping=SENIORITY_HIERARCHY_MAPPING,
+                                        degree_hierarchy_mapping=DEGREE_HIERARCHY_MAPPING,
+                                        language_rating_hierarchy_mapping=LANGUAGE_RATING_HIERARCHY_MAPPING,
+                                        language_must_have_hierarchy_mapping=LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING,
+                                        **kwargs)
+
+    def test_cached_encoding_gives_the_same_features_as_uncached_encoding(self):
+        cached = self.make_feature_extractor()
+        uncached = self.make_feature_extractor(encoding_cache_size=0)
+
+        self.assertTrue(np.array_equal(cached.fit_transform(self.pairs_dataframe),
+                                       uncached.fit_transform(self.pairs_dataframe)))
+        self.assertTrue(np.array_equal(cached.transform(self.pairs_dataframe.iloc[50:150]),
+                                       uncached.transform(self.pairs_dataframe.iloc[50:150])))
+
+    def test_repeated_items_are_served_from_the_encoding_cache(self):
+        feature_extractor = self.make_feature_extractor()
+        feature_extractor.fit_transform(self.pairs_dataframe)
+        misses = feature_extractor._job_encoding_cache.misses
+
+        feature_extractor.transform(self.pairs_dataframe.iloc[0:100])
+        self.assertEqual(feature_extractor._job_encoding_cache.misses, misses)
+        self.assertTrue(feature_extractor._job_encoding_cache.hits > 0)
+
+    def test_encoding_cache_is_bounded(self):
+        feature_extractor = self.make_feature_extractor(encoding_cache_size=5)
+        feature_extractor.fit_transform(self.pairs_dataframe)
+        self.assertEqual(len(feature_extractor._talent_encoding_cache), 5)
+
+    def test_parallel_transform_is_identical_to_serial_transform(self):
+        feature_extractor = self.make_feature_extractor(n_workers=2, chunk_size=70)
+        expected = feature_extractor.fit_transform(self.pairs_dataframe)
+        try:
+            out = feature_extractor.transform(self.pairs_dataframe)
+        finally:
+            feature_extractor.close()
+        self.assertTrue(np.array_equal(out, expected))
+
+
+    def test_transform_keeps_the_feature_schema_frozen(self):
+        feature_extractor = self.make_feature_extractor()
+        features = feature_extractor.fit_transform(self.pairs_dataframe)
+        feature_names = list(feature_extractor.feature_names)
+
+        feature_extractor.transform(self.pairs_dataframe.iloc[0:100])
+        feature_extractor.transform(self.pairs_dataframe.iloc[100:200])
+        self.assertEqual(feature_extractor.feature_names, feature_names)
+        self.assertEqual(len(feature_names), features.shape[1])
+        self.assertEqual(feature_extractor.feature_schema.n_features, features.shape[1])
+
+    def test_sparse_output_equals_the_dense_features(self):
+        dense = self.make_feature_extractor()
+        sparse = self.make_feature_extractor(sparse_output=True)
+        dense_features = dense.fit_transform(self.pairs_dataframe)
+        sparse_features = sparse.fit_transform(self.pairs_dataframe)
+
+        self.assertEqual(sparse_features.format, "csr")
+        self.assertTrue(np.array_equal(sparse_features.toarray(), dense_features))
+        self.assertEqual(sparse_features.nnz, np.count_nonzero(dense_features))
+        uncached = self.make_feature_extractor(sparse_output=True, encoding_cache_size=0)
+        uncached.fit_transform(self.pairs_dataframe)
+        self.assertTrue(np.array_equal(uncached.transform(self.pairs_dataframe.iloc[20:80]).toarray(),
+                                       dense_features[20:80]))
+
+    def test_partial_fit_appends_the_features_of_new_vocabulary_entries(self):
+        feature_extractor = self.make_feature_extractor()
+        previous_features = feature_extractor.fit_transform(self.pairs_dataframe)
+        previous_feature_names = list(feature_extractor.feature_names)
+        feature_extractor.partial_fit(self.later_pairs_dataframe)
+
+        self.assertGreater(len(feature_extractor.feature_names), len(previous_feature_names))
+        self.assertEqual(feature_extractor.feature_names[:len(previous_feature_names)], previous_feature_names)
+        features = feature_extractor.transform(self.pairs_dataframe)
+        self.assertTrue(np.array_equal(features[:, :len(previous_feature_names)], previous_features))
+        self.assertTrue(np.array_equal(feature_extractor.extend_features(previous_features, previous_feature_names),
+                                       features))
+
+    def test_partial_fit_gives_the_features_of_a_full_fit_in_the_extended_order(self):
+        feature_extractor = self.make_feature_extractor()
+        feature_extractor.fit_transform(self.pairs_dataframe)
+        feature_extractor.partial_fit(self.later_pairs_dataframe)
+        refitted = self.make_feature_extractor()
+        refitted.fit_transform(self.all_pairs_dataframe)
+
+        self.assertEqual(sorted(feature_extractor.feature_names), sorted(refitted.feature_names))
+        positions = [refitted.feature_names.index(name) for name in feature_extractor.feature_names]
+        self.assertTrue(np.array_equal(feature_extractor.transform(self.all_pairs_dataframe),
+                                       refitted.transform(self.all_pairs_dataframe)[:, positions]))
@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+import json
+import numpy as np
+from similarity_learning.inference import DecisionTreeModel
+from similarity_learning.loading_pipeline import UnlabeledPairsDataFrame
+from pathlib import Path
+
+
+class TestSinglePairFeatureExtractor(TestCase):
+    def setUp(self) -> None:
+        root_path = Path(__file__).parent.parent.parent.parent.parent
+        with open(root_path / Path("data") / Path("raw_data.json")) as f:
+            self.raw_pairs = json.load(f)[:300]
+        model = DecisionTreeModel.load(root_path / Path("stored_models") / Path("decision_tree_model_object.pkl"))
+        self.feature_extractor = model.feature_extractor
+
+    def test_single_pair_features_are_identical_to_the_pairs_dataframe_pipeline(self):
+        jobs = [pair["job"] for pair in self.raw_pairs]
+        talents = [pair["talent"] for pair in self.raw_pairs]
+        expected = self.feature_extractor.transform(UnlabeledPairsDataFrame.from_full_json(jobs, talents,
+                                                                                          add_language_suffix=True))
+
+        out = np.vstack([self.feature_extractor.transform_pair(talent, job) for talent, job in zip(talents, jobs)])
+        self.assertTrue(np.array_equal(out, expected))
+
+    def test_unknown_languages_and_roles_are_ignored(self):
+        talent, job = self.raw_pairs[0]["talent"], self.raw_pairs[0]["job"]
+        unknown_talent = dict(talent,
+                              languages=talent["languages"] + [{"title": "Klingon", "rating": "C2"}],
+                              job_roles=talent["job_roles"] + ["starship-captain"])
+
+        self.assertTrue(np.array_equal(self.feature_extractor.transform_pair(unknown_talent, job),
+                                       self.feature_extractor.transform_pair(talent, job)))
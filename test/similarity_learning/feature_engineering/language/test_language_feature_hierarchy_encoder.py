@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from similarity_learning.feature_engineering import LanguageFeatureHierarchyEncoder
+
+
+class TestLanguageFeatureHierarchyEncoder(TestCase):
+    def setUp(self) -> None:
+        self.titles = pd.Series([["English", "German"], ["French"], ["German", "Old_Norse"], []])
+        self.data = pd.Series([["B1_English", "C1_German"], ["A1_French"], ["A2_German", "B2_Old_Norse"], []])
+        self.encoder = LanguageFeatureHierarchyEncoder(feature_hierarchy_mapping=["A1", "A2", "B1", "B2", "C1", "C2"])
+
+    def test_fits_sorted_languages_including_languages_with_underscores(self):
+        self.encoder.fit(self.data)
+        self.assertEqual(self.encoder.classes_, ["English", "French", "German", "Old_Norse"])
+
+    def test_entries_are_separated_at_the_first_underscore(self):
+        # split("_") used to encode "B2_Old_Norse" as the language "Old", models fitted so need a refit (see README)
+        out = self.encoder.fit_transform(pd.Series([["B2_Old_Norse"], ["C1_Old_Norse", "B1_English"]]))
+        self.assertEqual(self.encoder.classes_, ["English", "Old_Norse"])
+        self.assertTrue(np.array_equal(out, [[0, 3],
+                                             [2, 4]]))
+
+    def test_partial_fit_appends_new_languages_behind_the_known_ones(self):
+        self.encoder.fit(self.data.iloc[2:])
+        self.assertEqual(self.encoder.partial_fit(self.data), ["English", "French"])
+        self.assertEqual(self.encoder.classes_, ["German", "Old_Norse", "English", "French"])
+        self.assertTrue(np.array_equal(self.encoder.transform(self.data.iloc[:1]), [[4, 0, 2, 0]]))
+
+    def test_encodes_each_row_as_a_vector_of_hierarchy_values_per_language(self):
+        out = self.encoder.fit_transform(self.data)
+        self.assertTrue(np.array_equal(out, [[2, 0, 4, 0],
+                                             [0, 0, 0, 0],
+                                             [0, 0, 1, 3],
+                                             [0, 0, 0, 0]]))
+
+    def test_unknown_languages_and_features_are_ignored(self):
+        self.encoder.fit(self.data)
+        out = self.encoder.transform(pd.Series([["C1_Klingon", "X1_English", "C2_French"]]))
+        self.assertTrue(np.array_equal(out, [[0, 5, 0, 0]]))
+
+    def test_transform_with_titles_is_identical_to_transform(self):
+        self.encoder.fit(self.data)
+        self.assertTrue(np.array_equal(self.encoder.transform_with_titles(self.titles, self.data),
+                                       self.encoder.transform(self.data)))
@@ -23,4 +23,16 @@ class TestFeatureHierarchyEncoder(TestCase):
         self.assertTrue(out.shape == self.dummy_data_multiple_values.shape)
         self.assertEquals([i+1 for i in out.iloc[0]], self.dummy_data_multiple_values.iloc[0])
 
+    def test_vectorized_encoding_is_identical_to_the_elementwise_mapping(self):
+        out = self.encoder.encode(self.dummy_data_single_value)
+        expected = self.dummy_data_single_value.apply(self.encoder.apply_feature_hierarchy_mapping).values
+        self.assertTrue(np.array_equal(out, expected))
+
+    def test_encode_min_max_reduces_each_list_of_a_multi_valued_series(self):
+        minimum, maximum = self.encoder.encode_min_max(self.dummy_data_multiple_values)
+        self.assertEqual(minimum.tolist(), [0, 0, 1, 0])
+        self.assertEqual(maximum.tolist(), [2, 0, 2, 2])
+
+    def test_encode_raises_key_error_on_values_missing_from_the_hierarchy(self):
+        self.assertRaises(KeyError, lambda: self.encoder.encode(pd.Series([1, 4])))
 
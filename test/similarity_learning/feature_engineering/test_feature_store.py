@@ -0,0 +1,76 @@
+from unittest import TestCase
+
+import tempfile
+import numpy as np
+from pathlib import Path
+from similarity_learning.feature_engineering import BaselineFeatureExtractor, FeatureStore
+from similarity_learning.feature_engineering.baseline_feature_extractor.language_features_order import LanguageFeaturesOrder
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame
+from similarity_learning.globals import (SENIORITY_HIERARCHY_MAPPING,
+                                         DEGREE_HIERARCHY_MAPPING,
+                                         LANGUAGE_RATING_HIERARCHY_MAPPING,
+                                         LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING)
+
+
+class TestFeatureStore(TestCase):
+    def setUp(self) -> None:
+        data_path = Path(__file__).parent.parent.parent.parent / Path("data") / Path("pairs_dataframe_object.pkl")
+        self.pairs_dataframe = LabeledPairsDataFrame.from_pickle(data_path).iloc[0:200]
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.feature_store = FeatureStore(self.temporary_directory.name)
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def make_feature_extractor(self, **kwargs) -> BaselineFeatureExtractor:
+        return BaselineFeatureExtractor(seniority_hierarchy_mapping=SENIORITY_HIERARCHY_MAPPING,
+                                        degree_hierarchy_mapping=DEGREE_HIERARCHY_MAPPING,
+                                        language_rating_hierarchy_mapping=LANGUAGE_RATING_HIERARCHY_MAPPING,
+                                        language_must_have_hierarchy_mapping=LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING,
+                                        **kwargs)
+
+    def test_stored_features_are_memory_mapped_and_equal_to_computed_features(self):
+        expected = self.make_feature_extractor().fit_transform(self.pairs_dataframe)
+        computed = self.feature_store.get_or_compute(self.make_feature_extractor(), self.pairs_dataframe)
+        loaded = self.feature_store.get_or_compute(self.make_feature_extractor(), self.pairs_dataframe)
+
+        self.assertIsInstance(loaded.features, np.memmap)
+        self.assertTrue(np.array_equal(computed.features, expected))
+        self.assertTrue(np.array_equal(loaded.features, expected))
+        self.assertTrue(np.array_equal(loaded.labels, self.pairs_dataframe.labels.values))
+        self.assertEqual(len(loaded.feature_names), expected.shape[1])
+
+    def test_sparse_features_are_stored_as_memory_mapped_csr_arrays(self):
+        expected = self.make_feature_extractor().fit_transform(self.pairs_dataframe)
+        sparse_feature_extractor = self.make_feature_extractor(sparse_output=True)
+        self.assertNotEqual(self.feature_store.key(sparse_feature_extractor, self.pairs_dataframe),
+                            self.feature_store.key(self.make_feature_extractor(), self.pairs_dataframe))
+
+        self.feature_store.get_or_compute(sparse_feature_extractor, self.pairs_dataframe)
+        loaded = self.feature_store.get_or_compute(self.make_feature_extractor(sparse_output=True),
+                                                   self.pairs_dataframe)
+        self.assertEqual(loaded.features.format, "csr")
+        self.assertEqual(len(loaded), len(self.pairs_dataframe))
+        self.assertTrue(np.array_equal(loaded.features.toarray(), expected))
+
+    def test_key_depends_on_configuration_and_data(self):
+        feature_extractor = self.make_feature_extractor()
+        key = self.feature_store.key(feature_extractor, self.pairs_dataframe)
+
+        self.assertEqual(key, self.feature_store.key(self.make_feature_extractor(), self.pairs_dataframe.copy()))
+        self.assertNotEqual(key, self.feature_store.key(feature_extractor, self.pairs_dataframe.iloc[0:199]))
+        self.assertNotEqual(key, self.feature_store.key(self.make_feature_extractor(language_mapping_order=LanguageFeaturesOrder.JOBS),
+                                                        self.pairs_dataframe))
+
+    def test_feature_extractor_is_fitted_the_same_way_on_a_hit_and_on_a_miss(self):
+        computing_feature_extractor = self.make_feature_extractor()
+        key = self.feature_store.key(computing_feature_extractor, self.pairs_dataframe)
+        self.feature_store.get_or_compute(computing_feature_extractor, self.pairs_dataframe)
+        self.assertEqual(self.feature_store.key(computing_feature_extractor, self.pairs_dataframe), key)
+
+        loading_feature_extractor = self.make_feature_extractor()
+        loaded = self.feature_store.get_or_compute(loading_feature_extractor, self.pairs_dataframe)
+        self.assertEqual(loading_feature_extractor.feature_names, loaded.feature_names)
+        evaluation_pairs = self.pairs_dataframe.iloc[50:100]
+        self.assertTrue(np.array_equal(loading_feature_extractor.transform(evaluation_pairs),
+                                       computing_feature_extractor.transform(evaluation_pairs)))
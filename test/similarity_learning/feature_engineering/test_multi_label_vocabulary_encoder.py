@@ -0,0 +1,23 @@
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MultiLabelBinarizer
+from similarity_learning.feature_engineering.multi_label_vocabulary_encoder import MultiLabelVocabularyEncoder
+
+
+class TestMultiLabelVocabularyEncoder(TestCase):
+    def setUp(self) -> None:
+        self.data = pd.Series([["Backend", "Frontend"], [], ["DevOps"], ["Frontend", "Backend", "Frontend"]])
+
+    def test_encodes_like_the_fitted_multi_label_binarizer(self):
+        binarizer = MultiLabelBinarizer().fit(self.data)
+        encoder = MultiLabelVocabularyEncoder(binarizer.classes_)
+        self.assertTrue(np.array_equal(encoder.transform(self.data), binarizer.transform(self.data)))
+        self.assertEqual(list(encoder.classes_), list(binarizer.classes_))
+
+    def test_unknown_labels_are_ignored_with_a_warning(self):
+        encoder = MultiLabelVocabularyEncoder(["Frontend", "Backend"])
+        with self.assertWarns(UserWarning):
+            out = encoder.transform(self.data)
+        self.assertTrue(np.array_equal(out, [[1, 1], [0, 0], [0, 0], [1, 1]]))
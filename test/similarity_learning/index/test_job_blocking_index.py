@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+import json
+from pathlib import Path
+from similarity_learning.search import Search
+from similarity_learning.inference import DecisionTreeModel
+from similarity_learning.feature_engineering.language.binary_features import is_required_language_missing
+from similarity_learning.index import JobBlockingIndex, BlockingRules
+
+
+class TestJobBlockingIndex(TestCase):
+    def setUp(self) -> None:
+        root_path = Path(__file__).parent.parent.parent.parent
+        with open(root_path / Path("data") / Path("raw_data.json")) as f:
+            pairs = json.load(f)
+        self.jobs = [pair["job"] for pair in pairs[:300]]
+        self.talents = [pair["talent"] for pair in pairs[300:320]]
+        self.model_path = root_path / Path("stored_models") / Path("decision_tree_model_object.pkl")
+
+    @staticmethod
+    def satisfies_rules(job: dict, talent: dict, max_salary_shortfall: float) -> bool:
+        return len(set(job["job_roles"]) & set(talent["job_roles"])) > 0 \
+            and not is_required_language_missing([language["title"] for language in job["languages"]],
+                                                 [language["title"] for language in talent["languages"]],
+                                                 [language["must_have"] for language in job["languages"]]) \
+            and job["max_salary"] >= talent["salary_expectation"] - max_salary_shortfall
+
+    def test_candidates_are_the_jobs_which_satisfy_every_rule(self):
+        index = JobBlockingIndex(self.jobs, BlockingRules(max_salary_shortfall=10000))
+        for talent in self.talents:
+            result = index.candidates(talent)
+            expected = [i for i, job in enumerate(self.jobs) if self.satisfies_rules(job, talent, 10000)]
+            self.assertEqual(result.candidates.tolist(), expected)
+            self.assertEqual(result.n_pruned, len(self.jobs) - len(expected))
+
+        statistics = index.statistics()
+        self.assertEqual(statistics["queries"], len(self.talents))
+        self.assertEqual(statistics["considered"], len(self.talents) * len(self.jobs))
+        self.assertGreater(statistics["pruned_fraction"], 0.5)
+        self.assertEqual(set(statistics["pruned_per_rule"]), {"role_overlap", "must_have_languages", "salary"})
+
+    def test_disabled_rules_prune_nothing(self):
+        index = JobBlockingIndex(self.jobs, BlockingRules(require_role_overlap=False,
+                                                          require_must_have_languages=False))
+        self.assertEqual(len(index.candidates(self.talents[0]).candidates), len(self.jobs))
+
+    def test_blocked_top_k_jobs_scores_only_the_candidates(self):
+        search = Search(DecisionTreeModel.load(self.model_path))
+        search.index_jobs(self.jobs, BlockingRules())
+        talent = self.talents[0]
+        candidates = [job for job in self.jobs if self.satisfies_rules(job, talent, float("inf"))]
+
+        out = search.top_k_jobs(talent, k=5)
+        expected = sorted(search.match_bulk([talent] * len(candidates), candidates),
+                          key=lambda o: -o["score"])[:5]
+        self.assertEqual([o["score"] for o in out], [o["score"] for o in expected])
+        self.assertTrue(all(o["job"] in candidates for o in out))
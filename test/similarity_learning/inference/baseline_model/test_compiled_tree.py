@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.tree import DecisionTreeClassifier
+from similarity_learning.inference.baseline_model.compiled_tree import CompiledTree
+from similarity_learning.inference.baseline_model.decision_tree_model import DecisionTreeModel
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame
+from pathlib import Path
+
+
+class TestCompiledTree(TestCase):
+    def setUp(self) -> None:
+        stored_models_path = Path(__file__).parent.parent.parent.parent.parent / Path("stored_models")
+        data_path = stored_models_path.parent / Path("data") / Path("pairs_dataframe_object.pkl")
+
+        self.model = DecisionTreeModel.load(stored_models_path / Path("decision_tree_model_object.pkl"))
+        self.features = self.model.feature_extractor.transform(LabeledPairsDataFrame.from_pickle(data_path))
+
+    def test_batch_probabilities_are_identical_to_sklearn(self):
+        compiled_tree = CompiledTree.from_estimator(self.model.model)
+        self.assertTrue(np.array_equal(compiled_tree.predict_proba(self.features),
+                                       self.model.model.predict_proba(self.features)))
+
+    def test_sparse_batch_probabilities_are_identical_to_sklearn(self):
+        sparse_features = csr_matrix(self.features)
+        compiled_tree = CompiledTree.from_estimator(self.model.model)
+        self.assertTrue(np.array_equal(compiled_tree.predict_proba(sparse_features),
+                                       self.model.model.predict_proba(self.features)))
+
+    def test_single_sample_probabilities_are_identical_to_sklearn(self):
+        compiled_tree = CompiledTree.from_estimator(self.model.model)
+        out = np.vstack([compiled_tree.predict_proba_single(row) for row in self.features[:200]])
+        self.assertTrue(np.array_equal(out, self.model.model.predict_proba(self.features[:200])))
+
+    def test_probabilities_are_identical_to_sklearn_on_continuous_multiclass_data(self):
+        random_state = np.random.RandomState(0)
+        features, labels = random_state.randn(500, 4), random_state.randint(0, 3, 500)
+        estimator = DecisionTreeClassifier(max_depth=8, random_state=0).fit(features, labels)
+
+        test_features = random_state.randn(1000, 4)
+        self.assertTrue(np.array_equal(CompiledTree.from_estimator(estimator).predict_proba(test_features),
+                                       estimator.predict_proba(test_features)))
+
+    def test_compiled_model_predicts_the_same_scores(self):
+        expected = self.model.predict_features(self.features).similarity_scores
+        self.model.compile()
+        self.assertTrue(np.array_equal(self.model.predict_features(self.features).similarity_scores, expected))
+        self.assertEqual(self.model.predict_features(self.features[:1]).similarity_scores[0], expected[0])
+
+    def test_raises_value_error_on_wrong_number_of_features(self):
+        compiled_tree = CompiledTree.from_estimator(self.model.model)
+        self.assertRaises(ValueError, lambda: compiled_tree.predict_proba(self.features[:, :-1]))
@@ -0,0 +1,68 @@
+import json
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+from similarity_learning.exceptions import UnsupportedArtifactError
+from similarity_learning.inference import Model
+from similarity_learning.inference.baseline_model.decision_tree_model import DecisionTreeModel
+from similarity_learning.inference.model_artifact import load_model_artifact, MANIFEST_FILE_NAME
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame
+from pathlib import Path
+
+
+class TestModelArtifact(TestCase):
+    def setUp(self) -> None:
+        stored_models_path = Path(__file__).parent.parent.parent.parent / Path("stored_models")
+        self.data = LabeledPairsDataFrame.from_pickle(stored_models_path.parent / Path("data") /
+                                                      Path("pairs_dataframe_object.pkl"))
+        self.pickled_model = DecisionTreeModel.load(stored_models_path / Path("decision_tree_model_object.pkl"))
+        self.stored_artifact_path = stored_models_path / Path("decision_tree_model")
+        self.directory = Path(tempfile.mkdtemp())
+        self.artifact_path = self.directory / Path("model")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_saved_artifact_predicts_identical_scores(self):
+        self.pickled_model.save(self.artifact_path)
+        model = Model.load(self.artifact_path)
+        self.assertIsInstance(model, DecisionTreeModel)
+        self.assertEqual(model.feature_extractor.feature_names, self.pickled_model.feature_extractor.feature_names)
+        self.assertTrue(np.array_equal(model.predict(self.data).similarity_scores,
+                                       self.pickled_model.predict(self.data).similarity_scores))
+
+    def test_stored_artifact_predicts_identical_scores(self):
+        model = Model.load(self.stored_artifact_path)
+        self.assertTrue(np.array_equal(model.compile().predict(self.data).similarity_scores,
+                                       self.pickled_model.predict(self.data).similarity_scores))
+
+    def test_tree_arrays_are_memory_mapped(self):
+        model = load_model_artifact(self.stored_artifact_path)
+        self.assertIsInstance(model.compiled_tree.threshold, np.memmap)
+        self.assertNotIsInstance(load_model_artifact(self.stored_artifact_path, mmap=False).compiled_tree.threshold,
+                                 np.memmap)
+
+    def test_manifest_is_json(self):
+        self.pickled_model.save(self.artifact_path)
+        with open(self.artifact_path / MANIFEST_FILE_NAME, "r") as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["tree"]["n_features"], len(self.pickled_model.feature_extractor.feature_names))
+
+    def test_saving_replaces_an_artifact_but_no_other_directory(self):
+        self.pickled_model.save(self.artifact_path)
+        self.pickled_model.save(self.artifact_path)
+        self.assertEqual(sorted(path.name for path in self.directory.iterdir()), ["model"])
+        with self.assertRaises(FileExistsError):
+            self.pickled_model.save(self.directory)
+
+    def test_unsupported_format_version_raises(self):
+        self.pickled_model.save(self.artifact_path)
+        with open(self.artifact_path / MANIFEST_FILE_NAME, "r") as f:
+            manifest = json.load(f)
+        manifest["format_version"] += 1
+        with open(self.artifact_path / MANIFEST_FILE_NAME, "w") as f:
+            json.dump(manifest, f)
+        with self.assertRaises(UnsupportedArtifactError):
+            Model.load(self.artifact_path)
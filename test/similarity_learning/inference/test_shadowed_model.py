@@ -0,0 +1,83 @@
+import copy
+import json
+from unittest import TestCase
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+from similarity_learning.inference import DecisionTreeModel, ShadowedModel, MultiModelOutput
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame
+from similarity_learning.search import Search
+from similarity_learning.exceptions import UnsavableModelError
+from pathlib import Path
+
+
+class TestShadowedModel(TestCase):
+    def setUp(self) -> None:
+        root_path = Path(__file__).parent.parent.parent.parent
+        self.data = LabeledPairsDataFrame.from_pickle(root_path / Path("data") / Path("pairs_dataframe_object.pkl"))
+        with open(root_path / Path("data") / Path("raw_data.json")) as f:
+            self.pairs = json.load(f)[:50]
+
+        self.primary = DecisionTreeModel.load(root_path / Path("stored_models") / Path("decision_tree_model_object.pkl"))
+        features = self.primary.feature_extractor.transform(self.data)
+        estimator = DecisionTreeClassifier(max_depth=3, random_state=0).fit(features, self.data.labels.values)
+        self.candidate = DecisionTreeModel(estimator, copy.deepcopy(self.primary.feature_extractor))
+        self.model = ShadowedModel(self.primary, {"candidate": self.candidate})
+
+    def test_outputs_are_identical_to_the_outputs_of_the_separate_models(self):
+        output = self.model.predict(self.data)
+        self.assertIsInstance(output, MultiModelOutput)
+        self.assertTrue(np.array_equal(output.similarity_scores, self.primary.predict(self.data).similarity_scores))
+        self.assertTrue(np.array_equal(output.shadow_outputs["candidate"].similarity_scores,
+                                       self.candidate.predict(self.data).similarity_scores))
+
+    def test_features_are_computed_once_per_batch(self):
+        calls = []
+        transform = self.model.feature_extractor.transform
+        self.model.feature_extractor.transform = lambda data: calls.append(len(data)) or transform(data)
+        self.model.predict(self.data)
+        self.assertEqual(calls, [len(self.data)])
+
+    def test_search_results_hold_the_primary_and_the_shadow_scores(self):
+        talents, jobs = [pair["talent"] for pair in self.pairs], [pair["job"] for pair in self.pairs]
+        out = Search(self.model.compile()).match_bulk(talents, jobs)
+        primary_out = Search(self.primary).match_bulk(talents, jobs)
+        candidate_out = Search(self.candidate).match_bulk(talents, jobs)
+
+        self.assertEqual([o["score"] for o in out], [o["score"] for o in primary_out])
+        self.assertEqual([o["shadow_scores"]["candidate"] for o in out], [o["score"] for o in candidate_out])
+        single_out = Search(self.model).match(talents[0], jobs[0])
+        self.assertEqual(single_out["shadow_scores"], {"candidate": candidate_out[0]["score"]})
+
+    def test_shadow_scores_are_kept_with_the_result_cache(self):
+        talents, jobs = [pair["talent"] for pair in self.pairs], [pair["job"] for pair in self.pairs]
+        expected = Search(self.model).match_bulk(talents, jobs)
+        search = Search(self.model, result_cache_size=100)
+
+        first_out = search.match(talents[0], jobs[0])
+        self.assertEqual(search.match(talents[0], jobs[0])["shadow_scores"], first_out["shadow_scores"])
+        for out in [search.match_bulk(talents[:30], jobs[:30]), search.match_bulk(talents, jobs)]:
+            self.assertEqual([o["shadow_scores"] for o in out], [o["shadow_scores"] for o in expected[:len(out)]])
+            self.assertEqual([o["score"] for o in out], [o["score"] for o in expected[:len(out)]])
+        self.assertGreater(search.result_cache.hits, 0)
+
+    def test_top_k_is_ranked_by_the_primary_model_only(self):
+        talents, jobs = [pair["talent"] for pair in self.pairs], [pair["job"] for pair in self.pairs]
+        search, primary_search = Search(self.model), Search(self.primary)
+        for s in [search, primary_search]:
+            s.index_jobs(jobs)
+            s.index_talents(talents)
+        self.candidate.predict_features = lambda *args: self.fail("the shadow model scored the indexed corpus")
+
+        self.assertEqual(search.top_k_jobs(talents[0], k=5), primary_search.top_k_jobs(talents[0], k=5))
+        self.assertEqual(search.top_k_talents(jobs[0], k=5), primary_search.top_k_talents(jobs[0], k=5))
+
+    def test_models_with_other_features_are_rejected(self):
+        other_feature_extractor = copy.deepcopy(self.primary.feature_extractor)
+        other_feature_extractor.seniority_hierarchy_encoder.feature_hierarchy_mapping = {"none": 0}
+        with self.assertRaises(ValueError):
+            ShadowedModel(self.primary, {"other": DecisionTreeModel(self.candidate.model, other_feature_extractor)})
+
+    def test_saving_the_combination_raises(self):
+        with self.assertRaises(UnsavableModelError):
+            self.model.save("shadowed_model")
@@ -0,0 +1,56 @@
+from unittest import TestCase
+
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from similarity_learning.feature_engineering import BaselineFeatureExtractor
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame, NormalizedPairsDataFrame, UnlabeledPairsDataFrame
+from similarity_learning.globals import (SENIORITY_HIERARCHY_MAPPING,
+                                         DEGREE_HIERARCHY_MAPPING,
+                                         LANGUAGE_RATING_HIERARCHY_MAPPING,
+                                         LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING)
+
+
+class TestNormalizedPairsDataFrame(TestCase):
+    def setUp(self) -> None:
+        data_path = Path(__file__).parent.parent.parent.parent.parent / Path("data") / Path("pairs_dataframe_object.pkl")
+        self.pairs_dataframe = LabeledPairsDataFrame.from_pickle(data_path).iloc[0:300]
+        self.normalized = NormalizedPairsDataFrame.from_pairs(self.pairs_dataframe)
+
+    def test_materialized_pairs_equal_the_original_pairs(self):
+        self.assertTrue(len(self.normalized.unique_jobs) < len(self.normalized))
+        self.assertEqual(self.normalized.job_idx.dtype, np.int32)
+        pd.testing.assert_frame_equal(self.normalized.jobs.data, self.pairs_dataframe.jobs.data)
+        pd.testing.assert_frame_equal(self.normalized.iloc[[7, 3]].talents.data,
+                                      self.pairs_dataframe.iloc[[7, 3]].talents.data)
+
+    def test_features_of_normalized_pairs_equal_the_features_of_the_original_pairs(self):
+        feature_extractor = BaselineFeatureExtractor(seniority_hierarchy_mapping=SENIORITY_HIERARCHY_MAPPING,
+                                                     degree_hierarchy_mapping=DEGREE_HIERARCHY_MAPPING,
+                                                     language_rating_hierarchy_mapping=LANGUAGE_RATING_HIERARCHY_MAPPING,
+                                                     language_must_have_hierarchy_mapping=LANGUAGE_MUST_HAVE_HIERARCHY_MAPPING)
+        features = feature_extractor.fit_transform(self.normalized)
+
+        self.assertTrue(np.array_equal(features, feature_extractor.transform(self.pairs_dataframe)))
+        self.assertTrue(np.array_equal(feature_extractor.transform(self.normalized.iloc[10:20]), features[10:20]))
+
+    def test_slices_keep_only_their_own_unique_items(self):
+        sliced = self.normalized.iloc[10:20]
+        self.assertEqual(len(sliced.unique_jobs), len(np.unique(self.normalized.job_idx[10:20])))
+        self.assertEqual(len(sliced.unique_talents), len(np.unique(self.normalized.talent_idx[10:20])))
+        pd.testing.assert_frame_equal(sliced.jobs.data, self.pairs_dataframe.iloc[10:20].jobs.data)
+        pd.testing.assert_frame_equal(sliced.talents.data, self.pairs_dataframe.iloc[10:20].talents.data)
+
+    def test_jobs_which_differ_in_the_order_of_their_roles_are_kept_apart(self):
+        with open(Path(__file__).parent.parent.parent.parent.parent / Path("data") / Path("raw_data.json")) as f:
+            pair = next(pair for pair in json.load(f) if len(pair["job"]["job_roles"]) > 1)
+        reordered_job = dict(pair["job"], job_roles=pair["job"]["job_roles"][::-1])
+        pairs = UnlabeledPairsDataFrame.from_full_json([pair["job"], reordered_job], [pair["talent"]] * 2)
+        normalized = NormalizedPairsDataFrame.from_pairs(pairs)
+
+        self.assertEqual(pairs.jobs.node_id.nunique(), 1)
+        self.assertEqual(len(normalized.unique_jobs), 2)
+        self.assertEqual(len(normalized.unique_talents), 1)
+        self.assertEqual(list(normalized.jobs.job_roles), [pair["job"]["job_roles"], reordered_job["job_roles"]])
+        pd.testing.assert_frame_equal(normalized.as_dataframe(), pairs.as_dataframe())
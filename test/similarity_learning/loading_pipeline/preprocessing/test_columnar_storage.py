@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame
+from similarity_learning.loading_pipeline.preprocessing.columnar_storage import read_columnar_table, \
+    write_columnar_tables
+
+
+class TestColumnarStorage(TestCase):
+    def setUp(self) -> None:
+        data_path = Path(__file__).parent.parent.parent.parent.parent / Path("data") / Path("pairs_dataframe_object.pkl")
+        self.pairs_dataframe = LabeledPairsDataFrame.from_pickle(data_path).iloc[0:300]
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temporary_directory.name) / Path("pairs.npz")
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def test_round_trip_of_labeled_pairs(self):
+        self.pairs_dataframe.to_columnar(self.file_path)
+        loaded = LabeledPairsDataFrame.from_columnar(self.file_path)
+
+        pd.testing.assert_frame_equal(loaded.jobs.data, self.pairs_dataframe.jobs.data)
+        pd.testing.assert_frame_equal(loaded.talents.data, self.pairs_dataframe.talents.data)
+        pd.testing.assert_series_equal(loaded.labels, self.pairs_dataframe.labels)
+        self.assertEqual(loaded.add_language_feature_suffix_flag, self.pairs_dataframe.add_language_feature_suffix_flag)
+
+    def test_reads_a_subset_of_rows_and_columns(self):
+        self.pairs_dataframe.to_columnar(self.file_path, compress=True)
+        rows = [250, 3, 17]
+
+        loaded = LabeledPairsDataFrame.from_columnar(self.file_path, rows=rows)
+        pd.testing.assert_frame_equal(loaded.jobs.data, self.pairs_dataframe.iloc[rows].jobs.data)
+
+        talents = read_columnar_table(self.file_path, "talents", columns=["job_roles", "seniority"], rows=slice(10, 20))
+        pd.testing.assert_frame_equal(talents, self.pairs_dataframe.talents.data[["job_roles", "seniority"]].iloc[10:20])
+
+
+    def test_round_trip_of_missing_values(self):
+        table = pd.DataFrame({"degree": ["a", np.nan, "b", None],
+                              "languages": [["English", None], [], [np.nan], ["German"]],
+                              "salary": [1.0, np.nan, 3.0, 4.0]})
+        write_columnar_tables(self.file_path, {"table": table})
+
+        loaded = read_columnar_table(self.file_path, "table")
+        self.assertEqual(loaded["degree"].tolist()[::2], ["a", "b"])
+        self.assertTrue(loaded["degree"].iloc[[1, 3]].isna().all())
+        self.assertEqual(loaded["languages"].iloc[[1, 3]].tolist(), [[], ["German"]])
+        self.assertEqual(loaded["languages"].iloc[0][0], "English")
+        self.assertTrue(pd.isna(loaded["languages"].iloc[0][1]) and pd.isna(loaded["languages"].iloc[2][0]))
+        pd.testing.assert_series_equal(loaded["salary"], table["salary"])
+
+        rows = read_columnar_table(self.file_path, "table", columns=["degree"], rows=[3, 2])
+        self.assertTrue(pd.isna(rows["degree"].iloc[0]))
+        self.assertEqual(rows["degree"].iloc[1], "b")
+
+    def test_columns_with_some_lists_are_rejected(self):
+        table = pd.DataFrame({"job_roles": [np.nan, ["backend"], ["frontend"]]})
+        with self.assertRaisesRegex(ValueError, "job_roles column mixes lists"):
+            write_columnar_tables(self.file_path, {"table": table})
@@ -0,0 +1,84 @@
+from unittest import TestCase
+
+import json
+import tempfile
+from unittest.mock import patch
+from pathlib import Path
+from similarity_learning.exceptions import UnexpectedJsonFormatException
+from similarity_learning.loading_pipeline import LabeledPairsDataFrame
+from similarity_learning.loading_pipeline.preprocessing.json_streaming import iter_json_records
+
+
+class CountingFile:
+    """
+    Text file which counts the characters read from it.
+    """
+    def __init__(self, file):
+        self.file = file
+        self.n_read = 0
+
+    def read(self, size: int = -1) -> str:
+        chunk = self.file.read(size)
+        self.n_read += len(chunk)
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+
+class TestJsonStreaming(TestCase):
+    def setUp(self) -> None:
+        self.data_path = Path(__file__).parent.parent.parent.parent.parent / Path("data") / Path("raw_data.json")
+        with open(self.data_path) as f:
+            self.records = json.load(f)[:50]
+        self.temporary_directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temporary_directory.cleanup()
+
+    def write(self, file_name: str, content: str) -> Path:
+        file_path = Path(self.temporary_directory.name) / Path(file_name)
+        file_path.write_text(content, encoding="utf8")
+        return file_path
+
+    def test_parses_json_array_and_ndjson_with_buffers_smaller_than_a_record(self):
+        array_path = self.write("pairs.json", json.dumps(self.records, indent=2))
+        ndjson_path = self.write("pairs.ndjson", "\n".join(json.dumps(record) for record in self.records))
+
+        self.assertEqual(list(iter_json_records(array_path, buffer_size=16)), self.records)
+        self.assertEqual(list(iter_json_records(ndjson_path, buffer_size=16)), self.records)
+
+    def test_raises_on_truncated_json_array(self):
+        file_path = self.write("pairs.json", json.dumps(self.records)[:-10])
+        self.assertRaises(UnexpectedJsonFormatException, lambda: list(iter_json_records(file_path)))
+
+    def test_malformed_records_raise_without_buffering_the_rest_of_the_file(self):
+        ndjson_path = self.write("pairs.ndjson", "\n".join(["{\"job\": ,}"] + [json.dumps(record) for record in self.records]))
+        array_path = self.write("pairs.json", "[{\"job\": \"x}, " + json.dumps(self.records)[1:])
+
+        for file_path in (ndjson_path, array_path):
+            opened_files = []
+            def open_counting(*args, **kwargs):
+                opened_files.append(CountingFile(open(*args, **kwargs)))
+                return opened_files[-1]
+            with patch("similarity_learning.loading_pipeline.preprocessing.json_streaming.open", open_counting,
+                       create=True):
+                self.assertRaises(UnexpectedJsonFormatException,
+                                  lambda: list(iter_json_records(file_path, buffer_size=64, max_record_size=1024)))
+            self.assertLess(opened_files[0].n_read, 2048)
+
+    def test_yields_chunks_of_labeled_pairs_dataframes_indexed_from_zero(self):
+        chunks = list(LabeledPairsDataFrame.iter_from_full_json(self.data_path, chunk_size=700, add_language_suffix=True))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [700, 700, 600])
+        self.assertEqual(list(chunks[1].index), list(range(700)))
+        self.assertEqual(list(chunks[1].labels.index), list(range(700)))
+        self.assertTrue(chunks[0].add_language_feature_suffix_flag)
+
+    def test_raises_on_records_with_unexpected_keys(self):
+        file_path = self.write("pairs.ndjson", json.dumps({"job": {}, "talent": {}}))
+        self.assertRaises(UnexpectedJsonFormatException,
+                          lambda: list(LabeledPairsDataFrame.iter_from_full_json(file_path, chunk_size=10)))
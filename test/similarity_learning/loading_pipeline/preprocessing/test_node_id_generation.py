@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from similarity_learning.loading_pipeline.preprocessing.node_id_generation import generate_node_ids, compute_content_hashes
+from similarity_learning.loading_pipeline.preprocessing.node_id_registry import NodeIdRegistry
+
+
+class TestNodeIdGeneration(TestCase):
+    def setUp(self) -> None:
+        self.jobs = pd.DataFrame({"job_roles": [["a", "b"], ["b", "a"], ["a"], ["a", "b"]],
+                                  "min_degree": ["1", "1", "12", "1"],
+                                  "title_languages": [["23"], ["23"], ["3"], ["3"]]})
+
+    def test_ids_ignore_the_order_of_unordered_lists_and_do_not_collide_on_concatenation(self):
+        # "1" + "23" and "12" + "3" concatenate to the same string
+        self.assertEqual(generate_node_ids(self.jobs).tolist(), [0, 0, 1, 2])
+
+    def test_registry_assigns_the_same_global_ids_across_batches_and_restarts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = Path(directory) / Path("job_ids.npy")
+            registry = NodeIdRegistry(file_path)
+            first_ids = generate_node_ids(self.jobs.iloc[2:], registry=registry)
+            self.assertEqual(first_ids.tolist(), [0, 1])
+
+            restarted_registry = NodeIdRegistry(file_path)
+            self.assertEqual(generate_node_ids(self.jobs, registry=restarted_registry).tolist(), [2, 2, 0, 1])
+            self.assertEqual(len(restarted_registry), 3)
+            self.assertTrue(np.array_equal(restarted_registry.lookup(compute_content_hashes(self.jobs).values),
+                                           [2, 2, 0, 1]))
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+import json
+from pathlib import Path
+from similarity_learning.search import Search
+from similarity_learning.inference import DecisionTreeModel
+from similarity_learning.serving.result_cache import ResultCache, pair_cache_key
+
+
+class TestResultCache(TestCase):
+    def setUp(self) -> None:
+        root_path = Path(__file__).parent.parent.parent.parent
+        self.model = DecisionTreeModel.load(root_path / Path("stored_models") / Path("decision_tree_model_object.pkl"))
+        with open(root_path / Path("data") / Path("raw_data.json")) as f:
+            self.pairs = json.load(f)[:20]
+
+    def test_cached_match_bulk_scores_only_the_misses_and_keeps_the_order(self):
+        search = Search(self.model, result_cache_size=100)
+        talents = [pair["talent"] for pair in self.pairs]
+        jobs = [pair["job"] for pair in self.pairs]
+        expected = Search(self.model).match_bulk(talents, jobs)
+
+        self.assertEqual(search.match_bulk(talents[:10], jobs[:10]), expected[:10])
+        self.assertEqual(search.result_cache.hits, 0)
+        self.assertEqual(search.match_bulk(talents[::-1], jobs[::-1]), expected[::-1])
+        self.assertEqual(search.result_cache.hits, 10)
+        self.assertEqual(search.match(talents[15], jobs[15]), expected[15])
+        self.assertEqual(search.result_cache.hits, 11)
+
+    def test_key_ignores_the_order_of_the_languages_but_not_the_model_version(self):
+        talent, job = self.pairs[0]["talent"], self.pairs[0]["job"]
+        reordered_talent = dict(talent, languages=talent["languages"][::-1])
+
+        self.assertEqual(pair_cache_key(talent, job, "1"), pair_cache_key(reordered_talent, job, "1"))
+        self.assertNotEqual(pair_cache_key(talent, job, "1"), pair_cache_key(talent, job, "2"))
+
+    def test_entries_expire_after_the_ttl(self):
+        now = [0.0]
+        cache = ResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+        cache.put("a", (True, 1.0))
+        self.assertEqual(cache.get("a"), (True, 1.0))
+        now[0] = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
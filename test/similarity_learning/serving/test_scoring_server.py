@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from similarity_learning.search import Search
+from similarity_learning.inference import DecisionTreeModel
+
+
+class TestScoringServer(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        root_path = Path(__file__).parent.parent.parent.parent
+        model_path = root_path / Path("stored_models") / Path("decision_tree_model_object.pkl")
+        with open(root_path / Path("data") / Path("raw_data.json")) as f:
+            cls.pairs = json.load(f)[:5]
+        cls.search = Search(DecisionTreeModel.load(model_path))
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            cls.port = s.getsockname()[1]
+        cls.server_process = subprocess.Popen([sys.executable, "-m", "similarity_learning.serving.scoring_server",
+                                               "--model", str(model_path), "--port", str(cls.port), "--workers", "2"],
+                                              cwd=root_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(200):
+            try:
+                cls.request("/health")
+                break
+            except OSError:
+                time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server_process.terminate()
+        cls.server_process.wait(10)
+
+    @classmethod
+    def request(cls, path: str, body: dict = None):
+        data = None if body is None else json.dumps(body).encode("utf8")
+        with urllib.request.urlopen(urllib.request.Request(f"http://127.0.0.1:{cls.port}{path}", data=data)) as response:
+            return json.loads(response.read())
+
+    def test_match_and_match_bulk_return_the_output_of_search(self):
+        talents = [pair["talent"] for pair in self.pairs]
+        jobs = [pair["job"] for pair in self.pairs]
+
+        self.assertEqual(self.request("/match", {"talent": talents[0], "job": jobs[0]}),
+                         self.search.match(talents[0], jobs[0]))
+        self.assertEqual(self.request("/match_bulk", {"talents": talents, "jobs": jobs}),
+                         self.search.match_bulk(talents, jobs))
+
+    def test_malformed_request_is_rejected(self):
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            self.request("/match", {"talent": self.pairs[0]["talent"]})
+        self.assertEqual(context.exception.code, 400)
@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+import json
+import tempfile
+from collections import Counter
+from pathlib import Path
+from similarity_learning.search import Search
+from similarity_learning.inference import DecisionTreeModel
+from similarity_learning.globals import SENIORITY_HIERARCHY_MAPPING, DEGREE_HIERARCHY_MAPPING, \
+    LANGUAGE_RATING_HIERARCHY_MAPPING
+from similarity_learning.loading_pipeline.preprocessing import JsonLoadingPipeLine
+from similarity_learning.synthetic_data import SyntheticPairsGenerator
+
+
+class TestSyntheticPairsGenerator(TestCase):
+    def setUp(self) -> None:
+        self.root_path = Path(__file__).parent.parent.parent.parent
+        with open(self.root_path / Path("data") / Path("raw_data.json")) as f:
+            self.sample_records = json.load(f)
+
+    def test_same_seed_generates_the_same_pairs(self):
+        first = SyntheticPairsGenerator(self.sample_records, seed=3).generate_pairs(50, n_unique_jobs=10)
+        second = SyntheticPairsGenerator(self.sample_records, seed=3).generate_pairs(50, n_unique_jobs=10)
+        other = SyntheticPairsGenerator(self.sample_records, seed=4).generate_pairs(50, n_unique_jobs=10)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_records_have_the_schema_and_vocabularies_of_the_raw_data(self):
+        pairs = SyntheticPairsGenerator(self.sample_records).generate_pairs(500)
+        sample_roles = {role for record in self.sample_records for role in record["job"]["job_roles"]}
+        for pair in pairs:
+            self.assertEqual(list(pair.keys()), list(self.sample_records[0].keys()))
+            self.assertEqual(list(pair["job"].keys()), list(self.sample_records[0]["job"].keys()))
+            self.assertEqual(list(pair["talent"].keys()), list(self.sample_records[0]["talent"].keys()))
+            self.assertTrue(set(pair["job"]["job_roles"]) <= sample_roles)
+            self.assertEqual(len(set(pair["job"]["job_roles"])), len(pair["job"]["job_roles"]))
+            self.assertIn(pair["talent"]["seniority"], SENIORITY_HIERARCHY_MAPPING)
+            self.assertIn(pair["job"]["min_degree"], DEGREE_HIERARCHY_MAPPING)
+            for language in pair["talent"]["languages"]:
+                self.assertIn(language["rating"], LANGUAGE_RATING_HIERARCHY_MAPPING)
+            for language in pair["job"]["languages"]:
+                self.assertIsInstance(language["must_have"], bool)
+
+    def test_popularity_skew_produces_hot_jobs(self):
+        generator = SyntheticPairsGenerator(self.sample_records, job_popularity_skew=2.)
+        pairs = generator.generate_pairs(1000, n_unique_jobs=100)
+        job_counts = Counter(json.dumps(pair["job"], sort_keys=True) for pair in pairs)
+        self.assertLessEqual(len(job_counts), 100)
+        self.assertGreater(job_counts.most_common(1)[0][1], 400)
+
+    def test_role_skew_of_zero_flattens_the_role_distribution(self):
+        generator = SyntheticPairsGenerator(self.sample_records, role_skew=0.)
+        self.assertAlmostEqual(generator.job_role_probabilities.max(), generator.job_role_probabilities.min())
+
+    def test_written_files_are_loaded_and_scored(self):
+        generator = SyntheticPairsGenerator(self.sample_records)
+        model = DecisionTreeModel.load(self.root_path / Path("stored_models") / Path("decision_tree_model_object.pkl"))
+        with tempfile.TemporaryDirectory() as directory:
+            for ndjson in [True, False]:
+                file_path = Path(directory) / Path("pairs.json")
+                self.assertEqual(generator.write_json(file_path, 25, ndjson=ndjson, chunk_size=10), 25)
+                chunks = list(JsonLoadingPipeLine().iter_chunks(file_path, chunk_size=100))
+                self.assertEqual(len(chunks[0][0]), 25)
+                if not ndjson:
+                    self.assertEqual(len(JsonLoadingPipeLine()(file_path)[0]), 25)
+                jobs, talents, _ = chunks[0]
+                output = Search(model).match_bulk(talents.tolist(), jobs.tolist())
+                self.assertEqual(len(output), 25)
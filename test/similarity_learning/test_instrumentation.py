@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+import json
+from pathlib import Path
+from similarity_learning.search import Search
+from similarity_learning.inference import DecisionTreeModel
+from similarity_learning.instrumentation import PipelineMetrics, collect_pipeline_metrics, get_pipeline_metrics, \
+    stage
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self) -> None:
+        root_path = Path(__file__).parent.parent.parent
+        self.search = Search(DecisionTreeModel.load(root_path / Path("stored_models") /
+                                                    Path("decision_tree_model_object.pkl")))
+        with open(root_path / Path("data") / Path("raw_data.json")) as f:
+            pairs = json.load(f)[:30]
+        self.talents = [pair["talent"] for pair in pairs]
+        self.jobs = [pair["job"] for pair in pairs]
+
+    def test_match_bulk_records_every_stage_with_its_rows(self):
+        with collect_pipeline_metrics() as metrics:
+            self.search.match_bulk(self.talents, self.jobs)
+        histograms = metrics.as_dict()
+
+        self.assertEqual(set(histograms), {"load.json_normalize", "load.language_unpack", "load.node_ids",
+                                           "load.language_suffix", "featurize.encode_jobs",
+                                           "featurize.encode_talents", "featurize.seniority", "featurize.salary",
+                                           "featurize.degree", "featurize.language", "featurize.role",
+                                           "predict.model", "output.format"})
+        # jobs and talents are loaded separately
+        self.assertEqual(histograms["load.json_normalize"]["calls"], 2)
+        self.assertEqual(histograms["load.json_normalize"]["rows"], 60)
+        self.assertEqual(histograms["featurize.role"]["rows"], 30)
+        self.assertEqual(sum(histograms["predict.model"]["buckets"].values()), 1)
+
+    def test_nothing_is_recorded_outside_of_the_collection(self):
+        self.assertIsNone(get_pipeline_metrics())
+        with collect_pipeline_metrics() as metrics:
+            self.search.match(self.talents[0], self.jobs[0])
+        self.assertIsNone(get_pipeline_metrics())
+        recorded = metrics.as_dict()
+        self.assertEqual(recorded["featurize.single_pair"]["calls"], 1)
+
+        self.search.match_bulk(self.talents, self.jobs)
+        self.assertEqual(metrics.as_dict(), recorded)
+
+    def test_prometheus_export_has_cumulative_buckets(self):
+        metrics = PipelineMetrics(buckets=(0.1, 1.))
+        for seconds in [0.05, 0.5, 5.]:
+            metrics.record("predict.model", seconds, 10)
+        exported = metrics.to_prometheus()
+
+        self.assertIn('le="0.1"} 1', exported)
+        self.assertIn('le="1.0"} 2', exported)
+        self.assertIn('le="+Inf"} 3', exported)
+        self.assertIn('similarity_learning_stage_duration_seconds_count{stage="predict.model"', exported)
+        self.assertIn("} 30", exported)
+
+    def test_disabled_stage_is_a_shared_no_op(self):
+        self.assertIs(stage("a", 1), stage("b", 2))
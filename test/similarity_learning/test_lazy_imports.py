@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+class TestLazyImports(TestCase):
+    def imported_modules(self, statement: str) -> list:
+        code = f"import sys, json\n{statement}\nprint(json.dumps(sorted(m for m in ('torch', 'sklearn', 'pandas') if m in sys.modules)))"
+        output = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent.parent,
+                                check=True, capture_output=True, text=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def test_package_import_loads_no_heavy_dependencies(self):
+        self.assertEqual(self.imported_modules("import similarity_learning"), [])
+
+    def test_search_import_loads_neither_torch_nor_sklearn(self):
+        self.assertEqual(self.imported_modules("from similarity_learning import Search"), ["pandas"])
+
+    def test_loading_a_model_artifact_loads_neither_torch_nor_sklearn(self):
+        self.assertEqual(self.imported_modules("from similarity_learning.inference import Model\n"
+                                               "Model.load('stored_models/decision_tree_model')"), ["pandas"])
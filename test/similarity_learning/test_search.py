@@ -4,6 +4,8 @@ from unittest import TestCase
 from pathlib import Path
 from dummies import talent, job
 from itertools import chain
+import json
+import asyncio
 
 class TestSearch(TestCase):
     def setUp(self) -> None:
@@ -25,4 +27,53 @@ class TestSearch(TestCase):
         keys = list(chain(*[o.keys()for o in out]))
         self.assertTrue(len(set(keys).symmetric_difference({"talent", "job", "label", "score"})) == 0)
 
+    def test_top_k_jobs_returns_the_k_best_scores_of_match_bulk_sorted_descending(self):
+        data_path = Path(__file__).parent.parent.parent / Path("data") / Path("raw_data.json")
+        with open(data_path) as f:
+            jobs = [pair["job"] for pair in json.load(f)[:200]]
+        self.search.index_jobs(jobs)
+
+        out = self.search.top_k_jobs(talent, k=10)
+        bulk_scores = sorted([o["score"] for o in self.search.match_bulk([talent]*len(jobs), jobs)], reverse=True)
+
+        self.assertEqual(len(out), 10)
+        self.assertEqual([o["score"] for o in out], bulk_scores[:10])
+        self.assertTrue(all(o["talent"] == talent for o in out))
+
+    def test_top_k_talents_returns_all_items_if_k_exceeds_the_corpus_size(self):
+        self.search.index_talents([talent]*3)
+        out = self.search.top_k_talents(job, k=10)
+        self.assertEqual(len(out), 3)
+
+    def test_concurrent_amatch_requests_are_predicted_in_batches(self):
+        data_path = Path(__file__).parent.parent.parent / Path("data") / Path("raw_data.json")
+        with open(data_path) as f:
+            pairs = json.load(f)[:40]
+        batch_sizes = []
+        match_batch = self.search._match_batch
+        self.search.micro_batcher.process_batch = lambda batch: batch_sizes.append(len(batch)) or match_batch(batch)
+
+        async def run():
+            outputs = await asyncio.gather(*(self.search.amatch(pair["talent"], pair["job"]) for pair in pairs))
+            await self.search.aclose()
+            return outputs
+
+        outputs = asyncio.run(run())
+        self.assertEqual(outputs, [self.search.match(pair["talent"], pair["job"]) for pair in pairs])
+        self.assertEqual(sum(batch_sizes), len(pairs))
+        self.assertTrue(len(batch_sizes) < len(pairs))
+
+    def test_amatch_bulk_fails_only_for_the_invalid_pairs(self):
+        invalid_job = dict(job, min_degree="unknown degree")
+
+        async def run():
+            valid = self.search.amatch_bulk([talent] * 3, [job] * 3)
+            invalid = self.search.amatch(talent, invalid_job)
+            outputs = await asyncio.gather(valid, invalid, return_exceptions=True)
+            await self.search.aclose()
+            return outputs
+
+        valid_output, invalid_output = asyncio.run(run())
+        self.assertEqual(valid_output, self.search.match_bulk([talent] * 3, [job] * 3))
+        self.assertIsInstance(invalid_output, KeyError)
 